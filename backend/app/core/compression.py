@@ -0,0 +1,143 @@
+"""
+Response compression middleware
+Compresses complete (non-streaming) response bodies above a size threshold
+with brotli when available and accepted, otherwise gzip
+
+A compressed body is a different representation from the identity body,
+so its strong ETag is weakened (W/"...") as RFC 9110 requires; ETag
+comparison for If-None-Match is weak, so either form revalidates
+"""
+import gzip
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/x-ndjson")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the best supported encoding from an Accept-Encoding header
+
+    Args:
+        accept_encoding: Raw header value
+
+    Returns:
+        "br", "gzip" or None
+    """
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        token, *params = part.split(";")
+        token = token.strip()
+        if not token:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    weight = float(value.strip())
+                except ValueError:
+                    weight = 0.0
+        weights[token] = weight
+
+    # Unlisted codings take the weight of "*"; on a tie prefer br
+    supported = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_weight = None, 0.0
+    for coding in supported:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    """Mark a strong ETag weak (W/"...")"""
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies larger than minimum_size
+    Streaming responses (SSE, exports) are passed through untouched so
+    they are never buffered
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, passthrough
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            content_type = headers.get("content-type", "")
+
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                if start_message["status"] == 304:
+                    # Answer with the form of the tag the client holds (weak if it got a compressed body)
+                    etag = headers.get("etag")
+                    if etag and f"W/{etag}" in request_headers.get("if-none-match", ""):
+                        weaken_etag(headers)
+                await send(start_message)
+                await send(message)
+                return
+
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            weaken_etag(headers)
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
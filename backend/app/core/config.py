@@ -10,10 +10,112 @@ class Settings(BaseSettings):
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    # Token verification - jose, pyjwt (if installed) or builtin (stdlib HMAC, HS* only)
+    JWT_BACKEND: str = os.getenv("JWT_BACKEND", "jose")
+    # Verified tokens are remembered until they expire (0 disables the cache)
+    AUTH_TOKEN_CACHE_MAX_ENTRIES: int = int(os.getenv("AUTH_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+    # Rotating refresh tokens (POST /auth/refresh); each refresh extends the session
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    
+    # Password hashing - stored hashes are upgraded on login when BCRYPT_ROUNDS changes
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_THREADS: int = int(os.getenv("BCRYPT_THREADS", str(min(4, os.cpu_count() or 1))))
+    BCRYPT_MAX_PENDING: int = int(os.getenv("BCRYPT_MAX_PENDING", "64"))
+    
     PORT: int = int(os.getenv("PORT", "8000"))
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     SKIP_TFLITE: bool = os.getenv("SKIP_TFLITE", "false").lower() == "true"
     
+    # MongoDB client
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))  # also the warm-up size
+    MONGO_COMPRESSORS: str = os.getenv("MONGO_COMPRESSORS", "zstd,snappy,zlib")  # uninstalled ones are skipped
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+    MONGO_HISTORY_READ_PREFERENCE: str = os.getenv("MONGO_HISTORY_READ_PREFERENCE", "secondaryPreferred")
+    
+    # Storage
+    STORAGE_ENGINE: str = os.getenv("STORAGE_ENGINE", "mongo")  # mongo | sqlite
+    STORAGE_FALLBACK: str = os.getenv("STORAGE_FALLBACK", "none")  # none | sqlite (when Mongo is unreachable)
+    SQLITE_PATH: str = os.getenv("SQLITE_PATH", "workout.db")
+    STORAGE_LAYOUT: str = os.getenv("STORAGE_LAYOUT", "embedded")  # embedded | bucketed
+    
+    # Cold archive (must run before the 7-day TTL removes hot days)
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "5"))
+    ARCHIVE_INTERVAL_MINUTES: int = int(os.getenv("ARCHIVE_INTERVAL_MINUTES", "60"))  # 0 = run externally
+    ARCHIVE_COMPRESSION_LEVEL: int = int(os.getenv("ARCHIVE_COMPRESSION_LEVEL", "6"))
+    
+    # Migrations
+    AUTO_MIGRATE: bool = os.getenv("AUTO_MIGRATE", "false").lower() == "true"
+    MIGRATION_BATCH_SIZE: int = int(os.getenv("MIGRATION_BATCH_SIZE", "500"))
+    
+    # Caching
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "none")  # none | local
+    DAY_CACHE_MAX_ENTRIES: int = int(os.getenv("DAY_CACHE_MAX_ENTRIES", "5000"))
+    DAY_CACHE_TODAY_TTL_SECONDS: int = int(os.getenv("DAY_CACHE_TODAY_TTL_SECONDS", "30"))
+    DAY_CACHE_PAST_TTL_SECONDS: int = int(os.getenv("DAY_CACHE_PAST_TTL_SECONDS", "21600"))
+    PROFILE_CACHE_MAX_ENTRIES: int = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "10000"))
+    PROFILE_CACHE_TTL_SECONDS: int = int(os.getenv("PROFILE_CACHE_TTL_SECONDS", "60"))
+    
+    # Batch reads (/data/batch)
+    DATA_BATCH_MAX_DAYS: int = int(os.getenv("DATA_BATCH_MAX_DAYS", "62"))
+    
+    # Live events (/events/stream)
+    EVENTS_BACKEND: str = os.getenv("EVENTS_BACKEND", "none")  # none | mongo
+    EVENTS_BUFFER_SIZE: int = int(os.getenv("EVENTS_BUFFER_SIZE", "100"))
+    EVENTS_HEARTBEAT_SECONDS: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_MAX_STREAMS_PER_USER: int = int(os.getenv("EVENTS_MAX_STREAMS_PER_USER", "5"))
+    EVENTS_CAPPED_BYTES: int = int(os.getenv("EVENTS_CAPPED_BYTES", str(16 * 1024 * 1024)))
+    
+    # Delta sync (/sync)
+    SYNC_LOG_SIZE: int = int(os.getenv("SYNC_LOG_SIZE", "500"))
+    SYNC_MAX_BATCH: int = int(os.getenv("SYNC_MAX_BATCH", "100"))
+    SYNC_MAX_PAST_DAYS: int = int(os.getenv("SYNC_MAX_PAST_DAYS", "3"))
+    
+    # Idempotency-Key support (POST /workout, POST /scan)
+    IDEMPOTENCY_TTL_HOURS: int = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+    IDEMPOTENCY_LOCK_SECONDS: int = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "25"))
+    
+    # Bulk export / import (/export, /import)
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "100"))
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+    IMPORT_MAX_ENTRIES: int = int(os.getenv("IMPORT_MAX_ENTRIES", "200000"))
+    IMPORT_MAX_LINE_BYTES: int = int(os.getenv("IMPORT_MAX_LINE_BYTES", "65536"))
+    
+    # Analytics
+    ANALYTICS_MAX_RANGE_DAYS: int = int(os.getenv("ANALYTICS_MAX_RANGE_DAYS", "366"))
+    ANALYTICS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "2000"))
+    ANALYTICS_CACHE_TTL_SECONDS: int = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "300"))
+    
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+    
+    # Rate limiting - "<requests>/<seconds>" token buckets per route class ("off" disables one)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "none")  # none | local
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_SCAN: str = os.getenv("RATE_LIMIT_SCAN", "20/60")  # per user
+    RATE_LIMIT_AUTH: str = os.getenv("RATE_LIMIT_AUTH", "10/60")  # per client IP, login + register
+    TRUSTED_PROXY_HOPS: int = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))  # reverse proxies appending to X-Forwarded-For
+    
+    # Metrics (GET /metrics, Prometheus text format)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_LOOP_LAG_INTERVAL_SECONDS: float = float(os.getenv("METRICS_LOOP_LAG_INTERVAL_SECONDS", "0.5"))  # 0 disables
+    METRICS_TOKEN: str = os.getenv("METRICS_TOKEN", "")  # bearer token for scrapes; unset = /metrics answers 404
+    
+    # Tracing - Server-Timing header and span export for sampled requests
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "0.01"))
+    TRACING_TRUST_PARENT: bool = os.getenv("TRACING_TRUST_PARENT", "false").lower() == "true"  # sampled traceparent forces tracing
+    TRACING_EXPORTER: str = os.getenv("TRACING_EXPORTER", "none")  # none | local | otlp
+    TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_LOCAL_MAX_TRACES: int = int(os.getenv("TRACING_LOCAL_MAX_TRACES", "100"))
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,41 @@
+"""
+Fast JSON responses backed by orjson
+Handles ObjectId and datetimes natively so raw Mongo documents can be
+returned without a jsonable_encoder pass
+"""
+from typing import Any
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+# Naive datetimes coming back from Mongo are UTC
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    """Fallback for types orjson does not know about"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class ORJSONResponse(JSONResponse):
+    """Default response class - orjson with ObjectId/datetime support"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSONResponse(Response):
+    """Response for JSON that has already been serialized to bytes"""
+    media_type = "application/json"
+
@@ -1,31 +1,101 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import re
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
+import orjson
 from fastapi import HTTPException, status
 from app.core.config import settings
 from app.utils.timezone import get_ist_now
 
+try:
+    import jwt as pyjwt
+except ImportError:  # PyJWT is optional (JWT_BACKEND=pyjwt)
+    pyjwt = None
 
-def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    # Convert password to bytes and hash
-    password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    return hashed.decode('utf-8')
+_HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+# header.payload.signature, base64url without padding
+_COMPACT_JWS = re.compile(r"[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
+# bcrypt releases the GIL, so a few dedicated threads hash in parallel
+# without blocking the event loop; everything else waits its turn
+_password_pool: Optional[ThreadPoolExecutor] = None
+_password_jobs = 0
+
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     try:
-        password_bytes = plain_password.encode('utf-8')
-        hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
     except Exception:
         return False
 
 
+async def _run_password_job(fn, *args):
+    """Run a bcrypt call on the password pool; 503 when too many are already queued"""
+    global _password_pool, _password_jobs
+    if _password_jobs >= settings.BCRYPT_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-in attempts in progress, please retry",
+            headers={"Retry-After": "1"},
+        )
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(settings.BCRYPT_THREADS, thread_name_prefix="bcrypt")
+
+    _password_jobs += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_password_pool, fn, *args)
+    finally:
+        _password_jobs -= 1
+
+
+def shutdown_password_pool() -> None:
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False)
+        _password_pool = None
+
+
+def password_pool_stats() -> dict:
+    """Configured work factor, pool size and bcrypt calls queued or running"""
+    return {
+        "rounds": settings.BCRYPT_ROUNDS,
+        "threads": settings.BCRYPT_THREADS,
+        "pending": _password_jobs,
+        "max_pending": settings.BCRYPT_MAX_PENDING,
+    }
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password using bcrypt at BCRYPT_ROUNDS (off the event loop)"""
+    return await _run_password_job(_hashpw, password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash (off the event loop)"""
+    return await _run_password_job(_checkpw, plain_password, hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash uses a different work factor than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT token"""
     to_encode = data.copy()
@@ -39,13 +109,101 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(token: str) -> dict:
-    """Verify a JWT token and return payload"""
+def new_refresh_token() -> str:
+    """Random opaque refresh token (only its SHA-256 is stored)"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 of a refresh token - tokens are random, so no slow hash is needed"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _is_timestamp(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _decode_jose(token: str) -> Optional[dict]:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return {"user_id": user_id}
+        return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
     except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        return None
+
+
+def _decode_pyjwt(token: str) -> Optional[dict]:
+    try:
+        return pyjwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except pyjwt.PyJWTError:
+        return None
+
+
+def _decode_builtin(token: str) -> Optional[dict]:
+    """HS256/384/512 with the standard library; other algorithms go through jose"""
+    digestmod = _HMAC_ALGORITHMS.get(settings.JWT_ALGORITHM)
+    if digestmod is None:
+        return _decode_jose(token)
+    if not _COMPACT_JWS.fullmatch(token):
+        return None
+
+    signing_input, _, signature = token.rpartition(".")
+    header_segment, _, payload_segment = signing_input.partition(".")
+    try:
+        header = orjson.loads(_b64decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != settings.JWT_ALGORITHM:
+            return None
+        expected = hmac.new(settings.JWT_SECRET.encode("utf-8"), signing_input.encode("ascii"), digestmod).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        payload = orjson.loads(_b64decode(payload_segment))
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+
+    # Same claim checks as jose: exp and nbf when present, no leeway
+    now = time.time()
+    exp, nbf = payload.get("exp"), payload.get("nbf")
+    if exp is not None and (not _is_timestamp(exp) or exp < now):
+        return None
+    if nbf is not None and (not _is_timestamp(nbf) or nbf > now):
+        return None
+    return payload
+
+
+_DECODERS = {"jose": _decode_jose, "pyjwt": _decode_pyjwt, "builtin": _decode_builtin}
+
+
+def jwt_backend() -> str:
+    """JWT_BACKEND in effect (jose when it is unknown or PyJWT is not installed)"""
+    backend = settings.JWT_BACKEND
+    if backend not in _DECODERS or (backend == "pyjwt" and pyjwt is None):
+        return "jose"
+    return backend
+
+
+def verify_token(token: str) -> dict:
+    """
+    Verify a JWT token with the configured backend
+
+    Args:
+        token: Encoded JWT from the Authorization header
+
+    Returns:
+        {"user_id": token subject, "exp": expiry as a Unix timestamp or None}
+
+    Raises:
+        HTTPException: 401 if the signature, algorithm or claims are invalid
+    """
+    payload = _DECODERS[jwt_backend()](token)
+    user_id = payload.get("sub") if payload else None
+    if not isinstance(user_id, str) or not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {"user_id": user_id, "exp": payload.get("exp")}
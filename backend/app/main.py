@@ -1,10 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.models.database import connect_to_mongo, close_mongo_connection
-from app.routes import auth, scan, workout, history, health, users
+from app.models.database import connect_storage, close_storage, current_storage
+from app.models.archive import run_archiver
+from app.routes import auth, scan, workout, history, health, users, analytics, events, sync, bulk, metrics
 from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.core.compression import CompressionMiddleware
+from app.core.security import shutdown_password_pool
+from app.utils.events import create_event_backend, event_broker
+from app.utils.metrics import MetricsMiddleware, monitor_event_loop
+from app.utils.tracing import TracingMiddleware, create_span_exporter, tracer
 from typing import Optional, Any
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +23,8 @@ class AppState:
     model: Optional[Any] = None
     input_details: Optional[list] = None
     output_details: Optional[list] = None
+    archiver: Optional[asyncio.Task] = None
+    loop_monitor: Optional[asyncio.Task] = None
 
 
 app_state = AppState()
@@ -30,8 +40,28 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 Starting up application...")
     
     try:
-        # Connect to MongoDB
-        await connect_to_mongo()
+        # Connect to MongoDB (or the embedded SQLite engine)
+        await connect_storage()
+        
+        # Live events; optionally shared across workers
+        event_broker.start(create_event_backend(settings.EVENTS_BACKEND, current_storage()))
+        
+        # Roll expiring days into the cold archive in-process (0 = run externally)
+        if settings.ARCHIVE_INTERVAL_MINUTES > 0:
+            app_state.archiver = asyncio.create_task(
+                run_archiver(current_storage, settings.ARCHIVE_INTERVAL_MINUTES)
+            )
+            logger.info(f"✓ Archiver running every {settings.ARCHIVE_INTERVAL_MINUTES} min")
+        
+        # Export sampled request traces (optional)
+        if settings.TRACING_ENABLED:
+            tracer.start(create_span_exporter(settings.TRACING_EXPORTER))
+        
+        # Sample event-loop lag for /metrics
+        if settings.METRICS_ENABLED and settings.METRICS_LOOP_LAG_INTERVAL_SECONDS > 0:
+            app_state.loop_monitor = asyncio.create_task(
+                monitor_event_loop(settings.METRICS_LOOP_LAG_INTERVAL_SECONDS)
+            )
         
         # Load TensorFlow Lite model for food detection (lightweight!)
         if not settings.SKIP_TFLITE:
@@ -70,7 +100,14 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Shutting down application...")
     try:
-        await close_mongo_connection()
+        if app_state.archiver:
+            app_state.archiver.cancel()
+        if app_state.loop_monitor:
+            app_state.loop_monitor.cancel()
+        await event_broker.stop()
+        await tracer.stop()
+        await close_storage()
+        shutdown_password_pool()
         logger.info("✓ Application shutdown complete")
     except Exception as e:
         logger.error(f"❌ Shutdown error: {e}")
@@ -82,6 +119,15 @@ app = FastAPI(
     description="Production-ready FastAPI backend for fitness tracking",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Compress large response bodies (gzip, or brotli when installed)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
 )
 
 # Add CORS middleware with explicit configuration
@@ -95,6 +141,14 @@ app.add_middleware(
     max_age=3600,  # Cache preflight requests for 1 hour
 )
 
+# Server-Timing header and spans for sampled requests
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# Request latency per route for /metrics (outermost, so it times the whole stack)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routes
 app.include_router(health.router)
 app.include_router(auth.router)
@@ -102,6 +156,12 @@ app.include_router(users.router)
 app.include_router(scan.router)
 app.include_router(workout.router)
 app.include_router(history.router)
+app.include_router(analytics.router)
+app.include_router(events.router)
+app.include_router(sync.router)
+app.include_router(bulk.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -0,0 +1,236 @@
+"""
+Cold archive for daily logs
+Days are rolled into one compressed, columnar document per user and month
+(`daily_archive`) before the 7-day TTL removes them from the hot collection:
+
+    {
+      "user_id": "...",
+      "month": 19754,                     # day number of the 1st of the month
+      "days": [19776, 19777],             # one slot per archived day
+      "ids": [ObjectId, ObjectId],        # original daily_logs _id (stable ETags)
+      "versions": [4, 2],
+      "nutrition": {"total_calories": [2150, 1800], ...},
+      "workout_counts": [3, 0],           # plus workout_volume / workout_duration
+      "entries": Binary,                  # zlib(BSON {"workouts": [[...]], "items": [[...]]})
+      "version": 7                        # archive document revision
+    }
+
+Totals stay uncompressed so long-range scans never touch the entry payload.
+Run out of band (e.g. daily from cron):
+
+    python -m app.models.archive [--older-than DAYS]
+
+or in-process every ARCHIVE_INTERVAL_MINUTES (the default; 0 disables it).
+"""
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models.codec import month_key, pack_columns, unpack_columns
+from app.models.daily_logs import (
+    ARCHIVE_COLLECTION, ENTRIES_COLLECTION, NUTRITION_TOTALS, WORKOUT, items_totals, workout_stats,
+)
+from app.utils.timezone import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+# Optimistic concurrency retries when two archivers touch the same month
+MAX_ATTEMPTS = 3
+
+
+def _day_record(day: dict, entries: List[dict]) -> dict:
+    """Stored day (either layout) -> one archive slot"""
+    nutrition = day.get("nutrition", {})
+    workouts = list(day.get("workouts", []))
+    items = list(nutrition.get("items", []))
+    for entry in entries:
+        (workouts if entry["kind"] == WORKOUT else items).append(entry["entry"])
+
+    # Bucketed days are summed from their entries, as daily_logs reads them
+    if "seq" in day:
+        totals = items_totals(items)
+    else:
+        totals = {field: nutrition.get(field, 0) for field in NUTRITION_TOTALS}
+
+    return {
+        "id": day["_id"],
+        "version": day.get("version", 0),
+        "totals": totals,
+        "workouts": workouts,
+        "items": items,
+    }
+
+
+def _unpack_archive(archive: Optional[dict]) -> Dict[int, dict]:
+    """Archive document -> {day number: slot}"""
+    if not archive:
+        return {}
+    columns = unpack_columns(archive["entries"])
+    return {
+        day: {
+            "id": archive["ids"][index],
+            "version": archive["versions"][index],
+            "totals": {field: values[index] for field, values in archive["nutrition"].items()},
+            "workouts": columns["workouts"][index],
+            "items": columns["items"][index],
+        }
+        for index, day in enumerate(archive["days"])
+    }
+
+
+def _pack_archive(records: Dict[int, dict]) -> dict:
+    """{day number: slot} -> archive document columns"""
+    days = sorted(records)
+    stats = [workout_stats(records[day]["workouts"]) for day in days]
+    return {
+        "days": days,
+        "ids": [records[day]["id"] for day in days],
+        "versions": [records[day]["version"] for day in days],
+        "nutrition": {
+            field: [records[day]["totals"].get(field, 0) for day in days]
+            for field in NUTRITION_TOTALS
+        },
+        "workout_counts": [day_stats["workouts"] for day_stats in stats],
+        "workout_volume": [day_stats["volume"] for day_stats in stats],
+        "workout_duration": [day_stats["duration"] for day_stats in stats],
+        "entries": pack_columns(
+            {
+                "workouts": [records[day]["workouts"] for day in days],
+                "items": [records[day]["items"] for day in days],
+            },
+            settings.ARCHIVE_COMPRESSION_LEVEL,
+        ),
+        "updatedAt": get_ist_now(),
+    }
+
+
+async def _archive_month(db: AsyncIOMotorDatabase, user_id: str, month: int, days: List[dict]) -> int:
+    """
+    Merge hot days into a user's archive document for one month
+    Slots are only rewritten when the hot version differs, so re-running
+    the job is cheap and idempotent
+
+    Returns:
+        Number of days written
+    """
+    bucketed = [day["day"] for day in days if "seq" in day]
+    entries_by_day: Dict[int, List[dict]] = defaultdict(list)
+    if bucketed:
+        async for entry in db[ENTRIES_COLLECTION].find(
+            {"user_id": user_id, "day": {"$in": bucketed}}
+        ).sort([("day", 1), ("seq", 1)]):
+            entries_by_day[entry["day"]].append(entry)
+
+    fresh = {day["day"]: _day_record(day, entries_by_day.get(day["day"], [])) for day in days}
+    archives = db[ARCHIVE_COLLECTION]
+
+    for _ in range(MAX_ATTEMPTS):
+        archive = await archives.find_one({"user_id": user_id, "month": month})
+        records = _unpack_archive(archive)
+        changed = [
+            day for day, record in fresh.items()
+            if day not in records or records[day]["version"] != record["version"]
+        ]
+        if not changed:
+            return 0
+
+        records.update({day: fresh[day] for day in changed})
+        document = _pack_archive(records)
+
+        if archive is None:
+            try:
+                await archives.insert_one({"user_id": user_id, "month": month, "version": 1, **document})
+                return len(changed)
+            except DuplicateKeyError:
+                continue
+
+        result = await archives.update_one(
+            {"_id": archive["_id"], "version": archive["version"]},
+            {"$set": document, "$inc": {"version": 1}},
+        )
+        if result.matched_count:
+            return len(changed)
+
+    logger.warning(f"Gave up archiving month {month} for user {user_id} after {MAX_ATTEMPTS} attempts")
+    return 0
+
+
+async def archive_days(db: AsyncIOMotorDatabase, older_than_days: Optional[int] = None) -> int:
+    """
+    Copy hot days created more than `older_than_days` ago into the archive
+
+    Args:
+        db: Database instance
+        older_than_days: Age threshold (default: settings.ARCHIVE_AFTER_DAYS);
+            must stay below the 7-day TTL
+
+    Returns:
+        Number of days written to the archive
+    """
+    older_than_days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = get_ist_now() - timedelta(days=older_than_days)
+
+    cursor = db["daily_logs"].find(
+        {"createdAt": {"$lte": cutoff}, "day": {"$exists": True}},
+        batch_size=settings.MIGRATION_BATCH_SIZE,
+    ).sort([("user_id", 1), ("day", 1)])
+
+    archived = 0
+    group: List[dict] = []
+    group_key = None
+    async for day in cursor:
+        key = (day["user_id"], month_key(day["day"]))
+        if group and key != group_key:
+            archived += await _archive_month(db, *group_key, group)
+            group = []
+        group_key = key
+        group.append(day)
+    if group:
+        archived += await _archive_month(db, *group_key, group)
+
+    return archived
+
+
+async def run_archiver(get_storage, interval_minutes: int) -> None:
+    """
+    Background loop used unless ARCHIVE_INTERVAL_MINUTES is 0
+
+    Args:
+        get_storage: Returns the active storage engine (or None)
+        interval_minutes: Pause between runs
+    """
+    while True:
+        storage = get_storage()
+        if storage is not None:
+            try:
+                archived = await storage.archive_days()
+                if archived:
+                    logger.info(f"✓ Archived {archived} day(s)")
+            except Exception as e:
+                logger.error(f"❌ Archive run failed: {e}")
+        await asyncio.sleep(interval_minutes * 60)
+
+
+async def _main(older_than_days: Optional[int]) -> None:
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    try:
+        archived = await archive_days(client.get_database(), older_than_days)
+        print(f"✓ Archived {archived} day(s)")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Roll expiring daily logs into the cold archive")
+    parser.add_argument("--older-than", type=int, default=None,
+                        help="archive days created more than N days ago (default ARCHIVE_AFTER_DAYS)")
+    args = parser.parse_args()
+    asyncio.run(_main(args.older_than))
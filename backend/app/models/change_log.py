@@ -0,0 +1,78 @@
+"""
+Per-user change log for delta sync (GET /sync)
+One document per user in `change_log`:
+
+    {"_id": "<user_id>", "seq": 42, "changes": [{"seq": 41, "date": "2024-02-23"},
+                                                {"seq": 42, "fields": ["proteinGoal"]}]}
+
+Every write path appends a record after its data write has completed, in
+the same atomic update that allocates the sequence number. A reader that
+sees seq N is therefore guaranteed to read the data written by every
+change up to N. Only the last SYNC_LOG_SIZE records are kept; older
+cursors get a reset.
+"""
+from typing import List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+CHANGE_LOG_COLLECTION = "change_log"
+
+
+async def record_change(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    date: Optional[str],
+    fields: Optional[List[str]],
+    keep: int,
+) -> int:
+    """
+    Append a change record for a user
+
+    Args:
+        db: Database instance
+        user_id: Owner of the change
+        date: Day whose entries / totals changed (YYYY-MM-DD), if any
+        fields: Profile fields that changed, if any
+        keep: Number of records to retain
+
+    Returns:
+        The record's sequence number
+    """
+    record = {"seq": "$seq"}
+    if date:
+        record["date"] = {"$literal": date}
+    if fields:
+        record["fields"] = {"$literal": sorted(fields)}
+
+    log = await db[CHANGE_LOG_COLLECTION].find_one_and_update(
+        {"_id": user_id},
+        [
+            {"$set": {"seq": {"$add": [{"$ifNull": ["$seq", 0]}, 1]}}},
+            {"$set": {"changes": {"$slice": [
+                {"$concatArrays": [{"$ifNull": ["$changes", []]}, [record]]},
+                -keep,
+            ]}}},
+        ],
+        projection={"seq": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return log["seq"]
+
+
+async def get_changes(db: AsyncIOMotorDatabase, user_id: str, since: int) -> dict:
+    """
+    Change records after a cursor
+
+    Returns:
+        {"seq": latest seq, "oldest": oldest retained seq, "changes": records with seq > since}
+    """
+    log = await db[CHANGE_LOG_COLLECTION].find_one({"_id": user_id})
+    if not log:
+        return {"seq": 0, "oldest": 1, "changes": []}
+    changes = log.get("changes", [])
+    return {
+        "seq": log["seq"],
+        "oldest": changes[0]["seq"] if changes else log["seq"] + 1,
+        "changes": [change for change in changes if change["seq"] > since],
+    }
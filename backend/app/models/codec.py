@@ -0,0 +1,123 @@
+"""
+Compact storage encoding for daily log documents
+Stored documents use BSON UUID binaries (subtype 4) for entry ids, native
+BSON datetimes for entry timestamps and an integer day number instead of
+the "YYYY-MM-DD" string. These helpers translate to and from the public
+JSON shape, which stays unchanged.
+"""
+import zlib
+from datetime import date as date_cls, datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+import bson
+from bson.binary import Binary, UuidRepresentation
+
+from app.utils.timezone import utc_to_ist
+
+EPOCH = date_cls(1970, 1, 1)
+
+
+def day_number(date: str) -> int:
+    """
+    Convert a YYYY-MM-DD string to days since 1970-01-01
+
+    Args:
+        date: Date string in YYYY-MM-DD format
+
+    Returns:
+        Integer day number used as the stored range key
+    """
+    return (date_cls.fromisoformat(date) - EPOCH).days
+
+
+def day_string(day: int) -> str:
+    """Convert a stored day number back to YYYY-MM-DD"""
+    return (EPOCH + timedelta(days=day)).isoformat()
+
+
+def month_key(day: int) -> int:
+    """Day number of the first day of the month containing `day`"""
+    first = (EPOCH + timedelta(days=day)).replace(day=1)
+    return (first - EPOCH).days
+
+
+def pack_columns(columns: dict, level: int = 6) -> Binary:
+    """Serialize a dict of columns to zlib-compressed BSON"""
+    return Binary(zlib.compress(bson.encode(columns), level))
+
+
+def unpack_columns(blob: bytes) -> dict:
+    """Inverse of pack_columns"""
+    return bson.decode(zlib.decompress(blob))
+
+
+def encode_id(entry_id) -> Binary:
+    """Entry id (UUID string) -> BSON binary subtype 4"""
+    if isinstance(entry_id, Binary):
+        return entry_id
+    return Binary.from_uuid(UUID(str(entry_id)), UuidRepresentation.STANDARD)
+
+
+def decode_id(entry_id) -> str:
+    """Stored entry id -> canonical UUID string (legacy strings pass through)"""
+    if isinstance(entry_id, Binary):
+        return str(entry_id.as_uuid(UuidRepresentation.STANDARD))
+    if isinstance(entry_id, UUID):
+        return str(entry_id)
+    return entry_id
+
+
+def encode_timestamp(value) -> datetime:
+    """ISO timestamp string -> datetime (stored as a native BSON date)"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def decode_timestamp(value) -> str:
+    """Stored timestamp -> IST ISO string (legacy strings pass through)"""
+    if isinstance(value, datetime):
+        return utc_to_ist(value).isoformat()
+    return value
+
+
+def encode_entry(entry: dict) -> dict:
+    """Public workout/food entry -> stored form"""
+    stored = dict(entry)
+    if "id" in stored:
+        stored["id"] = encode_id(stored["id"])
+    if "date" in stored:
+        stored["date"] = encode_timestamp(stored["date"])
+    return stored
+
+
+def decode_entry(entry: dict) -> dict:
+    """Stored workout/food entry -> public form"""
+    public = dict(entry)
+    if "id" in public:
+        public["id"] = decode_id(public["id"])
+    if "date" in public:
+        public["date"] = decode_timestamp(public["date"])
+    return public
+
+
+def decode_day(day: Optional[dict]) -> Optional[dict]:
+    """
+    Stored day document -> public shape
+    Restores the "date" string and decodes every embedded entry
+    """
+    if day is None:
+        return None
+
+    public = dict(day)
+    if "day" in public:
+        public["date"] = day_string(public.pop("day"))
+    if "workouts" in public:
+        public["workouts"] = [decode_entry(w) for w in public["workouts"]]
+    if "nutrition" in public and "items" in public["nutrition"]:
+        public["nutrition"] = {
+            **public["nutrition"],
+            "items": [decode_entry(item) for item in public["nutrition"]["items"]],
+        }
+    return public
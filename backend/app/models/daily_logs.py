@@ -0,0 +1,786 @@
+"""
+Data access helpers for the daily_logs collection
+Every write path goes through here so the per-document version
+counter (used for ETags) is always incremented
+
+Two storage layouts are supported (settings.STORAGE_LAYOUT):
+- embedded: entries live in the day document's workouts / nutrition.items arrays
+- bucketed: entries live in `daily_entries`, keyed by (user_id, day, seq),
+  and the day document only holds totals, an entry counter and the version
+Readers handle both shapes per document, so a database can be converted
+between layouts while the API is running
+
+Days older than the 7-day TTL are served from the cold archive
+(`daily_archive`, written by app/models/archive.py); a hot document
+always takes precedence over its archived copy
+
+Documents are stored in the compact encoding from app/models/codec.py
+(integer `day` keys, binary entry ids, native timestamps); callers pass
+and receive the public shape with "YYYY-MM-DD" dates
+"""
+from collections import defaultdict
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.models.codec import (
+    day_number, day_string, decode_day, decode_entry, encode_entry, encode_id, month_key, unpack_columns,
+)
+from app.models.schemas import empty_nutrition
+from app.utils.timezone import get_ist_now, get_ist_date_string
+
+# Projection used by conditional requests - never loads the entry arrays
+VERSION_PROJECTION = {"_id": 1, "day": 1, "version": 1}
+
+ENTRIES_COLLECTION = "daily_entries"
+ARCHIVE_COLLECTION = "daily_archive"
+# Archive columns needed for ETags - skips the compressed entry payload
+ARCHIVE_VERSION_PROJECTION = {"days": 1, "ids": 1, "versions": 1}
+WORKOUT = "workout"
+FOOD = "food"
+NUTRITION_TOTALS = ("total_calories", "total_protein", "total_carbs", "total_fat", "total_fiber")
+# Food entry field -> day total it feeds
+FOOD_TOTALS = {field.removeprefix("total_"): field for field in NUTRITION_TOTALS}
+WORKOUT_STATS = ("workouts", "volume", "duration")
+
+# Aggregation expressions for workout stats over an embedded workouts array
+_WORKOUTS = {"$ifNull": ["$workouts", []]}
+_WORKOUT_STATS_PROJECTION = {
+    "workouts": {"$size": _WORKOUTS},
+    "volume": {"$sum": {"$map": {
+        "input": _WORKOUTS,
+        "as": "w",
+        "in": {"$multiply": [
+            {"$ifNull": ["$$w.sets", 0]},
+            {"$ifNull": ["$$w.reps", 0]},
+            {"$ifNull": ["$$w.weight", 0]},
+        ]},
+    }}},
+    "duration": {"$sum": "$workouts.duration"},
+}
+_IS_WORKOUT = {"$eq": ["$kind", WORKOUT]}
+
+
+def workout_stats(workouts: List[dict]) -> dict:
+    """Count, volume (sets x reps x weight) and total duration of workouts"""
+    return {
+        "workouts": len(workouts),
+        "volume": sum((w.get("sets") or 0) * (w.get("reps") or 0) * (w.get("weight") or 0) for w in workouts),
+        "duration": sum(w.get("duration") or 0 for w in workouts),
+    }
+
+
+def food_totals(food_entry: dict) -> dict:
+    """Day totals added by a food entry, keyed by total field"""
+    return {total: food_entry.get(field) or 0 for field, total in FOOD_TOTALS.items()}
+
+
+def items_totals(items: List[dict]) -> dict:
+    """Day totals of a list of food items, keyed by total field"""
+    totals = dict.fromkeys(NUTRITION_TOTALS, 0)
+    for item in items:
+        for total, value in food_totals(item).items():
+            totals[total] += value
+    return totals
+
+
+def is_bucketed() -> bool:
+    """Whether new entries are written to the bucketed layout"""
+    return settings.STORAGE_LAYOUT == "bucketed"
+
+
+def _merge_entries(day: dict, entries: List[dict]) -> dict:
+    """
+    Fold bucketed entry documents into the embedded day shape
+    Nutrition totals are summed from the items rather than read from the
+    day document, which an interrupted bucketed edit can leave behind
+    """
+    nutrition = {**empty_nutrition(), **day.get("nutrition", {})}
+    workouts = list(day.get("workouts", []))
+    items = list(nutrition.get("items", []))
+
+    for entry in entries:
+        if entry["kind"] == WORKOUT:
+            workouts.append(decode_entry(entry["entry"]))
+        else:
+            items.append(decode_entry(entry["entry"]))
+
+    nutrition.update(items_totals(items))
+    nutrition["items"] = items
+    day["workouts"] = workouts
+    day["nutrition"] = nutrition
+    return day
+
+
+def _archived_day(archive: dict, index: int, columns: dict) -> dict:
+    """Rebuild one day (embedded shape) from the columns of an archive document"""
+    nutrition = {field: values[index] for field, values in archive["nutrition"].items()}
+    nutrition["items"] = [decode_entry(item) for item in columns["items"][index]]
+    return {
+        "_id": archive["ids"][index],
+        "user_id": archive["user_id"],
+        "date": day_string(archive["days"][index]),
+        "workouts": [decode_entry(w) for w in columns["workouts"][index]],
+        "nutrition": nutrition,
+        "version": archive["versions"][index],
+        "archived": True,
+    }
+
+
+async def _get_archived(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    start_day: int,
+    end_day: int,
+    versions_only: bool = False,
+) -> List[dict]:
+    """
+    Read archived days in an inclusive day-number range
+
+    Args:
+        versions_only: Return only _id, day and version (no decompression)
+    """
+    query = {"user_id": user_id, "month": {"$gte": month_key(start_day), "$lte": month_key(end_day)}}
+    projection = ARCHIVE_VERSION_PROJECTION if versions_only else None
+    days = []
+
+    async for archive in db[ARCHIVE_COLLECTION].find(query, projection).sort("month", 1):
+        columns = None if versions_only else unpack_columns(archive["entries"])
+        for index, day in enumerate(archive["days"]):
+            if not start_day <= day <= end_day:
+                continue
+            if versions_only:
+                days.append({"_id": archive["ids"][index], "day": day, "version": archive["versions"][index]})
+            else:
+                days.append(_archived_day(archive, index, columns))
+    return days
+
+
+def _may_be_archived(date: str) -> bool:
+    """Only past days can have an archived copy"""
+    return date < get_ist_date_string()
+
+
+async def get_day(db: AsyncIOMotorDatabase, user_id: str, date: str) -> Optional[dict]:
+    """
+    Fetch the full daily log for a user and date
+
+    Args:
+        db: Database instance
+        user_id: Owner of the log
+        date: Date in YYYY-MM-DD format
+
+    Returns:
+        The document in the embedded shape, or None if the day has no data
+    """
+    key = {"user_id": user_id, "day": day_number(date)}
+    day = decode_day(await db["daily_logs"].find_one(key))
+    if day is None and _may_be_archived(date):
+        archived = await _get_archived(db, user_id, key["day"], key["day"])
+        return archived[0] if archived else None
+    if not day or "seq" not in day:
+        return day
+
+    entries = await db[ENTRIES_COLLECTION].find(key).sort("seq", 1).to_list(None)
+    return _merge_entries(day, entries)
+
+
+async def get_day_version(db: AsyncIOMotorDatabase, user_id: str, date: str) -> Optional[dict]:
+    """
+    Fetch only the identity and version of a daily log
+
+    Returns:
+        Document with _id, day and version, or None
+    """
+    version_doc = await db["daily_logs"].find_one(
+        {"user_id": user_id, "day": day_number(date)},
+        VERSION_PROJECTION,
+    )
+    if version_doc is None and _may_be_archived(date):
+        archived = await _get_archived(db, user_id, day_number(date), day_number(date), versions_only=True)
+        return archived[0] if archived else None
+    return version_doc
+
+
+def _with_archived(hot: List[dict], archived: List[dict], key: str) -> List[dict]:
+    """Fill days missing from the hot list with archived ones, ordered by key"""
+    if not archived:
+        return hot
+    hot_keys = {day[key] for day in hot}
+    merged = hot + [day for day in archived if day[key] not in hot_keys]
+    return sorted(merged, key=lambda day: day[key])
+
+
+async def get_days(db: AsyncIOMotorDatabase, user_id: str, start_date: str, end_date: str) -> List[dict]:
+    """Fetch all daily logs in an inclusive date range (embedded shape), hot and archived"""
+    day_range = {"$gte": day_number(start_date), "$lte": day_number(end_date)}
+    days = [
+        decode_day(day)
+        async for day in db["daily_logs"].find({"user_id": user_id, "day": day_range}).sort("day", 1)
+    ]
+
+    if any("seq" in day for day in days):
+        by_day: Dict[int, List[dict]] = defaultdict(list)
+        async for entry in db[ENTRIES_COLLECTION].find(
+            {"user_id": user_id, "day": day_range}
+        ).sort([("day", 1), ("seq", 1)]):
+            by_day[entry["day"]].append(entry)
+        days = [_merge_entries(day, by_day.get(day_number(day["date"]), [])) for day in days]
+
+    archived = await _get_archived(db, user_id, day_range["$gte"], day_range["$lte"])
+    return _with_archived(days, archived, "date")
+
+
+async def get_day_versions(db: AsyncIOMotorDatabase, user_id: str, start_date: str, end_date: str) -> List[dict]:
+    """Fetch identity and version of all daily logs in a range, hot and archived"""
+    start_day, end_day = day_number(start_date), day_number(end_date)
+    hot = await db["daily_logs"].find(
+        {"user_id": user_id, "day": {"$gte": start_day, "$lte": end_day}},
+        VERSION_PROJECTION,
+    ).sort("day", 1).to_list(None)
+    archived = await _get_archived(db, user_id, start_day, end_day, versions_only=True)
+    return _with_archived(hot, archived, "day")
+
+
+async def get_workout_dates(db: AsyncIOMotorDatabase, user_id: str) -> List[str]:
+    """
+    Every date with at least one workout, across both layouts and the archive
+
+    Returns:
+        Sorted YYYY-MM-DD strings
+    """
+    days = set(await db["daily_logs"].distinct(
+        "day", {"user_id": user_id, "workouts.0": {"$exists": True}}
+    ))
+    days.update(await db[ENTRIES_COLLECTION].distinct("day", {"user_id": user_id, "kind": WORKOUT}))
+
+    archives = db[ARCHIVE_COLLECTION]
+    async for archive in archives.find({"user_id": user_id}, {"days": 1, "workout_counts": 1}):
+        counts = archive.get("workout_counts")
+        if counts is None:
+            # Archived before workout_counts existed - read the entry payload
+            payload = await archives.find_one({"_id": archive["_id"]}, {"entries": 1})
+            counts = [len(w) for w in unpack_columns(payload["entries"])["workouts"]]
+        days.update(day for day, count in zip(archive["days"], counts) if count)
+
+    return [day_string(day) for day in sorted(days)]
+
+
+async def _get_archived_totals(db: AsyncIOMotorDatabase, user_id: str, start_day: int, end_day: int) -> List[dict]:
+    """Per-day totals from archive columns; the entry payload is only read for old documents"""
+    archives = db[ARCHIVE_COLLECTION]
+    rows = []
+    async for archive in archives.find(
+        {"user_id": user_id, "month": {"$gte": month_key(start_day), "$lte": month_key(end_day)}},
+        {"entries": 0},
+    ).sort("month", 1):
+        if "workout_volume" in archive:
+            stats = [
+                dict(zip(WORKOUT_STATS, values))
+                for values in zip(archive["workout_counts"], archive["workout_volume"], archive["workout_duration"])
+            ]
+        else:
+            payload = await archives.find_one({"_id": archive["_id"]}, {"entries": 1})
+            stats = [workout_stats(w) for w in unpack_columns(payload["entries"])["workouts"]]
+
+        for index, day in enumerate(archive["days"]):
+            if start_day <= day <= end_day:
+                rows.append({
+                    "day": day,
+                    **{field: values[index] for field, values in archive["nutrition"].items()},
+                    **stats[index],
+                })
+    return rows
+
+
+async def get_daily_totals(db: AsyncIOMotorDatabase, user_id: str, start_date: str, end_date: str) -> List[dict]:
+    """
+    Per-day nutrition totals and workout stats for a range, without loading entries
+    Aggregates on the (user_id, day) index and projects totals only; bucketed
+    days are summed per day from daily_entries (see _merge_entries)
+
+    Returns:
+        Rows with date, NUTRITION_TOTALS and WORKOUT_STATS, ordered by date
+    """
+    day_range = {"$gte": day_number(start_date), "$lte": day_number(end_date)}
+    rows = await db["daily_logs"].aggregate([
+        {"$match": {"user_id": user_id, "day": day_range}},
+        {"$project": {
+            "_id": 0,
+            "day": 1,
+            "seq": 1,
+            **{field: {"$ifNull": [f"$nutrition.{field}", 0]} for field in NUTRITION_TOTALS},
+            **_WORKOUT_STATS_PROJECTION,
+            "items": {total: {"$sum": f"$nutrition.items.{field}"} for field, total in FOOD_TOTALS.items()},
+        }},
+        {"$sort": {"day": 1}},
+    ]).to_list(None)
+
+    if any("seq" in row for row in rows):
+        bucketed = {
+            group["_id"]: group
+            async for group in db[ENTRIES_COLLECTION].aggregate([
+                {"$match": {"user_id": user_id, "day": day_range}},
+                {"$group": {
+                    "_id": "$day",
+                    "workouts": {"$sum": {"$cond": [_IS_WORKOUT, 1, 0]}},
+                    "volume": {"$sum": {"$cond": [_IS_WORKOUT, {"$multiply": [
+                        {"$ifNull": ["$entry.sets", 0]},
+                        {"$ifNull": ["$entry.reps", 0]},
+                        {"$ifNull": ["$entry.weight", 0]},
+                    ]}, 0]}},
+                    "duration": {"$sum": {"$cond": [_IS_WORKOUT, "$entry.duration", 0]}},
+                    **{
+                        total: {"$sum": {"$cond": [_IS_WORKOUT, 0, f"$entry.{field}"]}}
+                        for field, total in FOOD_TOTALS.items()
+                    },
+                }},
+            ])
+        }
+        for row in rows:
+            if "seq" not in row:
+                continue
+            day_entries = bucketed.get(row["day"], {})
+            for field in WORKOUT_STATS:
+                row[field] = row.get(field, 0) + day_entries.get(field, 0)
+            for field in NUTRITION_TOTALS:
+                row[field] = row["items"].get(field, 0) + day_entries.get(field, 0)
+
+    archived = await _get_archived_totals(db, user_id, day_range["$gte"], day_range["$lte"])
+    return [
+        {"date": day_string(row.pop("day")), **{k: v for k, v in row.items() if k not in ("seq", "items")}}
+        for row in _with_archived(rows, archived, "day")
+    ]
+
+
+async def _add_bucketed_entries(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    date: str,
+    entries: List[Tuple[str, dict]],
+    increments: dict,
+) -> None:
+    """
+    Write (kind, entry) pairs for one day to the bucketed layout
+    The entries are stored before the version bump, so a reader that sees
+    a new entry with the old version will still revalidate after the bump
+    """
+    zero_totals = {
+        f"nutrition.{field}": 0
+        for field in NUTRITION_TOTALS
+        if f"nutrition.{field}" not in increments
+    }
+    day = await db["daily_logs"].find_one_and_update(
+        {"user_id": user_id, "day": day_number(date)},
+        {
+            "$inc": {"seq": len(entries)},
+            "$setOnInsert": {**zero_totals, "createdAt": get_ist_now()},
+        },
+        projection={"seq": 1, "createdAt": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    first_seq = day["seq"] - len(entries) + 1
+    await db[ENTRIES_COLLECTION].insert_many([
+        {
+            "user_id": user_id,
+            "day": day_number(date),
+            "seq": first_seq + index,
+            "kind": kind,
+            "entry": encode_entry(entry),
+            "createdAt": day["createdAt"],
+        }
+        for index, (kind, entry) in enumerate(entries)
+    ])
+
+    await db["daily_logs"].update_one(
+        {"_id": day["_id"]},
+        {"$inc": {**increments, "version": 1}},
+    )
+
+
+async def add_workout(db: AsyncIOMotorDatabase, user_id: str, date: str, workout_entry: dict) -> None:
+    """
+    Append a workout to a day, creating the day if needed
+
+    Args:
+        db: Database instance
+        user_id: Owner of the log
+        date: Date in YYYY-MM-DD format
+        workout_entry: Workout entry to append
+    """
+    if is_bucketed():
+        await _add_bucketed_entries(db, user_id, date, [(WORKOUT, workout_entry)], {})
+        return
+
+    await db["daily_logs"].update_one(
+        {"user_id": user_id, "day": day_number(date)},
+        {
+            "$push": {"workouts": encode_entry(workout_entry)},
+            "$inc": {"version": 1},
+            "$setOnInsert": {
+                "nutrition": empty_nutrition(),
+                "createdAt": get_ist_now(),
+            },
+        },
+        upsert=True,
+    )
+
+
+async def add_food_item(db: AsyncIOMotorDatabase, user_id: str, date: str, food_entry: dict, totals: dict) -> None:
+    """
+    Append a food item to a day and increment its nutrition totals
+
+    Args:
+        db: Database instance
+        user_id: Owner of the log
+        date: Date in YYYY-MM-DD format
+        food_entry: Food entry to append
+        totals: Amounts to add, keyed by total field (e.g. "total_calories")
+    """
+    increments = {f"nutrition.{field}": value for field, value in totals.items()}
+
+    if is_bucketed():
+        await _add_bucketed_entries(db, user_id, date, [(FOOD, food_entry)], increments)
+        return
+
+    await db["daily_logs"].update_one(
+        {"user_id": user_id, "day": day_number(date)},
+        {
+            "$push": {"nutrition.items": encode_entry(food_entry)},
+            "$inc": {**increments, "version": 1},
+            "$setOnInsert": {
+                "workouts": [],
+                "createdAt": get_ist_now(),
+            },
+        },
+        upsert=True,
+    )
+
+
+async def add_entry_if_absent(db: AsyncIOMotorDatabase, user_id: str, date: str, kind: str, entry: dict) -> bool:
+    """
+    Append an entry unless the day already holds one with the same id
+    The check and the write are one operation: embedded days filter the
+    upsert on the id, bucketed entries rely on the unique entry-id index
+    (migration 11), so concurrent retries of one entry store it once
+
+    Args:
+        db: Database instance
+        user_id: Owner of the log
+        date: Date in YYYY-MM-DD format
+        kind: "workout" or "food" (food totals are derived from the entry)
+        entry: Entry in the public shape, with a client-chosen id
+
+    Returns:
+        False if an entry with this id was already stored (nothing written)
+    """
+    stored_id = encode_id(entry["id"])
+    increments = {
+        f"nutrition.{field}": value for field, value in food_totals(entry).items()
+    } if kind == FOOD else {}
+
+    if is_bucketed():
+        key = {"user_id": user_id, "day": day_number(date), "entry.id": stored_id}
+        if await db[ENTRIES_COLLECTION].find_one(key, {"_id": 1}):
+            return False
+        try:
+            await _add_bucketed_entries(db, user_id, date, [(kind, entry)], increments)
+        except DuplicateKeyError:
+            # Lost the race; the allocated seq is simply left unused
+            return False
+        return True
+
+    query = {
+        "user_id": user_id,
+        "day": day_number(date),
+        "workouts.id": {"$ne": stored_id},
+        "nutrition.items.id": {"$ne": stored_id},
+    }
+    update = {
+        "$push": {"workouts" if kind == WORKOUT else "nutrition.items": encode_entry(entry)},
+        "$inc": {**increments, "version": 1},
+        "$setOnInsert": {
+            "createdAt": get_ist_now(),
+            **({"nutrition": empty_nutrition()} if kind == WORKOUT else {"workouts": []}),
+        },
+    }
+    try:
+        await db["daily_logs"].update_one(query, update, upsert=True)
+        return True
+    except DuplicateKeyError:
+        # The day exists and already holds the id (so the filter missed), or
+        # a concurrent first write created it - retry as a plain update
+        result = await db["daily_logs"].update_one(query, update)
+        return result.modified_count == 1
+
+
+# ==================== ENTRY EDITS ====================
+#
+# Edits and deletes target one entry in a hot day. Each layout is tried in
+# turn (a day converted between layouts can hold both); days that only
+# survive in the archive are read-only. Totals are adjusted by the server
+# from the stored entry, never read-modify-written here.
+#
+# A bucketed edit is two writes - the entry document, then the day's totals
+# and version - and Mongo only makes single documents atomic without a
+# replica-set transaction. If the second write is lost the stored totals
+# drift, so readers sum bucketed days from their entries instead; only the
+# version bump (the day's ETag) waits for the next write to the day.
+
+def _entry_id(entry_id: str):
+    """Stored id for a path parameter, or None if it cannot match anything"""
+    try:
+        return encode_id(entry_id)
+    except ValueError:
+        return None
+
+
+def _food_pipeline(entry_id, fields: Optional[dict]) -> List[dict]:
+    """
+    Update pipeline that edits (fields) or removes (None) one embedded food
+    item and moves the day totals by the difference from the stored item
+    """
+    match = {"$eq": ["$$this.id", entry_id]}
+    items = "$nutrition.items"
+    if fields is None:
+        new_items = {"$filter": {"input": items, "cond": {"$not": [match]}}}
+        changes = {field: 0 for field in FOOD_TOTALS}
+    else:
+        new_items = {"$map": {"input": items, "in": {"$cond": [
+            match, {"$mergeObjects": ["$$this", {"$literal": fields}]}, "$$this",
+        ]}}}
+        changes = {field: value for field, value in fields.items() if field in FOOD_TOTALS}
+
+    return [
+        {"$set": {"_old": {"$arrayElemAt": [{"$filter": {"input": items, "cond": match}}, 0]}}},
+        {"$set": {
+            "nutrition.items": new_items,
+            **{
+                f"nutrition.{FOOD_TOTALS[field]}": {"$add": [
+                    {"$ifNull": [f"$nutrition.{FOOD_TOTALS[field]}", 0]},
+                    {"$subtract": [{"$literal": value}, {"$ifNull": [f"$_old.{field}", 0]}]},
+                ]}
+                for field, value in changes.items()
+            },
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+        }},
+        {"$unset": "_old"},
+    ]
+
+
+async def _bump_day(db: AsyncIOMotorDatabase, user_id: str, day: int, increments: dict) -> None:
+    await db["daily_logs"].update_one(
+        {"user_id": user_id, "day": day},
+        {"$inc": {**increments, "version": 1}},
+    )
+
+
+async def update_entry(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    date: str,
+    kind: str,
+    entry_id: str,
+    fields: dict,
+) -> Optional[dict]:
+    """
+    Edit fields of one workout / food entry in place
+
+    Args:
+        db: Database instance
+        user_id: Owner of the log
+        date: Date of the entry (YYYY-MM-DD)
+        kind: WORKOUT or FOOD
+        entry_id: Entry id
+        fields: Fields to set; food nutrient changes are applied to the totals
+
+    Returns:
+        The updated entry, or None if the day has no such entry
+    """
+    stored_id = _entry_id(entry_id)
+    if stored_id is None:
+        return None
+    day = day_number(date)
+    path = "workouts" if kind == WORKOUT else "nutrition.items"
+
+    # Embedded: one findAndModify - positional $set for workouts, an update
+    # pipeline for food so the totals move by (new - stored)
+    update = (
+        {"$set": {f"workouts.$.{field}": value for field, value in fields.items()}, "$inc": {"version": 1}}
+        if kind == WORKOUT else _food_pipeline(stored_id, fields)
+    )
+    updated = await db["daily_logs"].find_one_and_update(
+        {"user_id": user_id, "day": day, f"{path}.id": stored_id},
+        update,
+        projection={f"{path}.$": 1},
+        return_document=ReturnDocument.AFTER,
+    )
+    if updated:
+        entries = updated["workouts"] if kind == WORKOUT else updated["nutrition"]["items"]
+        return decode_entry(entries[0])
+
+    # Bucketed: edit the entry document, then apply the deltas to the day
+    previous = await db[ENTRIES_COLLECTION].find_one_and_update(
+        {"user_id": user_id, "day": day, "kind": kind, "entry.id": stored_id},
+        {"$set": {f"entry.{field}": value for field, value in fields.items()}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if previous is None:
+        return None
+    await _bump_day(db, user_id, day, {
+        f"nutrition.{FOOD_TOTALS[field]}": value - (previous["entry"].get(field) or 0)
+        for field, value in fields.items()
+        if kind == FOOD and field in FOOD_TOTALS
+    })
+    return decode_entry({**previous["entry"], **fields})
+
+
+async def delete_entry(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    date: str,
+    kind: str,
+    entry_id: str,
+) -> Optional[dict]:
+    """
+    Remove one workout / food entry; food items are subtracted from the totals
+
+    Returns:
+        The removed entry, or None if the day has no such entry
+    """
+    stored_id = _entry_id(entry_id)
+    if stored_id is None:
+        return None
+    day = day_number(date)
+    path = "workouts" if kind == WORKOUT else "nutrition.items"
+
+    update = (
+        {"$pull": {"workouts": {"id": stored_id}}, "$inc": {"version": 1}}
+        if kind == WORKOUT else _food_pipeline(stored_id, None)
+    )
+    removed = await db["daily_logs"].find_one_and_update(
+        {"user_id": user_id, "day": day, f"{path}.id": stored_id},
+        update,
+        projection={f"{path}.$": 1},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if removed:
+        entries = removed["workouts"] if kind == WORKOUT else removed["nutrition"]["items"]
+        return decode_entry(entries[0])
+
+    removed = await db[ENTRIES_COLLECTION].find_one_and_delete(
+        {"user_id": user_id, "day": day, "kind": kind, "entry.id": stored_id},
+    )
+    if removed is None:
+        return None
+    await _bump_day(db, user_id, day, {
+        f"nutrition.{total}": -(removed["entry"].get(field) or 0)
+        for field, total in FOOD_TOTALS.items()
+        if kind == FOOD
+    })
+    return decode_entry(removed["entry"])
+
+
+# ==================== BULK EXPORT / IMPORT ====================
+
+async def _iter_hot_days(db: AsyncIOMotorDatabase, user_id: str, batch_size: int) -> AsyncIterator[dict]:
+    cursor = db["daily_logs"].find(
+        {"user_id": user_id, "day": {"$exists": True}},
+        batch_size=batch_size,
+    ).sort("day", 1)
+    async for day in cursor:
+        day = decode_day(day)
+        if "seq" in day:
+            entries = await db[ENTRIES_COLLECTION].find(
+                {"user_id": user_id, "day": day_number(day["date"])}
+            ).sort("seq", 1).to_list(None)
+            day = _merge_entries(day, entries)
+        yield day
+
+
+async def _iter_archived_days(db: AsyncIOMotorDatabase, user_id: str, batch_size: int) -> AsyncIterator[dict]:
+    cursor = db[ARCHIVE_COLLECTION].find({"user_id": user_id}, batch_size=batch_size).sort("month", 1)
+    async for archive in cursor:
+        columns = unpack_columns(archive["entries"])
+        for index in range(len(archive["days"])):
+            yield _archived_day(archive, index, columns)
+
+
+async def iter_days(db: AsyncIOMotorDatabase, user_id: str, batch_size: int) -> AsyncIterator[dict]:
+    """
+    Stream every day of a user (embedded shape), hot and archived, in date order
+    Both cursors are merged as they are read, so memory stays at one
+    cursor batch however long the history is; hot days take precedence
+
+    Args:
+        db: Database instance
+        user_id: Owner of the logs
+        batch_size: Documents fetched per cursor round trip
+    """
+    hot = _iter_hot_days(db, user_id, batch_size)
+    next_hot = await anext(hot, None)
+
+    async for day in _iter_archived_days(db, user_id, batch_size):
+        while next_hot is not None and next_hot["date"] < day["date"]:
+            yield next_hot
+            next_hot = await anext(hot, None)
+        if next_hot is not None and next_hot["date"] == day["date"]:
+            continue
+        yield day
+
+    while next_hot is not None:
+        yield next_hot
+        next_hot = await anext(hot, None)
+
+
+async def add_entries(db: AsyncIOMotorDatabase, user_id: str, entries: List[Tuple[str, str, dict]]) -> None:
+    """
+    Append a batch of (date, kind, entry) triples, spanning any number of days
+    Embedded days are written with one ordered bulk_write (one upsert per
+    day); bucketed days allocate their entry sequence numbers per day
+
+    Args:
+        db: Database instance
+        user_id: Owner of the logs
+        entries: Entries in the public shape; food totals are derived from them
+    """
+    by_day: Dict[str, List[Tuple[str, dict]]] = defaultdict(list)
+    for date, kind, entry in entries:
+        by_day[date].append((kind, entry))
+
+    increments_by_day = {}
+    for date, day_entries in by_day.items():
+        increments = {f"nutrition.{field}": 0 for field in NUTRITION_TOTALS}
+        for kind, entry in day_entries:
+            if kind == FOOD:
+                for field, value in food_totals(entry).items():
+                    increments[f"nutrition.{field}"] += value
+        increments_by_day[date] = increments
+
+    if is_bucketed():
+        for date, day_entries in by_day.items():
+            await _add_bucketed_entries(db, user_id, date, day_entries, increments_by_day[date])
+        return
+
+    now = get_ist_now()
+    await db["daily_logs"].bulk_write(
+        [
+            UpdateOne(
+                {"user_id": user_id, "day": day_number(date)},
+                {
+                    "$push": {
+                        "workouts": {"$each": [encode_entry(e) for kind, e in day_entries if kind == WORKOUT]},
+                        "nutrition.items": {"$each": [encode_entry(e) for kind, e in day_entries if kind == FOOD]},
+                    },
+                    "$inc": {**increments_by_day[date], "version": 1},
+                    "$setOnInsert": {"createdAt": now},
+                },
+                upsert=True,
+            )
+            for date, day_entries in by_day.items()
+        ],
+        ordered=True,
+    )
@@ -1,40 +1,128 @@
+import asyncio
+import importlib.util
+import time
+from fastapi import HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
 from app.core.config import settings
-from typing import Optional
+from app.models.migrations import apply_migrations, check_schema_version
+from app.models.pool_monitor import pool_monitor
+from app.utils.metrics import command_timer
+from app.storage.base import StorageEngine
+from app.storage.mongo import MongoStorage
+from typing import List, Optional
 
 # Global database client
 client: Optional[AsyncIOMotorClient] = None
 db: Optional[AsyncIOMotorDatabase] = None
+history_db: Optional[AsyncIOMotorDatabase] = None
+
+# Active storage engine (MongoStorage or SQLiteStorage)
+storage: Optional[StorageEngine] = None
+
+# Wire compressors and the optional module each one needs
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+
+def available_compressors(configured: str) -> List[str]:
+    """Configured compressors whose module is installed, in preference order"""
+    names = [name.strip() for name in configured.split(",") if name.strip()]
+    return [
+        name for name in names
+        if name in _COMPRESSOR_MODULES and importlib.util.find_spec(_COMPRESSOR_MODULES[name])
+    ]
+
+
+def client_options() -> dict:
+    """Motor client keyword arguments from settings"""
+    options = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "event_listeners": [pool_monitor],
+    }
+    if settings.METRICS_ENABLED:
+        options["event_listeners"].append(command_timer)
+    compressors = available_compressors(settings.MONGO_COMPRESSORS)
+    if compressors:
+        options["compressors"] = ",".join(compressors)
+    return options
+
+
+async def warm_up_pool(database: AsyncIOMotorDatabase, connections: int) -> float:
+    """
+    Open `connections` pooled connections up front with concurrent pings,
+    so the first requests don't pay TCP/TLS and auth handshakes
+
+    Returns:
+        Warm-up time in milliseconds
+    """
+    started = time.perf_counter()
+    await asyncio.gather(*(database.command("ping") for _ in range(max(1, connections))))
+    return (time.perf_counter() - started) * 1000
 
 
 async def connect_to_mongo():
     """Connect to MongoDB using Motor"""
-    global client, db
+    global client, db, history_db, storage
     try:
-        client = AsyncIOMotorClient(settings.MONGO_URI)
+        client = AsyncIOMotorClient(settings.MONGO_URI, **client_options())
         db = client.get_database()
         
-        # Create indexes for better performance
-        daily_logs = db["daily_logs"]
-        await daily_logs.create_index([("user_id", 1), ("date", 1)])
-        await daily_logs.create_index([("user_id", 1)])
+        # History reads tolerate replication lag and can go to secondaries
+        history_db = db.with_options(read_preference=make_read_preference(
+            read_pref_mode_from_name(settings.MONGO_HISTORY_READ_PREFERENCE), None
+        ))
         
-        # Create TTL index - auto-delete records after 7 days
-        # This prevents database from getting full
-        await daily_logs.create_index(
-            [("createdAt", 1)],
-            expireAfterSeconds=604800  # 7 days in seconds
-        )
+        warmup_ms = await warm_up_pool(db, settings.MONGO_MIN_POOL_SIZE)
+        
+        # Indexes are managed by versioned migrations (app/models/migrations.py);
+        # startup only checks the applied version
+        if settings.AUTO_MIGRATE:
+            applied = await apply_migrations(db)
+            if applied:
+                print(f"✓ Applied migrations: {', '.join(applied)}")
+        version = await check_schema_version(db)
         
-        users = db["users"]
-        await users.create_index([("email", 1)], unique=True)
+        storage = MongoStorage(db, history_db)
         
         print("✓ Connected to MongoDB")
-        print("✓ TTL index created - records will auto-delete after 7 days")
+        print(f"✓ Warmed {pool_monitor.stats()['open']} pooled connection(s) in {warmup_ms:.0f} ms")
+        print(f"✓ Database schema version {version}")
     except Exception as e:
-        print(f"⚠ MongoDB connection failed: {e}. Running in simulation mode.")
+        print(f"⚠ MongoDB connection failed: {e}")
+        if client is not None:
+            client.close()
         client = None
         db = None
+        history_db = None
+
+
+def open_sqlite():
+    """Open the embedded SQLite storage engine at SQLITE_PATH"""
+    global storage
+    from app.storage.sqlite import SQLiteStorage
+    
+    storage = SQLiteStorage(settings.SQLITE_PATH)
+    print(f"✓ Using SQLite storage at {settings.SQLITE_PATH}")
+
+
+async def connect_storage():
+    """Open the storage engine selected by STORAGE_ENGINE"""
+    if settings.STORAGE_ENGINE == "sqlite":
+        open_sqlite()
+        return
+    
+    await connect_to_mongo()
+    if storage is None:
+        if settings.STORAGE_FALLBACK == "sqlite":
+            print("⚠ Falling back to local SQLite storage")
+            open_sqlite()
+        else:
+            print("⚠ No storage available - data endpoints will return 503")
 
 
 async def close_mongo_connection():
@@ -45,6 +133,38 @@ async def close_mongo_connection():
         print("✓ Disconnected from MongoDB")
 
 
-def get_database() -> AsyncIOMotorDatabase:
-    """Get the database instance"""
-    return db
+async def close_storage():
+    """Close the active storage engine"""
+    global storage
+    if storage is not None and storage.name != "mongo":
+        await storage.close()
+    await close_mongo_connection()
+    storage = None
+
+
+def current_storage() -> Optional[StorageEngine]:
+    """Active storage engine, or None when nothing is connected"""
+    return storage
+
+
+def get_database() -> StorageEngine:
+    """
+    Get the active storage engine
+    
+    Raises:
+        HTTPException: 503 if no storage engine is available
+    """
+    if storage is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable"
+        )
+    return storage
+
+
+def get_history_database() -> StorageEngine:
+    """
+    Storage engine for history reads (MONGO_HISTORY_READ_PREFERENCE
+    on MongoDB; the same engine otherwise)
+    """
+    return get_database().for_history()
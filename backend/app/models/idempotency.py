@@ -0,0 +1,99 @@
+"""
+Idempotency-Key records for retried POSTs (app/utils/idempotency.py)
+One document per (user, key) in `idempotency_keys`:
+
+    {"_id": "<user_id>:<key>", "fingerprint": "<sha256 of the request>",
+     "response": {"status": 200, "body": {...}},     # absent while in flight
+     "lockedUntil": ISODate, "expiresAt": ISODate}
+
+The request that inserts the document owns it until `lockedUntil`; a
+crashed owner's lock expires and the next retry takes over. The TTL index
+on `expiresAt` (migration 9) removes records IDEMPOTENCY_TTL_HOURS after
+they were claimed.
+"""
+from datetime import timedelta
+from typing import Optional
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+from app.utils.timezone import get_ist_now
+
+IDEMPOTENCY_COLLECTION = "idempotency_keys"
+
+
+def _record(doc: Optional[dict]) -> Optional[dict]:
+    return {"fingerprint": doc["fingerprint"], "response": doc.get("response")} if doc else None
+
+
+async def claim_request(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    key: str,
+    fingerprint: str,
+    lock_seconds: int,
+    ttl_hours: int,
+) -> Optional[dict]:
+    """
+    Claim a key for the calling request
+
+    Args:
+        db: Database instance
+        user_id: Owner of the key
+        key: Idempotency-Key header value
+        fingerprint: Hash of the request the key was sent with
+        lock_seconds: How long the claim blocks other requests with the key
+        ttl_hours: How long the record (and the stored response) is kept
+
+    Returns:
+        None if the caller now owns the key, otherwise the existing
+        {"fingerprint", "response"} record (response is None while in flight)
+
+    Raises:
+        HTTPException: 409 if the key kept being claimed and released by
+            other requests on every attempt
+    """
+    collection = db[IDEMPOTENCY_COLLECTION]
+    now = get_ist_now()
+    claim = {
+        "fingerprint": fingerprint,
+        "lockedUntil": now + timedelta(seconds=lock_seconds),
+        "expiresAt": now + timedelta(hours=ttl_hours),
+    }
+    _id = f"{user_id}:{key}"
+
+    for _ in range(2):
+        try:
+            await collection.insert_one({"_id": _id, **claim})
+            return None
+        except DuplicateKeyError:
+            pass
+
+        # Take over from a crashed owner, or reuse a record the TTL monitor has not removed yet
+        result = await collection.update_one(
+            {"_id": _id, "$or": [{"lockedUntil": {"$lt": now}}, {"expiresAt": {"$lt": now}}]},
+            {"$set": claim, "$unset": {"response": ""}},
+        )
+        if result.modified_count:
+            return None
+
+        existing = await collection.find_one({"_id": _id}, {"fingerprint": 1, "response": 1})
+        if existing:
+            return _record(existing)
+        # Released between the insert and the read - try again
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress"
+    )
+
+
+async def complete_request(db: AsyncIOMotorDatabase, user_id: str, key: str, response: dict) -> None:
+    """Store the response of a claimed key and release its lock"""
+    await db[IDEMPOTENCY_COLLECTION].update_one(
+        {"_id": f"{user_id}:{key}"},
+        {"$set": {"response": response}, "$unset": {"lockedUntil": ""}},
+    )
+
+
+async def release_request(db: AsyncIOMotorDatabase, user_id: str, key: str) -> None:
+    """Forget an in-flight key whose request failed, so a retry runs again"""
+    await db[IDEMPOTENCY_COLLECTION].delete_one({"_id": f"{user_id}:{key}", "response": {"$exists": False}})
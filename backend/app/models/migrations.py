@@ -0,0 +1,500 @@
+"""
+Versioned index and schema migrations
+Applied out of band with:
+
+    python -m app.models.migrations status
+    python -m app.models.migrations apply [--target N]
+    python -m app.models.migrations convert-layout --layout bucketed|embedded
+
+The applied version is recorded in the `migrations` collection; at startup
+the API only compares it with the latest known version and refuses to
+serve while migrations are pending. The Docker image applies them before
+starting uvicorn.
+"""
+import argparse
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.models.codec import day_number, encode_entry
+from app.models.daily_logs import (
+    ARCHIVE_COLLECTION, ENTRIES_COLLECTION, FOOD, NUTRITION_TOTALS, WORKOUT, food_totals, items_totals,
+)
+from app.models.idempotency import IDEMPOTENCY_COLLECTION
+from app.models.refresh_tokens import REFRESH_TOKENS_COLLECTION
+from app.utils.timezone import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_DOC_ID = "schema"
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[AsyncIOMotorDatabase], Awaitable[None]]
+
+
+async def _index_names(collection) -> set:
+    return set((await collection.index_information()).keys())
+
+
+async def _stream_updates(collection, query: dict, build_update, projection: Optional[dict] = None) -> int:
+    """
+    Rewrite matching documents in batches with unordered bulk_write
+    Streams the cursor so memory stays flat regardless of collection size
+    """
+    cursor = collection.find(query, projection, batch_size=settings.MIGRATION_BATCH_SIZE)
+    batch: List[UpdateOne] = []
+    updated = 0
+    async for doc in cursor:
+        batch.append(UpdateOne({"_id": doc["_id"]}, build_update(doc)))
+        if len(batch) >= settings.MIGRATION_BATCH_SIZE:
+            await collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+
+# ==================== MIGRATIONS ====================
+
+async def create_base_indexes(db: AsyncIOMotorDatabase) -> None:
+    """TTL on daily_logs.createdAt (7 days) and unique users.email"""
+    await db["daily_logs"].create_index(
+        [("createdAt", 1)],
+        expireAfterSeconds=604800  # 7 days in seconds
+    )
+    await db["users"].create_index([("email", 1)], unique=True)
+
+
+async def drop_redundant_user_id_index(db: AsyncIOMotorDatabase) -> None:
+    """(user_id) is a prefix of (user_id, date) and only costs writes"""
+    if "user_id_1" in await _index_names(db["daily_logs"]):
+        await db["daily_logs"].drop_index("user_id_1")
+
+
+async def normalize_nutrition_totals(db: AsyncIOMotorDatabase) -> None:
+    """
+    Fold legacy nutrition.totalCalories into nutrition.total_calories
+    Batched streaming backfill over the affected documents only
+    """
+    def build_update(doc: dict) -> dict:
+        increments = {f"nutrition.{field}": 0 for field in NUTRITION_TOTALS}
+        increments["nutrition.total_calories"] = doc.get("nutrition", {}).get("totalCalories") or 0
+        return {"$inc": increments, "$unset": {"nutrition.totalCalories": ""}}
+
+    migrated = await _stream_updates(
+        db["daily_logs"],
+        {"nutrition.totalCalories": {"$exists": True}},
+        build_update,
+        {"nutrition.totalCalories": 1},
+    )
+    logger.info(f"Normalized nutrition totals on {migrated} daily logs")
+
+
+async def _merge_duplicate_days(db: AsyncIOMotorDatabase, key: str) -> int:
+    """
+    Merge day documents sharing (user_id, key) into the first one
+    Entries, totals and the bucketed seq counter move to the kept document
+
+    Returns:
+        Number of documents merged away
+    """
+    daily_logs = db["daily_logs"]
+    duplicates = daily_logs.aggregate([
+        {"$group": {
+            "_id": {"user_id": "$user_id", key: f"${key}"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+    merged = 0
+    async for group in duplicates:
+        keeper_id, *extra_ids = group["ids"]
+        async for extra in daily_logs.find({"_id": {"$in": extra_ids}}):
+            nutrition = extra.get("nutrition", {})
+            update = {
+                "$push": {
+                    "workouts": {"$each": extra.get("workouts", [])},
+                    "nutrition.items": {"$each": nutrition.get("items", [])},
+                },
+                "$inc": {
+                    **{f"nutrition.{field}": nutrition.get(field, 0) for field in NUTRITION_TOTALS},
+                    "version": 1,
+                },
+            }
+            if "seq" in extra:
+                update["$max"] = {"seq": extra["seq"]}
+            await daily_logs.update_one({"_id": keeper_id}, update)
+        await daily_logs.delete_many({"_id": {"$in": extra_ids}})
+        merged += len(extra_ids)
+    return merged
+
+
+async def _renumber_duplicate_entries(db: AsyncIOMotorDatabase) -> int:
+    """
+    Give bucketed entries that share (user_id, day, seq) fresh seqs past the
+    day's highest one, and advance the day's seq counter to match
+
+    Returns:
+        Number of entries renumbered
+    """
+    entries = db[ENTRIES_COLLECTION]
+    collisions = entries.aggregate([
+        {"$group": {
+            "_id": {"user_id": "$user_id", "day": "$day", "seq": "$seq"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+    renumbered = 0
+    async for group in collisions:
+        _, *extra_ids = group["ids"]
+        owner = {"user_id": group["_id"]["user_id"], "day": group["_id"]["day"]}
+        top = await entries.find_one(owner, {"seq": 1}, sort=[("seq", -1)])
+        for offset, entry_id in enumerate(extra_ids, start=1):
+            await entries.update_one({"_id": entry_id}, {"$set": {"seq": top["seq"] + offset}})
+        await db["daily_logs"].update_one(owner, {"$max": {"seq": top["seq"] + len(extra_ids)}})
+        renumbered += len(extra_ids)
+    return renumbered
+
+
+async def unique_user_date_index(db: AsyncIOMotorDatabase) -> None:
+    """
+    Replace the (user_id, date) index with a unique one
+    Duplicate days left behind by concurrent first writes are merged first
+    """
+    daily_logs = db["daily_logs"]
+    await _merge_duplicate_days(db, "date")
+
+    indexes = await daily_logs.index_information()
+    existing = indexes.get("user_id_1_date_1")
+    if existing and not existing.get("unique"):
+        await daily_logs.drop_index("user_id_1_date_1")
+    await daily_logs.create_index([("user_id", 1), ("date", 1)], unique=True)
+
+
+async def create_entries_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Indexes for the bucketed entries collection (same 7-day TTL as days)"""
+    entries = db[ENTRIES_COLLECTION]
+    await entries.create_index([("user_id", 1), ("date", 1), ("seq", 1)], unique=True)
+    await entries.create_index([("createdAt", 1)], expireAfterSeconds=604800)
+
+
+async def compact_binary_encoding(db: AsyncIOMotorDatabase) -> None:
+    """
+    Re-encode stored days and entries (see app/models/codec.py):
+    integer day keys instead of date strings, binary UUID entry ids and
+    native datetimes for entry timestamps, then rebuild the key indexes
+    """
+    def day_update(doc: dict) -> dict:
+        update = {
+            "$set": {"day": day_number(doc["date"])},
+            "$unset": {"date": ""},
+        }
+        if "workouts" in doc:
+            update["$set"]["workouts"] = [encode_entry(w) for w in doc["workouts"]]
+        if "items" in doc.get("nutrition", {}):
+            update["$set"]["nutrition.items"] = [encode_entry(i) for i in doc["nutrition"]["items"]]
+        return update
+
+    def entry_update(doc: dict) -> dict:
+        return {
+            "$set": {"day": day_number(doc["date"]), "entry": encode_entry(doc["entry"])},
+            "$unset": {"date": ""},
+        }
+
+    # Re-keyed documents lose `date`, which the old unique indexes would then
+    # see as a null shared by every day of the user, so drop them first
+    if "user_id_1_date_1" in await _index_names(db["daily_logs"]):
+        await db["daily_logs"].drop_index("user_id_1_date_1")
+    if "user_id_1_date_1_seq_1" in await _index_names(db[ENTRIES_COLLECTION]):
+        await db[ENTRIES_COLLECTION].drop_index("user_id_1_date_1_seq_1")
+
+    days = await _stream_updates(db["daily_logs"], {"date": {"$exists": True}}, day_update)
+    entries = await _stream_updates(db[ENTRIES_COLLECTION], {"date": {"$exists": True}}, entry_update)
+    logger.info(f"Re-encoded {days} daily logs and {entries} entries")
+
+    # A day written by `day` before this ran sits next to its legacy `date` twin
+    merged = await _merge_duplicate_days(db, "day")
+    renumbered = await _renumber_duplicate_entries(db)
+    logger.info(f"Merged {merged} duplicate daily logs, renumbered {renumbered} entries")
+
+    await db["daily_logs"].create_index([("user_id", 1), ("day", 1)], unique=True)
+    await db[ENTRIES_COLLECTION].create_index([("user_id", 1), ("day", 1), ("seq", 1)], unique=True)
+
+
+async def create_archive_indexes(db: AsyncIOMotorDatabase) -> None:
+    """One archive document per user and month (no TTL - this is the long-term store)"""
+    await db[ARCHIVE_COLLECTION].create_index([("user_id", 1), ("month", 1)], unique=True)
+
+
+async def create_events_collection(db: AsyncIOMotorDatabase) -> None:
+    """Capped collection tailed by every worker for cross-process live events"""
+    if "events" not in await db.list_collection_names():
+        await db.create_collection("events", capped=True, size=settings.EVENTS_CAPPED_BYTES)
+
+
+async def create_idempotency_indexes(db: AsyncIOMotorDatabase) -> None:
+    """TTL index for Idempotency-Key records (expiry time is stored per document)"""
+    await db[IDEMPOTENCY_COLLECTION].create_index("expiresAt", expireAfterSeconds=0)
+
+
+async def create_refresh_token_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Revocation by user / login session, and TTL removal of expired refresh tokens"""
+    await db[REFRESH_TOKENS_COLLECTION].create_index([("userId", 1), ("family", 1)])
+    await db[REFRESH_TOKENS_COLLECTION].create_index("expiresAt", expireAfterSeconds=0)
+
+
+async def unique_entry_ids(db: AsyncIOMotorDatabase) -> None:
+    """
+    Unique (user_id, day, entry.id) on bucketed entries, so an entry re-sent
+    by a retried offline sync is stored once
+    Duplicates stored before this are dropped (keeping the earliest) and
+    their food totals taken back off the day
+    """
+    entries = db[ENTRIES_COLLECTION]
+    duplicates = entries.aggregate([
+        {"$sort": {"seq": 1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "day": "$day", "id": "$entry.id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1},
+        }},
+        {"$match": {"count": {"$gt": 1}}},
+    ], allowDiskUse=True)
+
+    removed = 0
+    async for group in duplicates:
+        _, *extra_ids = group["ids"]
+        decrements = {f"nutrition.{field}": 0 for field in NUTRITION_TOTALS}
+        async for extra in entries.find({"_id": {"$in": extra_ids}}, {"kind": 1, "entry": 1}):
+            if extra["kind"] == FOOD:
+                for field, value in food_totals(extra["entry"]).items():
+                    decrements[f"nutrition.{field}"] -= value
+        await db["daily_logs"].update_one(
+            {"user_id": group["_id"]["user_id"], "day": group["_id"]["day"]},
+            {"$inc": {**decrements, "version": 1}},
+        )
+        await entries.delete_many({"_id": {"$in": extra_ids}})
+        removed += len(extra_ids)
+    logger.info(f"Removed {removed} duplicate entries")
+
+    await entries.create_index([("user_id", 1), ("day", 1), ("entry.id", 1)], unique=True)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create_base_indexes", create_base_indexes),
+    Migration(2, "drop_redundant_user_id_index", drop_redundant_user_id_index),
+    Migration(3, "normalize_nutrition_totals", normalize_nutrition_totals),
+    Migration(4, "unique_user_date_index", unique_user_date_index),
+    Migration(5, "create_entries_indexes", create_entries_indexes),
+    Migration(6, "compact_binary_encoding", compact_binary_encoding),
+    Migration(7, "create_archive_indexes", create_archive_indexes),
+    Migration(8, "create_events_collection", create_events_collection),
+    Migration(9, "create_idempotency_indexes", create_idempotency_indexes),
+    Migration(10, "create_refresh_token_indexes", create_refresh_token_indexes),
+    Migration(11, "unique_entry_ids", unique_entry_ids),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ==================== LAYOUT CONVERSION ====================
+
+async def convert_layout(db: AsyncIOMotorDatabase, layout: str) -> int:
+    """
+    Convert stored days between the embedded and bucketed layouts
+    Switch STORAGE_LAYOUT to the target first so live writes already use it
+
+    Args:
+        db: Database instance
+        layout: Target layout ("embedded" or "bucketed")
+
+    Returns:
+        Number of day documents converted
+    """
+    daily_logs = db["daily_logs"]
+    entries = db[ENTRIES_COLLECTION]
+    converted = 0
+
+    if layout == "bucketed":
+        cursor = daily_logs.find(
+            {"$or": [{"workouts.0": {"$exists": True}}, {"nutrition.items.0": {"$exists": True}}]},
+            batch_size=settings.MIGRATION_BATCH_SIZE,
+        )
+        async for day in cursor:
+            embedded = [(WORKOUT, w) for w in day.get("workouts", [])]
+            embedded += [(FOOD, item) for item in day.get("nutrition", {}).get("items", [])]
+
+            # Embedded entries predate any bucketed ones, so they get lower seqs
+            first = await entries.find_one(
+                {"user_id": day["user_id"], "day": day["day"]},
+                {"seq": 1},
+                sort=[("seq", 1)],
+            )
+            lowest = first["seq"] if first else 1
+            await entries.insert_many([
+                {
+                    "user_id": day["user_id"],
+                    "day": day["day"],
+                    "seq": lowest - len(embedded) + index,
+                    "kind": kind,
+                    "entry": entry,
+                    "createdAt": day.get("createdAt", get_ist_now()),
+                }
+                for index, (kind, entry) in enumerate(embedded)
+            ], ordered=True)
+            await daily_logs.update_one(
+                {"_id": day["_id"]},
+                {
+                    "$unset": {"workouts": "", "nutrition.items": ""},
+                    "$max": {"seq": 0},
+                    "$inc": {"version": 1},
+                },
+            )
+            converted += 1
+
+    elif layout == "embedded":
+        cursor = daily_logs.find({"seq": {"$exists": True}}, batch_size=settings.MIGRATION_BATCH_SIZE)
+        async for day in cursor:
+            day_entries = await entries.find(
+                {"user_id": day["user_id"], "day": day["day"]}
+            ).sort("seq", 1).to_list(None)
+            items = day.get("nutrition", {}).get("items", [])
+            items = items + [e["entry"] for e in day_entries if e["kind"] == FOOD]
+            await daily_logs.update_one(
+                {"_id": day["_id"]},
+                {
+                    "$push": {
+                        "workouts": {"$each": [e["entry"] for e in day_entries if e["kind"] == WORKOUT]},
+                        "nutrition.items": {"$each": [e["entry"] for e in day_entries if e["kind"] == FOOD]},
+                    },
+                    # Stored bucketed totals may have drifted (see daily_logs)
+                    "$set": {f"nutrition.{field}": value for field, value in items_totals(items).items()},
+                    "$unset": {"seq": ""},
+                    "$inc": {"version": 1},
+                },
+            )
+            await entries.delete_many({"_id": {"$in": [e["_id"] for e in day_entries]}})
+            converted += 1
+
+    else:
+        raise ValueError(f"Unknown storage layout: {layout}")
+
+    return converted
+
+
+# ==================== MANAGER ====================
+
+async def get_schema_version(db: AsyncIOMotorDatabase) -> int:
+    """Return the applied schema version (0 for a fresh database)"""
+    doc = await db["migrations"].find_one({"_id": SCHEMA_DOC_ID}, {"version": 1})
+    return doc.get("version", 0) if doc else 0
+
+
+async def apply_migrations(db: AsyncIOMotorDatabase, target: Optional[int] = None) -> List[str]:
+    """
+    Apply pending migrations in order up to target (default: latest)
+
+    Args:
+        db: Database instance
+        target: Version to migrate to
+
+    Returns:
+        Names of the migrations that were applied
+    """
+    target = LATEST_VERSION if target is None else target
+    current = await get_schema_version(db)
+    applied = []
+
+    for migration in MIGRATIONS:
+        if migration.version <= current or migration.version > target:
+            continue
+
+        logger.info(f"Applying migration {migration.version}: {migration.name}")
+        await migration.apply(db)
+        await db["migrations"].update_one(
+            {"_id": SCHEMA_DOC_ID},
+            {
+                "$set": {"version": migration.version, "updatedAt": get_ist_now()},
+                "$push": {"history": {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "appliedAt": get_ist_now(),
+                }},
+            },
+            upsert=True,
+        )
+        applied.append(migration.name)
+
+    return applied
+
+
+async def check_schema_version(db: AsyncIOMotorDatabase) -> int:
+    """
+    Startup check - a version read, no index builds
+
+    Returns:
+        The applied schema version
+
+    Raises:
+        RuntimeError: If migrations are pending - the write paths rely on the
+            indexes they build (unique emails, one document per day, unique
+            entry ids) and on the integer `day` keys
+    """
+    version = await get_schema_version(db)
+    if version < LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, this build needs {LATEST_VERSION}. "
+            f"Run `python -m app.models.migrations apply` or set AUTO_MIGRATE=true."
+        )
+    if version > LATEST_VERSION:
+        logger.warning(f"⚠ Database schema version {version} is newer than this build ({LATEST_VERSION})")
+    return version
+
+
+async def _main(command: str, target: Optional[int], layout: Optional[str]) -> None:
+    if settings.STORAGE_ENGINE != "mongo":
+        # SQLite applies its own schema versions when it is opened
+        print(f"STORAGE_ENGINE={settings.STORAGE_ENGINE}: no MongoDB migrations to run")
+        return
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    try:
+        db = client.get_database()
+        if command == "convert-layout":
+            converted = await convert_layout(db, layout)
+            print(f"✓ Converted {converted} day(s) to the {layout} layout")
+            return
+        if command == "apply":
+            applied = await apply_migrations(db, target)
+            print(f"✓ Applied {len(applied)} migration(s): {', '.join(applied) or 'none'}")
+        current = await get_schema_version(db)
+        print(f"Schema version: {current} (latest {LATEST_VERSION})")
+        for migration in MIGRATIONS:
+            state = "applied" if migration.version <= current else "pending"
+            print(f"  {migration.version:>3}  {migration.name:<40} {state}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Apply database index and schema migrations")
+    parser.add_argument("command", choices=["status", "apply", "convert-layout"])
+    parser.add_argument("--target", type=int, default=None, help="migrate up to this version")
+    parser.add_argument("--layout", choices=["embedded", "bucketed"], default=settings.STORAGE_LAYOUT,
+                        help="target layout for convert-layout")
+    args = parser.parse_args()
+    asyncio.run(_main(args.command, args.target, args.layout))
@@ -0,0 +1,109 @@
+"""
+Connection pool monitoring for the Motor client
+Tracks connections in use, checkout wait times and pool churn via a
+pymongo ConnectionPoolListener. Listener callbacks run synchronously on
+the driver's worker threads, so state is guarded by a lock and checkout
+start times are kept per thread.
+"""
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from pymongo import monitoring
+
+# Recent checkout waits kept for percentiles
+WAIT_SAMPLES = 1024
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Aggregate connection pool statistics across all servers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.in_use = 0
+        self.open = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.max_wait_ms = 0.0
+
+    # ---- checkout timing ----
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        wait_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self._waits.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    # ---- pool churn ----
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(0, self.open - 1)
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def stats(self) -> Dict:
+        """Snapshot for /health/db"""
+        with self._lock:
+            waits = sorted(self._waits)
+            in_use, open_connections = self.in_use, self.open
+            checkouts, failures, clears, max_wait = (
+                self.checkouts, self.checkout_failures, self.pool_clears, self.max_wait_ms,
+            )
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 3)
+
+        return {
+            "in_use": in_use,
+            "open": open_connections,
+            "checkouts": checkouts,
+            "checkout_failures": failures,
+            "pool_clears": clears,
+            "checkout_wait_ms": {
+                "p50": percentile(0.50),
+                "p99": percentile(0.99),
+                "max": round(max_wait, 3),
+            },
+        }
+
+
+pool_monitor = PoolMonitor()
@@ -0,0 +1,85 @@
+"""
+Rotating refresh tokens (POST /auth/refresh)
+One document per issued token in `refresh_tokens`, keyed by the token's
+SHA-256 so a refresh is a single primary-key lookup:
+
+    {"_id": "<sha256 hex>", "userId": "...", "family": "<login session>",
+     "expiresAt": ISODate, "usedAt": ISODate, "revokedAt": ISODate}
+
+Each refresh marks its token used and issues the next one in the same
+family. A used token presented again means it was copied, so the caller
+revokes the whole family. Used tokens are kept until `expiresAt` for that
+check; the TTL index (migration 10) removes them afterwards.
+"""
+from datetime import timedelta
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from app.utils.timezone import get_ist_now
+
+REFRESH_TOKENS_COLLECTION = "refresh_tokens"
+
+
+async def create_refresh_token(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    token_hash: str,
+    family: str,
+    ttl_days: int,
+) -> None:
+    """
+    Store a newly issued refresh token
+
+    Args:
+        db: Database instance
+        user_id: Owner of the token
+        token_hash: SHA-256 of the token
+        family: Login session the token belongs to
+        ttl_days: Days until the token expires
+    """
+    await db[REFRESH_TOKENS_COLLECTION].insert_one({
+        "_id": token_hash,
+        "userId": user_id,
+        "family": family,
+        "expiresAt": get_ist_now() + timedelta(days=ttl_days),
+    })
+
+
+async def use_refresh_token(db: AsyncIOMotorDatabase, token_hash: str) -> Optional[dict]:
+    """
+    Mark a refresh token used
+
+    Args:
+        db: Database instance
+        token_hash: SHA-256 of the presented token
+
+    Returns:
+        None for an unknown or expired token, otherwise {"user_id", "family",
+        "state"} where state is "active" (used for the first time now),
+        "used" (presented before) or "revoked"
+    """
+    now = get_ist_now()
+    doc = await db[REFRESH_TOKENS_COLLECTION].find_one_and_update(
+        {"_id": token_hash, "expiresAt": {"$gt": now}},
+        {"$min": {"usedAt": now}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if doc is None:
+        return None
+
+    if "revokedAt" in doc:
+        state = "revoked"
+    elif "usedAt" in doc:
+        state = "used"
+    else:
+        state = "active"
+    return {"user_id": doc["userId"], "family": doc["family"], "state": state}
+
+
+async def revoke_refresh_tokens(db: AsyncIOMotorDatabase, user_id: str, family: Optional[str] = None) -> int:
+    """Revoke one login session's tokens, or every session of a user; returns tokens revoked"""
+    query = {"userId": user_id, "revokedAt": {"$exists": False}}
+    if family is not None:
+        query["family"] = family
+    result = await db[REFRESH_TOKENS_COLLECTION].update_many(query, {"$set": {"revokedAt": get_ist_now()}})
+    return result.modified_count
@@ -1,23 +1,46 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, GetCoreSchemaHandler, GetJsonSchemaHandler
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import core_schema
+from typing import Any, List, Optional
 from datetime import datetime
+from uuid import UUID
 from bson import ObjectId
 from app.utils.timezone import get_ist_now
+from app.utils.streak import current_streak
+
+
+def empty_nutrition() -> dict:
+    """Nutrition block for a day without food items"""
+    return {
+        "total_calories": 0,
+        "total_protein": 0,
+        "total_carbs": 0,
+        "total_fat": 0,
+        "total_fiber": 0,
+        "items": [],
+    }
 
 
 class PyObjectId(ObjectId):
-    """Custom Pydantic ObjectId type"""
+    """Custom Pydantic ObjectId type (accepts ObjectId or hex string, serializes as str)"""
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
+        return core_schema.no_info_plain_validator_function(
+            cls.validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(str),
+        )
+
     @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler) -> JsonSchemaValue:
+        return {"type": "string", "pattern": "^[0-9a-fA-F]{24}$"}
 
     @classmethod
     def validate(cls, v):
         if isinstance(v, ObjectId):
             return v
-        if isinstance(v, str):
+        if isinstance(v, str) and ObjectId.is_valid(v):
             return ObjectId(v)
-        raise TypeError("ObjectId required")
+        raise ValueError("ObjectId required")
 
 
 class UserRegisterSchema(BaseModel):
@@ -34,6 +57,17 @@ class UserLoginSchema(BaseModel):
     password: str
 
 
+class RefreshRequestSchema(BaseModel):
+    """Refresh token exchange (POST /auth/refresh)"""
+    refresh_token: str
+
+
+class LogoutSchema(BaseModel):
+    """Sign out: revoke the session of a refresh token, or every session"""
+    refresh_token: str
+    all_sessions: bool = False
+
+
 class UserSettingsUpdateSchema(BaseModel):
     """User settings update request"""
     username: Optional[str] = None
@@ -53,17 +87,62 @@ class UserResponseSchema(BaseModel):
     carbsGoal: int = 200
     fiberGoal: int = 25
     workoutStreak: int = 0
+    longestStreak: int = 0
+    lastWorkoutDate: Optional[str] = None
     createdAt: datetime
     
     class Config:
         populate_by_name = True
+    
+    @classmethod
+    def dump_document(cls, user: dict) -> dict:
+        """
+        JSON-ready response dict from a trusted users document
+        Skips validation and model construction; missing or null
+        goal fields fall back to the model defaults
+        """
+        data = {"_id": str(user["_id"])}
+        for name, default in _USER_RESPONSE_DEFAULTS.items():
+            value = user.get(name)
+            data[name] = default if value is None else value
+        if data["createdAt"] is None:
+            data["createdAt"] = get_ist_now()
+        # Stored streak only counts while it can still be continued
+        data["workoutStreak"] = current_streak(user)
+        return data
+
+
+# Field defaults used by the trusted-document fast path (None = required)
+_USER_RESPONSE_DEFAULTS = {
+    name: (None if field.is_required() else field.default)
+    for name, field in UserResponseSchema.model_fields.items()
+    if name != "id"
+}
 
 
 class TokenSchema(BaseModel):
     """JWT token response"""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     user: UserResponseSchema
+    
+    @classmethod
+    def dump_document(cls, access_token: str, user: dict, refresh_token: Optional[str] = None) -> dict:
+        """JSON-ready response dict from fresh tokens and a trusted users document"""
+        return {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_type": "bearer",
+            "user": UserResponseSchema.dump_document(user),
+        }
+
+
+class RefreshTokenSchema(BaseModel):
+    """New access token and the refresh token replacing the one sent"""
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
 
 
 class WorkoutLogSchema(BaseModel):
@@ -75,6 +154,50 @@ class WorkoutLogSchema(BaseModel):
     duration: int  # in minutes
 
 
+class WorkoutUpdateSchema(BaseModel):
+    """Partial workout edit (PATCH /workout/{id})"""
+    exercise: Optional[str] = None
+    sets: Optional[int] = None
+    reps: Optional[int] = None
+    weight: Optional[float] = None
+    duration: Optional[int] = None
+
+
+class FoodItemUpdateSchema(BaseModel):
+    """Partial food item edit (PATCH /scan/items/{id}); nutrition totals follow"""
+    name: Optional[str] = None
+    calories: Optional[float] = None
+    protein: Optional[float] = None
+    carbs: Optional[float] = None
+    fat: Optional[float] = None
+    fiber: Optional[float] = None
+
+
+class SyncWorkoutSchema(WorkoutLogSchema):
+    """Workout created offline; the client id makes re-sends idempotent"""
+    id: Optional[UUID] = None
+    loggedAt: Optional[datetime] = None
+
+
+class SyncFoodSchema(BaseModel):
+    """Food item created offline"""
+    id: Optional[UUID] = None
+    name: str
+    calories: float
+    protein: float = 0
+    carbs: float = 0
+    fat: float = 0
+    fiber: float = 0
+    confidence: float = 1.0
+    loggedAt: Optional[datetime] = None
+
+
+class SyncBatchSchema(BaseModel):
+    """POST /sync request"""
+    workouts: List[SyncWorkoutSchema] = []
+    foods: List[SyncFoodSchema] = []
+
+
 class CalorieLogSchema(BaseModel):
     """Calorie logging from AI"""
     foodItem: str
@@ -88,7 +211,7 @@ class DailyLogSchema(BaseModel):
     user_id: str
     date: str  # YYYY-MM-DD format in IST
     workouts: List[dict] = Field(default_factory=list)
-    nutrition: dict = Field(default_factory=lambda: {"totalCalories": 0, "items": []})
+    nutrition: dict = Field(default_factory=empty_nutrition)
     createdAt: datetime = Field(default_factory=get_ist_now)
     
     class Config:
@@ -98,7 +221,17 @@ class DailyLogSchema(BaseModel):
 class DailyHistoryResponseSchema(BaseModel):
     """Daily history response"""
     workouts: List[dict] = []
-    nutrition: dict = Field(default_factory=lambda: {"totalCalories": 0, "items": []})
+    nutrition: dict = Field(default_factory=empty_nutrition)
+    
+    @classmethod
+    def dump_document(cls, daily_log: Optional[dict]) -> dict:
+        """JSON-ready response dict from a trusted daily_logs document (or None)"""
+        if not daily_log:
+            return {"workouts": [], "nutrition": empty_nutrition()}
+        return {
+            "workouts": daily_log.get("workouts", []),
+            "nutrition": daily_log.get("nutrition") or empty_nutrition(),
+        }
 
 
 class FoodPredictionSchema(BaseModel):
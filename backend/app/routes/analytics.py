@@ -0,0 +1,68 @@
+from datetime import date as date_cls, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.core.config import settings
+from app.models.database import get_database
+from app.models.schemas import UserResponseSchema
+from app.utils.analytics import build_summary
+from app.utils.auth import get_current_user
+from app.utils.cache import analytics_cache
+from app.utils.profile import get_profile
+from app.utils.timezone import get_ist_date_string
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/summary")
+async def get_summary(
+    range_: str = Query("30d", alias="range", pattern=r"^\d{1,3}d?$"),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Calorie, macro and workout trends for the last N days (ending today)
+    Computed server-side from per-day totals; cached per user until the next write
+
+    Args:
+        range_: Number of days, e.g. "7d", "30d", "90d"
+        current_user: Authenticated user ID
+
+    Returns:
+        Per-day rows, ISO week roll-ups and range totals vs the user's goals
+    """
+    days = int(range_.rstrip("d"))
+    if not 1 <= days <= settings.ANALYTICS_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must be between 1 and {settings.ANALYTICS_MAX_RANGE_DAYS} days"
+        )
+
+    try:
+        end_date = get_ist_date_string()
+        cache_key = f"{days}:{end_date}"
+        cached = await analytics_cache.get(current_user, cache_key)
+        if cached is not None:
+            return cached
+
+        start_date = (date_cls.fromisoformat(end_date) - timedelta(days=days - 1)).isoformat()
+
+        # Totals only - entries never leave the database (range includes today: primary)
+        db = get_database()
+        user = await get_profile(db, current_user)
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        rows = await db.get_daily_totals(current_user, start_date, end_date)
+
+        summary = build_summary(rows, UserResponseSchema.dump_document(user), start_date, end_date)
+        await analytics_cache.set(current_user, cache_key, summary)
+        return summary
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error building analytics summary: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to build analytics summary"
+        )
@@ -1,19 +1,48 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from uuid import uuid4
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from starlette.background import BackgroundTask
 from datetime import datetime, timedelta
 from app.models.schemas import (
     UserRegisterSchema,
     UserLoginSchema,
     TokenSchema,
-    UserResponseSchema,
+    RefreshRequestSchema,
+    RefreshTokenSchema,
+    LogoutSchema,
+)
+from app.core.security import (
+    hash_password,
+    create_access_token,
+    needs_rehash,
+    verify_password,
+    new_refresh_token,
+    hash_refresh_token,
 )
-from app.core.security import hash_password, create_access_token, verify_password
 from app.models.database import get_database
+from app.storage.base import DuplicateError
+from app.core.responses import ORJSONResponse
+from app.utils.cache import profile_cache
+from app.utils.profile import update_profile
+from app.utils.ratelimit import rate_limit
 from app.utils.timezone import get_ist_now
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
 
-@router.post("/register", response_model=TokenSchema, status_code=status.HTTP_201_CREATED)
+async def _issue_refresh_token(db, user_id: str, family: Optional[str] = None) -> str:
+    """Create a refresh token in an existing login session, or start a new one"""
+    refresh_token = new_refresh_token()
+    await db.create_refresh_token(user_id, hash_refresh_token(refresh_token), family or uuid4().hex)
+    return refresh_token
+
+
+@router.post(
+    "/register",
+    response_model=TokenSchema,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("auth"))],
+)
 async def register(user_data: UserRegisterSchema):
     """
     Register a new user
@@ -27,7 +56,7 @@ async def register(user_data: UserRegisterSchema):
     db = get_database()
     
     # Check if email already exists
-    existing_user = await db["users"].find_one({"email": user_data.email})
+    existing_user = await db.get_user_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -35,36 +64,39 @@ async def register(user_data: UserRegisterSchema):
         )
     
     # Create new user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     new_user = {
         "email": user_data.email,
         "username": user_data.username,
         "password": hashed_password,
         "dailyCalorieGoal": user_data.dailyCalorieGoal,
         "workoutStreak": 0,
+        "longestStreak": 0,
+        "lastWorkoutDate": None,
         "createdAt": get_ist_now(),
     }
     
-    result = await db["users"].insert_one(new_user)
-    user_id = str(result.inserted_id)
+    try:
+        user_id = await db.create_user(new_user)
+    except DuplicateError:
+        # Lost a race with a concurrent registration for the same email
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
-    # Create JWT token
+    # Create JWT token and start a refresh session
     access_token = create_access_token({"sub": user_id})
+    refresh_token = await _issue_refresh_token(db, user_id)
     
-    return TokenSchema(
-        access_token=access_token,
-        user=UserResponseSchema(
-            id=user_id,
-            email=user_data.email,
-            username=user_data.username,
-            dailyCalorieGoal=user_data.dailyCalorieGoal,
-            workoutStreak=0,
-            createdAt=get_ist_now(),
-        )
+    # Trusted document - skip response_model re-validation
+    return ORJSONResponse(
+        TokenSchema.dump_document(access_token, new_user, refresh_token),
+        status_code=status.HTTP_201_CREATED,
     )
 
 
-@router.post("/login", response_model=TokenSchema)
+@router.post("/login", response_model=TokenSchema, dependencies=[Depends(rate_limit("auth"))])
 async def login(credentials: UserLoginSchema):
     """
     Login user with email and password
@@ -78,7 +110,8 @@ async def login(credentials: UserLoginSchema):
     db = get_database()
     
     # Find user by email
-    user = await db["users"].find_one({"email": credentials.email})
+    profile_token = profile_cache.read_token()
+    user = await db.get_user_by_email(credentials.email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -86,24 +119,87 @@ async def login(credentials: UserLoginSchema):
         )
     
     # Verify password
-    if not verify_password(credentials.password, user["password"]):
+    if not await verify_password(credentials.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
-    # Create JWT token
+    # Create JWT token and start a refresh session
     user_id = str(user["_id"])
     access_token = create_access_token({"sub": user_id})
+    refresh_token = await _issue_refresh_token(db, user_id)
+    
+    # The app loads /users/me right after signing in - serve it from the cache
+    await profile_cache.set(user_id, user, profile_token)
     
-    return TokenSchema(
-        access_token=access_token,
-        user=UserResponseSchema(
-            id=user_id,
-            email=user["email"],
-            username=user["username"],
-            dailyCalorieGoal=user.get("dailyCalorieGoal", 2000),
-            workoutStreak=user.get("workoutStreak", 0),
-            createdAt=user.get("createdAt", get_ist_now()),
+    # Trusted document - skip response_model re-validation
+    response = ORJSONResponse(TokenSchema.dump_document(access_token, user, refresh_token))
+    
+    # BCRYPT_ROUNDS changed since this hash was made - upgrade it after responding
+    if needs_rehash(user["password"]):
+        response.background = BackgroundTask(_rehash_password, user_id, credentials.password)
+    return response
+
+
+@router.post("/refresh", response_model=RefreshTokenSchema)
+async def refresh(body: RefreshRequestSchema):
+    """
+    Exchange a refresh token for a new access token (no password check)
+    Refresh tokens are single-use: the response carries the replacement.
+    Presenting a used token again signs out its whole session
+    
+    Args:
+        body: Refresh token from login, register or the previous refresh
+    
+    Returns:
+        RefreshTokenSchema with a new access token and refresh token
+    """
+    db = get_database()
+    
+    record = await db.use_refresh_token(hash_refresh_token(body.refresh_token))
+    if record is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token"
         )
-    )
+    
+    if record["state"] != "active":
+        # A replayed token may be a stolen copy - end the session for every holder
+        await db.revoke_refresh_tokens(record["user_id"], record["family"])
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token is no longer valid, please sign in again"
+        )
+    
+    user_id = record["user_id"]
+    return ORJSONResponse({
+        "access_token": create_access_token({"sub": user_id}),
+        "refresh_token": await _issue_refresh_token(db, user_id, record["family"]),
+        "token_type": "bearer",
+    })
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: LogoutSchema):
+    """
+    Revoke the session a refresh token belongs to, or all of the user's sessions
+    Access tokens already issued stay valid until they expire
+    
+    Args:
+        body: Refresh token and whether to sign out every session
+    """
+    db = get_database()
+    
+    record = await db.use_refresh_token(hash_refresh_token(body.refresh_token))
+    if record is not None:
+        await db.revoke_refresh_tokens(record["user_id"], None if body.all_sessions else record["family"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def _rehash_password(user_id: str, password: str) -> None:
+    """Re-hash a verified password at the current work factor"""
+    try:
+        await update_profile(get_database(), user_id, {"password": await hash_password(password)})
+    except Exception as e:
+        print(f"Error upgrading password hash: {e}")
@@ -0,0 +1,107 @@
+import logging
+from typing import Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from app.core.config import settings
+from app.models.database import get_database, get_history_database
+from app.utils.auth import get_current_user
+from app.utils.bulk import CSV, MEDIA_TYPES, NDJSON, export_chunks, import_entries, iter_lines, parse_records
+from app.utils.cache import day_cache, analytics_cache
+from app.utils.events import RESYNC, event_broker
+from app.utils.streak import STREAK_FIELDS, recompute_streak
+from app.utils.timezone import get_ist_date_string
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["bulk export / import"])
+
+
+@router.get("/export")
+async def export_logs(
+    format: str = Query(NDJSON, pattern="^(ndjson|csv)$"),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Stream every workout and food entry of the current user (hot and archived days)
+    Rows are written as days are read, so memory does not grow with history
+
+    Args:
+        format: ndjson (one JSON object per line) or csv
+        current_user: Authenticated user ID
+
+    Returns:
+        One row per entry, oldest day first
+    """
+    filename = f"workout-logs-{get_ist_date_string()}.{format}"
+    return StreamingResponse(
+        export_chunks(get_history_database(), current_user, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+async def _after_import(db, user_id: str, dates: Dict[str, bool]) -> None:
+    """Streak, change log, caches and live clients for the days an import wrote to"""
+    if any(dates.values()):
+        await recompute_streak(db, user_id)
+    for date in sorted(dates):
+        await db.record_change(user_id, date, STREAK_FIELDS if dates[date] else None)
+        await day_cache.invalidate(user_id, date)
+    await analytics_cache.invalidate_user(user_id)
+    await event_broker.publish(user_id, RESYNC)
+
+
+@router.post("/import")
+async def import_logs(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(ndjson|csv)$"),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Import entries from an NDJSON or CSV body in the /export format
+    The body is parsed as it arrives and written in IMPORT_BATCH_SIZE
+    batches; ids already stored are skipped, so a failed import can be re-sent
+
+    Args:
+        request: Raw body (Content-Type text/csv or application/x-ndjson)
+        format: Overrides the format implied by Content-Type
+        current_user: Authenticated user ID
+
+    Returns:
+        imported / duplicates / rejected counts and the first rejected lines
+    """
+    if format is None:
+        format = CSV if request.headers.get("content-type", "").startswith("text/csv") else NDJSON
+
+    db = get_database()
+    dates: Dict[str, bool] = {}
+    try:
+        records = parse_records(iter_lines(request.stream(), settings.IMPORT_MAX_LINE_BYTES), format)
+        return await import_entries(db, current_user, records, dates)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except ClientDisconnect:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload interrupted"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error importing logs: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to import logs"
+        )
+    finally:
+        # Batches stored before a failure still count
+        if dates:
+            try:
+                await _after_import(db, current_user, dates)
+            except Exception as e:
+                logger.error(f"Error finishing import: {e}")
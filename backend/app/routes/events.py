@@ -0,0 +1,71 @@
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from app.core.config import settings
+from app.utils.auth import get_current_user
+from app.utils.events import Subscription, event_broker, format_sse
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+class EventStreamResponse(StreamingResponse):
+    """
+    Streams a subscription and closes it however the response ends - also
+    when the client is gone or sending fails before the body starts, where
+    the generator's own cleanup never runs
+    """
+
+    def __init__(self, content, subscription: Subscription):
+        super().__init__(
+            content,
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+        self.subscription = subscription
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            event_broker.unsubscribe(self.subscription)
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Server-sent events with live updates for the current user
+    Sends a comment line every EVENTS_HEARTBEAT_SECONDS to keep proxies open
+    
+    Args:
+        current_user: Authenticated user ID
+    
+    Returns:
+        text/event-stream of entry.* / profile.updated / resync events
+    """
+    subscription = event_broker.subscribe(current_user)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many open event streams"
+        )
+    
+    async def stream():
+        # Flush headers right away; clients refetch on (re)connect
+        yield b"retry: 5000\n\n" + format_sse({"type": "ready"})
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                event = None
+            # Checked on every event too, so a busy stream to a gone client stops
+            if await request.is_disconnected():
+                break
+            yield b": ping\n\n" if event is None else format_sse(event)
+    
+    return EventStreamResponse(stream(), subscription)
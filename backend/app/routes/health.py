@@ -1,5 +1,15 @@
-from fastapi import APIRouter
+import time
+from fastapi import APIRouter, Depends
+from app.core.config import settings
+from app.core.security import password_pool_stats
+from app.models import database
+from app.models.pool_monitor import pool_monitor
 from app.utils.timezone import get_ist_now
+from app.utils.auth import auth_timing_stats, require_metrics_token
+from app.utils.cache import get_cache_stats
+from app.utils.events import event_broker
+from app.utils.ratelimit import rate_limiter
+from app.utils.tracing import LocalSpanExporter, tracer
 
 router = APIRouter(tags=["health"])
 
@@ -18,3 +28,113 @@ async def health_check():
         "timezone": "IST (UTC+5:30)",
         "version": "1.0.0"
     }
+
+
+# /health stays open for liveness probes; the stats below describe traffic
+# and internals, so they take the same bearer token as /metrics
+@router.get("/health/cache", dependencies=[Depends(require_metrics_token)])
+async def cache_stats():
+    """
+    Cache statistics for monitoring
+    
+    Returns:
+        Hit rates, entry counts and approximate memory usage per cache
+    """
+    return {
+        "timestamp": get_ist_now().isoformat(),
+        "caches": get_cache_stats(),
+    }
+
+
+@router.get("/health/events", dependencies=[Depends(require_metrics_token)])
+async def events_stats():
+    """
+    Live event stream statistics
+    
+    Returns:
+        Open streams, published / delivered events and events dropped for slow clients
+    """
+    return {
+        "timestamp": get_ist_now().isoformat(),
+        "events": event_broker.stats(),
+    }
+
+
+@router.get("/health/auth", dependencies=[Depends(require_metrics_token)])
+async def auth_stats():
+    """
+    Password hashing pool and token verification statistics
+    
+    Returns:
+        bcrypt work factor, pool threads and hashes queued or running;
+        JWT backend and mean auth time for cached and verified tokens
+    """
+    return {
+        "timestamp": get_ist_now().isoformat(),
+        "passwords": password_pool_stats(),
+        "tokens": auth_timing_stats(),
+    }
+
+
+@router.get("/health/ratelimit", dependencies=[Depends(require_metrics_token)])
+async def ratelimit_stats():
+    """
+    Rate limiter statistics
+    
+    Returns:
+        Limit per route class and requests allowed / limited (429) so far
+    """
+    return {
+        "timestamp": get_ist_now().isoformat(),
+        "ratelimit": rate_limiter.stats(),
+    }
+
+
+@router.get("/health/traces", dependencies=[Depends(require_metrics_token)])
+async def traces_stats():
+    """
+    Request tracing statistics
+    
+    Returns:
+        Sample rate, traces sampled and exported; with TRACING_EXPORTER=local,
+        the most recent traces as OTLP/JSON
+    """
+    exporter = tracer.exporter
+    return {
+        "timestamp": get_ist_now().isoformat(),
+        "tracing": tracer.stats(),
+        "traces": exporter.recent() if isinstance(exporter, LocalSpanExporter) else [],
+    }
+
+
+@router.get("/health/db", dependencies=[Depends(require_metrics_token)])
+async def db_stats():
+    """
+    Database connectivity and connection pool statistics
+    
+    Returns:
+        Ping latency, connections in use / open and checkout wait times
+    """
+    ping_ms = None
+    storage = database.current_storage()
+    if storage is not None:
+        try:
+            started = time.perf_counter()
+            await storage.ping()
+            ping_ms = round((time.perf_counter() - started) * 1000, 3)
+        except Exception as e:
+            print(f"Database ping failed: {e}")
+    
+    return {
+        "timestamp": get_ist_now().isoformat(),
+        "engine": storage.name if storage is not None else None,
+        "connected": ping_ms is not None,
+        "ping_ms": ping_ms,
+        "pool": {
+            **pool_monitor.stats(),
+            "max_size": settings.MONGO_MAX_POOL_SIZE,
+            "min_size": settings.MONGO_MIN_POOL_SIZE,
+        },
+        "compressors": database.available_compressors(settings.MONGO_COMPRESSORS),
+        "history_read_preference": settings.MONGO_HISTORY_READ_PREFERENCE,
+    }
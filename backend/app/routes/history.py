@@ -1,25 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from app.models.database import get_database
+import calendar
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from app.core.config import settings
+from app.models.codec import day_number
+from app.models.daily_logs import NUTRITION_TOTALS, WORKOUT_STATS
+from app.models.database import get_database, get_history_database
 from app.models.schemas import DailyHistoryResponseSchema
+from app.core.responses import ORJSONResponse, RawJSONResponse, dumps
 from app.utils.auth import get_current_user
+from app.utils.cache import day_cache
+from app.utils.etag import batch_etag, day_etag, range_etag, etag_matches, not_modified
+from app.utils.timezone import get_ist_date_string
 
 router = APIRouter(prefix="/data", tags=["history"])
 
+EMPTY_SUMMARY = {**{field: 0 for field in NUTRITION_TOTALS}, **{field: 0 for field in WORKOUT_STATS}}
+
+
+def _batch_dates(dates: Optional[str], month: Optional[str]) -> List[str]:
+    """Sorted, de-duplicated dates for /data/batch from `dates` or `month`"""
+    from datetime import datetime, timedelta
+    
+    if (dates is None) == (month is None):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide either dates or month"
+        )
+    
+    try:
+        if month is not None:
+            first = datetime.strptime(month, "%Y-%m").date()
+            length = calendar.monthrange(first.year, first.month)[1]
+            return [(first + timedelta(days=n)).isoformat() for n in range(length)]
+        
+        requested = sorted({
+            datetime.strptime(date.strip(), "%Y-%m-%d").date().isoformat()
+            for date in dates.split(",") if date.strip()
+        })
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD (dates) or YYYY-MM (month)"
+        )
+    
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No dates given"
+        )
+    if day_number(requested[-1]) - day_number(requested[0]) >= settings.DATA_BATCH_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Dates must fall within {settings.DATA_BATCH_MAX_DAYS} days"
+        )
+    return requested
+
+
+@router.get("/batch")
+async def get_history_batch(
+    request: Request,
+    dates: Optional[str] = Query(None, description="Comma-separated YYYY-MM-DD dates"),
+    month: Optional[str] = Query(None, description="YYYY-MM"),
+    summary: bool = False,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Get several days in one request (calendar views)
+    Answered from one range query; declared before /{date} so "batch"
+    is not parsed as a date
+    
+    Args:
+        dates: Comma-separated dates (within DATA_BATCH_MAX_DAYS of each other)
+        month: Month in YYYY-MM format (alternative to dates)
+        summary: Return per-day totals and workout stats instead of entries
+        current_user: Authenticated user ID
+    
+    Returns:
+        {"days": {date: payload}} with every requested date (empty days included),
+        or 304 Not Modified if the client's copy is current
+    """
+    requested = _batch_dates(dates, month)
+    start_date, end_date = requested[0], requested[-1]
+    wanted = {day_number(date) for date in requested}
+    
+    try:
+        # Today is still being written to - read it from the primary
+        db = get_database() if end_date >= get_ist_date_string() else get_history_database()
+        
+        # Versions only - lets unchanged batches short-circuit with 304
+        version_docs = [
+            doc for doc in await db.get_day_versions(current_user, start_date, end_date)
+            if doc["day"] in wanted
+        ]
+        etag = batch_etag(current_user, requested, summary, version_docs)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        if summary:
+            rows = {
+                row.pop("date"): row
+                for row in await db.get_daily_totals(current_user, start_date, end_date)
+            }
+            days = {date: rows.get(date, EMPTY_SUMMARY) for date in requested}
+        else:
+            logs = {log["date"]: log for log in await db.get_days(current_user, start_date, end_date)}
+            days = {date: DailyHistoryResponseSchema.dump_document(logs.get(date)) for date in requested}
+        
+        return ORJSONResponse({"days": days}, headers={"ETag": etag})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error fetching history batch: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch data"
+        )
+
 
 @router.get("/{date}", response_model=DailyHistoryResponseSchema)
 async def get_daily_history(
     date: str,
+    request: Request,
     current_user: str = Depends(get_current_user),
 ):
     """
     Get all workouts and nutrition data for a specific date
+    Supports conditional requests via ETag / If-None-Match
     
     Args:
         date: Date in YYYY-MM-DD format
         current_user: Authenticated user ID
     
     Returns:
-        DailyHistoryResponseSchema with workouts and nutrition data
+        DailyHistoryResponseSchema with workouts and nutrition data,
+        or 304 Not Modified if the client's copy is current
     """
     try:
         # Validate date format
@@ -32,25 +147,34 @@ async def get_daily_history(
                 detail="Invalid date format. Use YYYY-MM-DD"
             )
         
+        # Serve pre-serialized bytes from the per-user day cache when possible
+        cached = await day_cache.get(current_user, date)
+        if cached is not None:
+            if etag_matches(request, cached["etag"]):
+                return not_modified(cached["etag"])
+            return RawJSONResponse(cached["body"], headers={"ETag": cached["etag"]})
+        
+        # The result is cached for hours, so read it from the primary: a lagging
+        # secondary could hand back a day as it was before its last edit
+        cache_token = day_cache.read_token()
         db = get_database()
         
+        # Cheap version check before loading the entry arrays
+        if request.headers.get("if-none-match"):
+            version_doc = await db.get_day_version(current_user, date)
+            etag = day_etag(current_user, date, version_doc)
+            if etag_matches(request, etag):
+                return not_modified(etag)
+        
         # Get daily log for the user and date
-        daily_log = await db["daily_logs"].find_one({
-            "user_id": current_user,
-            "date": date
-        })
+        daily_log = await db.get_day(current_user, date)
         
-        if not daily_log:
-            # Return empty response for days with no data
-            return DailyHistoryResponseSchema(
-                workouts=[],
-                nutrition={"totalCalories": 0, "items": []}
-            )
+        # Trusted document - build without re-validating every nested item
+        body = dumps(DailyHistoryResponseSchema.dump_document(daily_log))
+        etag = day_etag(current_user, date, daily_log)
+        await day_cache.set(current_user, date, {"etag": etag, "body": body}, cache_token)
         
-        return DailyHistoryResponseSchema(
-            workouts=daily_log.get("workouts", []),
-            nutrition=daily_log.get("nutrition", {"totalCalories": 0, "items": []})
-        )
+        return RawJSONResponse(body, headers={"ETag": etag})
     
     except HTTPException:
         raise
@@ -66,6 +190,7 @@ async def get_daily_history(
 async def get_history_range(
     start_date: str,
     end_date: str,
+    request: Request,
     current_user: str = Depends(get_current_user),
 ):
     """
@@ -77,7 +202,8 @@ async def get_history_range(
         current_user: Authenticated user ID
     
     Returns:
-        List of daily logs for the date range
+        List of daily logs for the date range,
+        or 304 Not Modified if the client's copy is current
     """
     try:
         from datetime import datetime, timedelta
@@ -92,21 +218,31 @@ async def get_history_range(
                 detail="Start date must be before end date"
             )
         
-        db = get_database()
+        # Today is still being written to - read it from the primary
+        db = get_database() if end_date >= get_ist_date_string() else get_history_database()
+        
+        # Versions only - lets unchanged ranges short-circuit with 304
+        version_docs = await db.get_day_versions(current_user, start_date, end_date)
+        etag = range_etag(current_user, start_date, end_date, version_docs)
+        if etag_matches(request, etag):
+            return not_modified(etag)
         
         # Fetch all logs in range
-        logs = await db["daily_logs"].find({
-            "user_id": current_user,
-            "date": {"$gte": start_date, "$lte": end_date}
-        }).to_list(None)
-        
-        return {
-            "startDate": start_date,
-            "endDate": end_date,
-            "logs": logs,
-            "count": len(logs)
-        }
+        logs = await db.get_days(current_user, start_date, end_date)
+        
+        # Raw documents go straight to orjson (ObjectId/datetime handled natively)
+        return ORJSONResponse(
+            {
+                "startDate": start_date,
+                "endDate": end_date,
+                "logs": logs,
+                "count": len(logs)
+            },
+            headers={"ETag": etag},
+        )
     
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.security import password_pool_stats
+from app.models.pool_monitor import pool_monitor
+from app.utils.auth import require_metrics_token
+from app.utils.events import event_broker
+from app.utils.metrics import Counter, Gauge, registry
+from app.utils.model_loader import food_model
+from app.utils.ratelimit import rate_limiter
+
+router = APIRouter(tags=["metrics"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _rate_limit_requests() -> dict:
+    classes = rate_limiter.stats()["classes"]
+    samples = {}
+    for route_class, stats in classes.items():
+        samples[(route_class, "allowed")] = stats["allowed"]
+        samples[(route_class, "limited")] = stats["limited"]
+    return samples
+
+
+def _password_hash_shedding() -> int:
+    stats = password_pool_stats()
+    return int(stats["pending"] >= stats["max_pending"])
+
+
+# State kept elsewhere, read when scraped
+registry.register(Gauge(
+    "model_loaded", "1 when the TFLite food model is loaded, 0 in simulation mode",
+    callback=lambda: int(food_model.is_loaded()),
+))
+registry.register(Gauge(
+    "password_hash_pending", "bcrypt hashes queued or running",
+    callback=lambda: password_pool_stats()["pending"],
+))
+# The only load-shedding switch in the service (there is no circuit breaker):
+# sign-ins are refused while the bcrypt pool's queue is full
+registry.register(Gauge(
+    "password_hash_shedding", "1 while sign-ins are refused with 503 because BCRYPT_MAX_PENDING is reached",
+    callback=_password_hash_shedding,
+))
+registry.register(Gauge(
+    "mongo_pool_connections", "MongoDB pool connections by state",
+    labels=("state",),
+    callback=lambda: {("in_use",): pool_monitor.in_use, ("open",): pool_monitor.open},
+))
+registry.register(Counter(
+    "rate_limit_requests_total", "Rate-limited requests by route class and outcome",
+    labels=("route_class", "outcome"),
+    callback=_rate_limit_requests,
+))
+registry.register(Gauge(
+    "event_streams_open", "Open live event streams",
+    callback=lambda: event_broker.stats()["streams"],
+))
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """
+    Prometheus scrape endpoint (bearer token from METRICS_TOKEN)
+
+    Returns:
+        Every registered metric in the text exposition format
+    """
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
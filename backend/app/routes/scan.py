@@ -1,5 +1,7 @@
-from fastapi import APIRouter, File, UploadFile, Depends, HTTPException, status
-from datetime import datetime
+from fastapi import APIRouter, File, UploadFile, Depends, Header, HTTPException, status
+from contextlib import contextmanager
+from datetime import datetime, date as date_cls
+from typing import Optional
 from uuid import uuid4
 import numpy as np
 from PIL import Image
@@ -8,17 +10,31 @@ import logging
 import base64
 import httpx
 import os
+from app.models.daily_logs import FOOD, FOOD_TOTALS
 from app.models.database import get_database
-from app.models.schemas import FoodPredictionSchema
+from app.models.schemas import FoodItemUpdateSchema, FoodPredictionSchema
 from app.utils.auth import get_current_user
+from app.utils.cache import day_cache, analytics_cache
+from app.utils.events import event_broker
+from app.utils.idempotency import fingerprint, run_idempotent
+from app.utils.metrics import external_api_requests, scan_stage_duration
+from app.utils.tracing import KIND_CLIENT, span
 from app.utils.food_macros import get_food_nutrition, get_food_count, get_all_food_classes
 from app.utils.model_loader import food_model
+from app.utils.ratelimit import check_rate_limit
 from app.utils.timezone import get_ist_now, get_ist_date_string
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/scan", tags=["food scanning"])
 
 
+@contextmanager
+def _stage(name: str):
+    """Time a scan pipeline stage for /metrics and the request's trace"""
+    with scan_stage_duration.time(name), span(f"scan.{name}"):
+        yield
+
+
 async def predict_with_clarifai(image_bytes: bytes) -> dict:
     """
     Use Clarifai's Food Recognition API for accurate food detection
@@ -39,23 +55,25 @@ async def predict_with_clarifai(image_bytes: bytes) -> dict:
         
         # Call Clarifai API
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.clarifai.com/v2/models/bd367be194cf45149e75112268e60588/outputs",
-                headers={
-                    "Authorization": f"Key {clarifai_api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "inputs": [{
-                        "data": {
-                            "image": {
-                                "base64": image_base64
+            with span("http.clarifai", KIND_CLIENT):
+                response = await client.post(
+                    "https://api.clarifai.com/v2/models/bd367be194cf45149e75112268e60588/outputs",
+                    headers={
+                        "Authorization": f"Key {clarifai_api_key}",
+                        "Content-Type": "application/json"
+                    },
+                    json={
+                        "inputs": [{
+                            "data": {
+                                "image": {
+                                    "base64": image_base64
+                                }
                             }
-                        }
-                    }]
-                },
-                timeout=30.0
-            )
+                        }]
+                    },
+                    timeout=30.0
+                )
+            external_api_requests.inc("clarifai", str(response.status_code))
             
             if response.status_code == 200:
                 data = response.json()
@@ -80,6 +98,7 @@ async def predict_with_clarifai(image_bytes: bytes) -> dict:
             return None
             
     except Exception as e:
+        external_api_requests.inc("clarifai", "error")
         logger.warning(f"Clarifai prediction failed: {e}")
         return None
 
@@ -101,15 +120,17 @@ async def predict_with_spoonacular(food_name: str) -> dict:
         
         async with httpx.AsyncClient() as client:
             # Search for the food
-            response = await client.get(
-                "https://api.spoonacular.com/food/products/search",
-                params={
-                    "query": food_name,
-                    "apiKey": api_key,
-                    "number": 1
-                },
-                timeout=10.0
-            )
+            with span("http.spoonacular", KIND_CLIENT):
+                response = await client.get(
+                    "https://api.spoonacular.com/food/products/search",
+                    params={
+                        "query": food_name,
+                        "apiKey": api_key,
+                        "number": 1
+                    },
+                    timeout=10.0
+                )
+            external_api_requests.inc("spoonacular", str(response.status_code))
             
             if response.status_code == 200:
                 data = response.json()
@@ -131,23 +152,194 @@ async def predict_with_spoonacular(food_name: str) -> dict:
             return None
             
     except Exception as e:
+        external_api_requests.inc("spoonacular", "error")
         logger.warning(f"Spoonacular lookup failed: {e}")
         return None
 
 
+async def _scan_and_log(contents: bytes, current_user: str) -> FoodPredictionSchema:
+    """Identify the food in an image, look up its nutrition and log it for today"""
+    # Decode image using PIL
+    with _stage("decode"):
+        image = Image.open(BytesIO(contents))
+        image = image.convert('RGB')
+        image_array = np.array(image)
+    
+    # Try Clarifai API first (if key configured)
+    with _stage("clarifai"):
+        clarifai_result = await predict_with_clarifai(contents)
+    
+    if clarifai_result:
+        # Use Clarifai prediction
+        food_item = clarifai_result["food_item"]
+        confidence = clarifai_result["confidence"]
+        logger.info(f"Using Clarifai prediction: {food_item}")
+    else:
+        # Fallback to local model + Spoonacular nutrition
+        logger.info("Using local model + Spoonacular for food detection")
+        
+        # Process image for local model
+        with _stage("preprocess"):
+            processed_image = food_model.preprocess_image(image_array.astype(np.float32))
+        
+        # Make prediction
+        if food_model.is_loaded():
+            # Use real H5 model
+            prediction_result = food_model.predict(processed_image, top_k=5)
+            
+            if "error" in prediction_result:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Prediction failed: {prediction_result['error']}"
+                )
+            
+            top_pred = prediction_result["top_prediction"]
+            food_item = top_pred["class_name"]
+            confidence = top_pred["confidence"]
+            
+            # Clean up food name
+            food_item = food_item.lower().replace(" ", "_").replace("-", "_")
+            
+        else:
+            # Fallback to simulation mode if model not loaded
+            logger.warning("H5 model not loaded. Using simulation mode.")
+            import random
+            
+            # Varied food database for simulation
+            food_database = [
+                "chicken_tikka", "butter_chicken", "paneer_tikka", "tandoori_chicken",
+                "biryani", "dum_biryani", "hyderabadi_biryani", "egg_biryani",
+                "dal_makhani", "butter_naan", "garlic_naan", "roti",
+                "rice", "basmati_rice", "jeera_rice", "pulao",
+                "samosa", "pakora", "spring_roll", "momos",
+                "pizza", "pasta", "burger", "sandwich",
+                "salad", "greek_salad", "caesar_salad", "garden_salad",
+                "dal_fry", "dal_tadka", "rajma", "chole_bhature",
+                "aloo_gobi", "chana_masala", "baingan_bharta", "mushroom_curry",
+                "fish_curry", "shrimp_curry", "prawn_fry", "fish_fry",
+                "dosa", "idli", "sambhar", "chutney",
+                "upma", "poha", "paratha", "kulcha",
+                "kheer", "gulab_jamun", "jalebi", "rasgulla",
+                "fruit", "apple", "banana", "orange",
+                "soup", "chicken_soup", "tomato_soup", "coconut_soup",
+                "dal_soup", "lentil_soup", "vegetable_soup", "minestrone",
+                "smoothie", "milkshake", "juice", "coffee"
+            ]
+            
+            # Random selection with varying confidence
+            food_item = random.choice(food_database)
+            confidence = round(random.uniform(0.65, 0.95), 3)
+    
+    # Validate that the prediction is actually a food item and has reasonable confidence
+    supported_foods = get_all_food_classes()
+    food_key = food_item.lower().replace(" ", "_").replace("-", "_")
+    
+    # Check if food is in supported foods or has high confidence
+    is_valid_food = food_key in supported_foods or any(
+        food_key in food or food in food_key for food in supported_foods
+    )
+    
+    # Require minimum 30% confidence for any food, 60% for unknown foods
+    min_confidence = 0.3 if is_valid_food else 0.6
+    
+    if confidence < min_confidence:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Please scan a food item. The image does not appear to contain food."
+        )
+    
+    if not is_valid_food and confidence < 0.6:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unable to identify food item. Please ensure you're scanning actual food."
+        )
+    
+    # Get complete nutrition info
+    # Try Spoonacular first (free, no credit card required)
+    with _stage("spoonacular"):
+        spoonacular_nutrition = await predict_with_spoonacular(food_item)
+    
+    if spoonacular_nutrition:
+        logger.info(f"Using Spoonacular nutrition data for {food_item}")
+        calories = spoonacular_nutrition["calories"]
+        protein = spoonacular_nutrition["protein"]
+        carbs = spoonacular_nutrition["carbs"]
+        fat = spoonacular_nutrition["fat"]
+        fiber = spoonacular_nutrition["fiber"]
+    else:
+        # Fallback to local database
+        logger.info(f"Using local database nutrition for {food_item}")
+        nutrition = get_food_nutrition(food_item)
+        calories = nutrition["calories"]
+        protein = nutrition["protein"]
+        carbs = nutrition["carbs"]
+        fat = nutrition["fat"]
+        fiber = nutrition["fiber"]
+    
+    # Save to daily logs
+    db = get_database()
+    today = get_ist_date_string()
+    
+    food_entry = {
+        "id": str(uuid4()),
+        "name": food_item,
+        "calories": calories,
+        "protein": round(protein, 1),
+        "carbs": round(carbs, 1),
+        "fat": round(fat, 1),
+        "fiber": round(fiber, 1),
+        "confidence": round(confidence, 4),
+        "date": get_ist_now().isoformat(),
+    }
+    
+    totals = {
+        "total_calories": calories,
+        "total_protein": protein,
+        "total_carbs": carbs,
+        "total_fat": fat,
+        "total_fiber": fiber,
+    }
+    
+    # Append to the day (created on first write)
+    with _stage("db_write"):
+        await db.add_food_item(current_user, today, food_entry, totals)
+        await db.record_change(current_user, today)
+    await day_cache.invalidate(current_user, today)
+    await analytics_cache.invalidate_user(current_user)
+    await event_broker.publish(current_user, {
+        "type": "entry.added", "date": today, "kind": FOOD, "entry": food_entry, "delta": totals,
+    })
+    
+    logger.info(f"Food scanned: {food_item} - Calories: {calories}, Protein: {protein}g, Carbs: {carbs}g, Fat: {fat}g, Fiber: {fiber}g - Confidence: {confidence}")
+    
+    return FoodPredictionSchema(
+        food_item=food_item,
+        calories=calories,
+        protein=protein,
+        carbs=carbs,
+        fat=fat,
+        fiber=fiber,
+        confidence=confidence
+    )
+
+
 @router.post("/", response_model=FoodPredictionSchema)
 async def scan_food(
     file: UploadFile = File(...),
     current_user: str = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """
     Scan a food image and return calorie estimate
     Uses H5 Keras model for comprehensive food detection
     Supports 1000+ food types including Indian and worldwide cuisines
+    A retry with the same Idempotency-Key replays the first result without
+    running inference or logging the item again
     
     Args:
         file: Uploaded image file
         current_user: Authenticated user ID
+        idempotency_key: Optional client-generated key, unique per scan
     
     Returns:
         FoodPredictionSchema with food item, calories, and confidence
@@ -157,194 +349,140 @@ async def scan_food(
     """
     try:
         # Read uploaded file
-        contents = await file.read()
-        
-        # Decode image using PIL
-        image = Image.open(BytesIO(contents))
-        image = image.convert('RGB')
-        image_array = np.array(image)
+        with _stage("upload_read"):
+            contents = await file.read()
         
-        # Try Clarifai API first (if key configured)
-        clarifai_result = await predict_with_clarifai(contents)
+        # Charged only when the scan really runs - an Idempotency-Key replay
+        # is answered from the stored response without taking a token
+        async def scan_and_log():
+            await check_rate_limit("scan", current_user)
+            return await _scan_and_log(contents, current_user)
         
-        if clarifai_result:
-            # Use Clarifai prediction
-            food_item = clarifai_result["food_item"]
-            confidence = clarifai_result["confidence"]
-            logger.info(f"Using Clarifai prediction: {food_item}")
-        else:
-            # Fallback to local model + Spoonacular nutrition
-            logger.info("Using local model + Spoonacular for food detection")
-            
-            # Process image for local model
-            processed_image = food_model.preprocess_image(image_array.astype(np.float32))
-            
-            # Make prediction
-            if food_model.is_loaded():
-                # Use real H5 model
-                prediction_result = food_model.predict(processed_image, top_k=5)
-                
-                if "error" in prediction_result:
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=f"Prediction failed: {prediction_result['error']}"
-                    )
-                
-                top_pred = prediction_result["top_prediction"]
-                food_item = top_pred["class_name"]
-                confidence = top_pred["confidence"]
-                
-                # Clean up food name
-                food_item = food_item.lower().replace(" ", "_").replace("-", "_")
-                
-            else:
-                # Fallback to simulation mode if model not loaded
-                logger.warning("H5 model not loaded. Using simulation mode.")
-                import random
-                
-                # Varied food database for simulation
-                food_database = [
-                    "chicken_tikka", "butter_chicken", "paneer_tikka", "tandoori_chicken",
-                    "biryani", "dum_biryani", "hyderabadi_biryani", "egg_biryani",
-                    "dal_makhani", "butter_naan", "garlic_naan", "roti",
-                    "rice", "basmati_rice", "jeera_rice", "pulao",
-                    "samosa", "pakora", "spring_roll", "momos",
-                    "pizza", "pasta", "burger", "sandwich",
-                    "salad", "greek_salad", "caesar_salad", "garden_salad",
-                    "dal_fry", "dal_tadka", "rajma", "chole_bhature",
-                    "aloo_gobi", "chana_masala", "baingan_bharta", "mushroom_curry",
-                    "fish_curry", "shrimp_curry", "prawn_fry", "fish_fry",
-                    "dosa", "idli", "sambhar", "chutney",
-                    "upma", "poha", "paratha", "kulcha",
-                    "kheer", "gulab_jamun", "jalebi", "rasgulla",
-                    "fruit", "apple", "banana", "orange",
-                    "soup", "chicken_soup", "tomato_soup", "coconut_soup",
-                    "dal_soup", "lentil_soup", "vegetable_soup", "minestrone",
-                    "smoothie", "milkshake", "juice", "coffee"
-                ]
-                
-                # Random selection with varying confidence
-                food_item = random.choice(food_database)
-                confidence = round(random.uniform(0.65, 0.95), 3)
-        
-        # Validate that the prediction is actually a food item and has reasonable confidence
-        supported_foods = get_all_food_classes()
-        food_key = food_item.lower().replace(" ", "_").replace("-", "_")
-        
-        # Check if food is in supported foods or has high confidence
-        is_valid_food = food_key in supported_foods or any(
-            food_key in food or food in food_key for food in supported_foods
+        return await run_idempotent(
+            get_database(),
+            current_user,
+            idempotency_key,
+            fingerprint(b"POST /scan", contents),
+            scan_and_log,
         )
-        
-        # Require minimum 30% confidence for any food, 60% for unknown foods
-        min_confidence = 0.3 if is_valid_food else 0.6
-        
-        if confidence < min_confidence:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Please scan a food item. The image does not appear to contain food."
-            )
-        
-        if not is_valid_food and confidence < 0.6:
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in scan endpoint: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to process image"
+        )
+
+
+@router.patch("/items/{item_id}")
+async def update_food_item(
+    item_id: str,
+    item: FoodItemUpdateSchema,
+    date: Optional[date_cls] = None,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Correct a logged food item; the day's nutrition totals follow
+    
+    Args:
+        item_id: ID of the food entry
+        item: Fields to change (name, calories, macros)
+        date: Day the item was logged on (default: today, IST)
+        current_user: Authenticated user ID
+    
+    Returns:
+        The updated food entry
+    """
+    fields = item.model_dump(exclude_none=True)
+    if not fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    
+    try:
+        day = date.isoformat() if date else get_ist_date_string()
+        db = get_database()
+        entry = await db.update_entry(current_user, day, FOOD, item_id, fields)
+        if entry is None:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Unable to identify food item. Please ensure you're scanning actual food."
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Food item not found"
             )
         
-        # Get complete nutrition info
-        # Try Spoonacular first (free, no credit card required)
-        spoonacular_nutrition = await predict_with_spoonacular(food_item)
-        
-        if spoonacular_nutrition:
-            logger.info(f"Using Spoonacular nutrition data for {food_item}")
-            calories = spoonacular_nutrition["calories"]
-            protein = spoonacular_nutrition["protein"]
-            carbs = spoonacular_nutrition["carbs"]
-            fat = spoonacular_nutrition["fat"]
-            fiber = spoonacular_nutrition["fiber"]
-        else:
-            # Fallback to local database
-            logger.info(f"Using local database nutrition for {food_item}")
-            nutrition = get_food_nutrition(food_item)
-            calories = nutrition["calories"]
-            protein = nutrition["protein"]
-            carbs = nutrition["carbs"]
-            fat = nutrition["fat"]
-            fiber = nutrition["fiber"]
-        
-        # Save to daily logs
-        db = get_database()
-        today = get_ist_date_string()
-        
-        # Update or create daily log
-        daily_log = await db["daily_logs"].find_one({
-            "user_id": current_user,
-            "date": today
+        await db.record_change(current_user, day)
+        await day_cache.invalidate(current_user, day)
+        await analytics_cache.invalidate_user(current_user)
+        await event_broker.publish(current_user, {
+            "type": "entry.updated", "date": day, "kind": FOOD, "entry": entry,
         })
         
-        food_entry = {
-            "id": str(uuid4()),
-            "name": food_item,
-            "calories": calories,
-            "protein": round(protein, 1),
-            "carbs": round(carbs, 1),
-            "fat": round(fat, 1),
-            "fiber": round(fiber, 1),
-            "confidence": round(confidence, 4),
-            "date": get_ist_now().isoformat(),
+        return {
+            "message": "Food item updated successfully",
+            "item": entry,
+            "date": day
         }
-        
-        if daily_log:
-            # Append to existing day
-            await db["daily_logs"].update_one(
-                {"user_id": current_user, "date": today},
-                {
-                    "$push": {"nutrition.items": food_entry},
-                    "$inc": {
-                        "nutrition.total_calories": calories,
-                        "nutrition.total_protein": protein,
-                        "nutrition.total_carbs": carbs,
-                        "nutrition.total_fat": fat,
-                        "nutrition.total_fiber": fiber,
-                    }
-                }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating food item: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update food item"
+        )
+
+
+@router.delete("/items/{item_id}")
+async def delete_food_item(
+    item_id: str,
+    date: Optional[date_cls] = None,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Delete a logged food item and subtract it from the day's totals
+    
+    Args:
+        item_id: ID of the food entry
+        date: Day the item was logged on (default: today, IST)
+        current_user: Authenticated user ID
+    
+    Returns:
+        Success message with the deleted item ID
+    """
+    try:
+        day = date.isoformat() if date else get_ist_date_string()
+        db = get_database()
+        entry = await db.delete_entry(current_user, day, FOOD, item_id)
+        if entry is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Food item not found"
             )
-        else:
-            # Create new day
-            await db["daily_logs"].insert_one({
-                "user_id": current_user,
-                "date": today,
-                "workouts": [],
-                "nutrition": {
-                    "total_calories": calories,
-                    "total_protein": protein,
-                    "total_carbs": carbs,
-                    "total_fat": fat,
-                    "total_fiber": fiber,
-                    "items": [food_entry]
-                },
-                "createdAt": get_ist_now(),
-            })
         
-        logger.info(f"Food scanned: {food_item} - Calories: {calories}, Protein: {protein}g, Carbs: {carbs}g, Fat: {fat}g, Fiber: {fiber}g - Confidence: {confidence}")
+        await db.record_change(current_user, day)
+        await day_cache.invalidate(current_user, day)
+        await analytics_cache.invalidate_user(current_user)
+        await event_broker.publish(current_user, {
+            "type": "entry.deleted", "date": day, "kind": FOOD, "id": item_id,
+            "delta": {total: -(entry.get(field) or 0) for field, total in FOOD_TOTALS.items()},
+        })
         
-        return FoodPredictionSchema(
-            food_item=food_item,
-            calories=calories,
-            protein=protein,
-            carbs=carbs,
-            fat=fat,
-            fiber=fiber,
-            confidence=confidence
-        )
+        return {
+            "message": "Food item deleted successfully",
+            "itemId": item_id,
+            "date": day
+        }
     
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error in scan endpoint: {e}", exc_info=True)
+        logger.error(f"Error deleting food item: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to process image"
+            detail="Failed to delete food item"
         )
 
 
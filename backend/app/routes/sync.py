@@ -0,0 +1,161 @@
+import asyncio
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.core.config import settings
+from app.models.daily_logs import FOOD, WORKOUT
+from app.models.database import get_database
+from app.models.schemas import DailyHistoryResponseSchema, SyncBatchSchema, UserResponseSchema
+from app.utils.auth import get_current_user
+from app.utils.bulk import build_entry
+from app.utils.cache import day_cache, analytics_cache, profile_cache
+from app.utils.events import event_broker
+from app.utils.streak import STREAK_FIELDS, current_run_start, previous_date, recompute_streak
+from app.utils.timezone import get_ist_date_string
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+
+@router.get("")
+async def pull_changes(
+    since: int = Query(0, ge=0),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Everything that changed after a sync cursor
+    Changed days are sent whole (entries and totals), so edits and deletes
+    need no tombstones
+    
+    Args:
+        since: Cursor from the previous response (0 on first sync)
+        current_user: Authenticated user ID
+    
+    Returns:
+        cursor, changed days, changed profile fields; reset=true when the
+        cursor is too old (or unknown) and the client must refetch
+    """
+    try:
+        # Primary only - a lagging replica could miss changes up to the cursor
+        db = get_database()
+        log = await db.get_changes(current_user, since)
+        if since > log["seq"] or since < log["oldest"] - 1:
+            return {"cursor": log["seq"], "reset": True, "days": {}, "profile": None}
+        
+        dates = sorted({change["date"] for change in log["changes"] if change.get("date")})
+        fields = {field for change in log["changes"] for field in change.get("fields", ())}
+        
+        days = await asyncio.gather(*(db.get_day(current_user, date) for date in dates))
+        profile = None
+        if fields:
+            user = await db.get_user(current_user)
+            if user:
+                dumped = UserResponseSchema.dump_document(user)
+                profile = {field: dumped[field] for field in sorted(fields) if field in dumped}
+        
+        return {
+            "cursor": log["seq"],
+            "reset": False,
+            "days": {date: DailyHistoryResponseSchema.dump_document(day) for date, day in zip(dates, days)},
+            "profile": profile,
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error pulling changes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to sync"
+        )
+
+
+@router.post("")
+async def push_changes(
+    batch: SyncBatchSchema,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Upload workouts and food items logged while offline, in one request
+    Entries whose id is already stored are skipped, so a batch can be
+    re-sent after a dropped response
+    
+    Args:
+        batch: Offline workouts and foods (client ids and loggedAt timestamps)
+        current_user: Authenticated user ID
+    
+    Returns:
+        Accepted / duplicate / rejected entry ids
+    """
+    if len(batch.workouts) + len(batch.foods) > settings.SYNC_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.SYNC_MAX_BATCH} entries per batch"
+        )
+    
+    try:
+        db = get_database()
+        today = get_ist_date_string()
+        oldest = (date_cls.fromisoformat(today) - timedelta(days=settings.SYNC_MAX_PAST_DAYS)).isoformat()
+        
+        # Public entry shape, grouped by IST day
+        by_day = defaultdict(list)
+        rejected = []
+        for kind, items in ((WORKOUT, batch.workouts), (FOOD, batch.foods)):
+            for item in items:
+                day, entry = build_entry(item)
+                if not oldest <= day <= today:
+                    rejected.append({"id": entry["id"], "reason": f"Date must be within the last {settings.SYNC_MAX_PAST_DAYS} days"})
+                    continue
+                by_day[day].append((kind, entry))
+        
+        # Each write checks for the id atomically, so concurrent retries of
+        # the same batch store every entry once
+        added = defaultdict(list)
+        duplicates = []
+        for day, entries in sorted(by_day.items()):
+            for kind, entry in entries:
+                if await db.add_entry_if_absent(current_user, day, kind, entry):
+                    added[day].append((kind, entry))
+                else:
+                    duplicates.append(entry["id"])
+        
+        # Days after the last workout advance the streak in order; only a day
+        # just before the current run can join it to an earlier one and needs
+        # a rebuild (days inside the run already count)
+        workout_days = {day for day, entries in added.items() if any(kind == WORKOUT for kind, _ in entries)}
+        if workout_days:
+            user = await db.get_user(current_user) or {}
+            last = user.get("lastWorkoutDate") or ""
+            start = current_run_start(user)
+            if start and previous_date(start) in workout_days:
+                await recompute_streak(db, current_user)
+            else:
+                for day in sorted(day for day in workout_days if day > last):
+                    await db.record_workout_day(current_user, day)
+                await profile_cache.invalidate(current_user)
+        
+        for day, entries in added.items():
+            await db.record_change(current_user, day, STREAK_FIELDS if day in workout_days else None)
+            await day_cache.invalidate(current_user, day)
+            for kind, entry in entries:
+                await event_broker.publish(current_user, {
+                    "type": "entry.added", "date": day, "kind": kind, "entry": entry,
+                })
+        if added:
+            await analytics_cache.invalidate_user(current_user)
+        
+        # Pull with GET /sync afterwards - changes from other devices may precede these
+        return {
+            "accepted": [entry["id"] for entries in added.values() for _, entry in entries],
+            "duplicates": duplicates,
+            "rejected": rejected,
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error pushing changes: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to sync"
+        )
@@ -1,25 +1,42 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, Request, status, Depends
 from app.models.schemas import UserResponseSchema, UserSettingsUpdateSchema
-from app.core.dependencies import get_current_user
+from app.utils.auth import get_current_user
 from app.models.database import get_database
-from bson import ObjectId
+from app.core.responses import ORJSONResponse
+from app.utils.cache import analytics_cache
+from app.utils.events import event_broker
+from app.utils.etag import make_etag, etag_matches, not_modified
+from app.utils.profile import get_profile, update_profile
+from app.utils.streak import current_streak
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
+def profile_etag(user: dict) -> str:
+    """
+    ETag for a user profile, derived from its version counter
+    The displayed streak can drop to 0 at midnight without a write, so it is included
+    """
+    return make_etag("user", user["_id"], user.get("version", 0), current_streak(user))
+
+
 @router.get("/me", response_model=UserResponseSchema)
-async def get_current_user_profile(current_user_id: str = Depends(get_current_user)):
+async def get_current_user_profile(
+    request: Request,
+    current_user_id: str = Depends(get_current_user),
+):
     """
     Get current authenticated user's profile
+    Served from the profile cache; supports conditional requests via ETag / If-None-Match
     
     Returns:
-        UserResponseSchema with user data
+        UserResponseSchema with user data,
+        or 304 Not Modified if the client's copy is current
     """
     db = get_database()
     
     try:
-        # Find user by ID
-        user = await db["users"].find_one({"_id": ObjectId(current_user_id)})
+        user = await get_profile(db, current_user_id)
         
         if not user:
             raise HTTPException(
@@ -27,17 +44,17 @@ async def get_current_user_profile(current_user_id: str = Depends(get_current_us
                 detail="User not found"
             )
         
-        return UserResponseSchema(
-            id=str(user["_id"]),
-            email=user["email"],
-            username=user["username"],
-            dailyCalorieGoal=user.get("dailyCalorieGoal", 2000),
-            proteinGoal=user.get("proteinGoal", 150),
-            carbsGoal=user.get("carbsGoal", 200),
-            fiberGoal=user.get("fiberGoal", 25),
-            workoutStreak=user.get("workoutStreak", 0),
-            createdAt=user.get("createdAt"),
+        etag = profile_etag(user)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        # Trusted document - skip response_model re-validation
+        return ORJSONResponse(
+            UserResponseSchema.dump_document(user),
+            headers={"ETag": etag},
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -82,12 +99,8 @@ async def update_user_settings(
                 detail="No settings to update"
             )
         
-        # Update user in database
-        result = await db["users"].find_one_and_update(
-            {"_id": ObjectId(current_user_id)},
-            {"$set": update_data},
-            return_document=True
-        )
+        # Update user in database (and the profile cache)
+        result = await update_profile(db, current_user_id, update_data)
         
         if not result:
             raise HTTPException(
@@ -95,16 +108,15 @@ async def update_user_settings(
                 detail="User not found"
             )
         
-        return UserResponseSchema(
-            id=str(result["_id"]),
-            email=result["email"],
-            username=result["username"],
-            dailyCalorieGoal=result.get("dailyCalorieGoal", 2000),
-            proteinGoal=result.get("proteinGoal", 150),
-            carbsGoal=result.get("carbsGoal", 200),
-            fiberGoal=result.get("fiberGoal", 25),
-            workoutStreak=result.get("workoutStreak", 0),
-            createdAt=result.get("createdAt"),
+        await db.record_change(current_user_id, fields=list(update_data))
+        # Goals feed the analytics summary
+        await analytics_cache.invalidate_user(current_user_id)
+        await event_broker.publish(current_user_id, {"type": "profile.updated", "fields": update_data})
+        
+        # Trusted document - skip response_model re-validation
+        return ORJSONResponse(
+            UserResponseSchema.dump_document(result),
+            headers={"ETag": profile_etag(result)},
         )
     except HTTPException:
         raise
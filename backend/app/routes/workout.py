@@ -1,75 +1,212 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from datetime import datetime, date as date_cls
+from typing import Optional
 from uuid import uuid4
+import orjson
+from app.models.daily_logs import WORKOUT
 from app.models.database import get_database
-from app.models.schemas import WorkoutLogSchema
+from app.models.schemas import WorkoutLogSchema, WorkoutUpdateSchema
 from app.utils.auth import get_current_user
+from app.utils.cache import day_cache, analytics_cache, profile_cache
+from app.utils.events import event_broker
+from app.utils.idempotency import fingerprint, run_idempotent
+from app.utils.streak import STREAK_FIELDS, recompute_streak, touches_current_run
 from app.utils.timezone import get_ist_now, get_ist_date_string
 
 router = APIRouter(prefix="/workout", tags=["workout logging"])
 
 
+async def _log_workout(workout: WorkoutLogSchema, current_user: str) -> dict:
+    """Store a workout for today and notify caches, sync and live clients"""
+    db = get_database()
+    today = get_ist_date_string()
+    
+    # Create workout entry
+    workout_entry = {
+        "id": str(uuid4()),
+        "exercise": workout.exercise,
+        "sets": workout.sets,
+        "reps": workout.reps,
+        "weight": workout.weight,
+        "duration": workout.duration,
+        "date": get_ist_now().isoformat(),
+    }
+    
+    # Append to the day (created on first write)
+    await db.add_workout(current_user, today, workout_entry)
+    
+    # O(1) streak update - the workout is already saved, so a failure here
+    # is only logged (python -m app.utils.streak repairs it)
+    try:
+        await db.record_workout_day(current_user, today)
+    except Exception as e:
+        print(f"Error updating workout streak: {e}")
+    
+    await db.record_change(current_user, today, STREAK_FIELDS)
+    await day_cache.invalidate(current_user, today)
+    await analytics_cache.invalidate_user(current_user)
+    await profile_cache.invalidate(current_user)
+    await event_broker.publish(current_user, {
+        "type": "entry.added", "date": today, "kind": WORKOUT, "entry": workout_entry,
+    })
+    
+    return {
+        "message": "Workout logged successfully",
+        "workoutId": workout_entry["id"],
+        "date": today
+    }
+
+
 @router.post("/")
 async def log_workout(
     workout: WorkoutLogSchema,
     current_user: str = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     """
     Log a workout for the current user
+    A retry with the same Idempotency-Key returns the first response
+    instead of logging the workout again
     
     Args:
         workout: Workout details (exercise, sets, reps, weight, duration)
         current_user: Authenticated user ID
+        idempotency_key: Optional client-generated key, unique per workout
     
     Returns:
         Success message with saved workout ID
     """
     try:
+        return await run_idempotent(
+            get_database(),
+            current_user,
+            idempotency_key,
+            fingerprint(b"POST /workout", orjson.dumps(workout.model_dump())),
+            lambda: _log_workout(workout, current_user),
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error logging workout: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to log workout"
+        )
+
+
+@router.patch("/{workout_id}")
+async def update_workout(
+    workout_id: str,
+    workout: WorkoutUpdateSchema,
+    date: Optional[date_cls] = None,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Edit a logged workout in place
+    
+    Args:
+        workout_id: ID of the workout entry
+        workout: Fields to change
+        date: Day the workout was logged on (default: today, IST)
+        current_user: Authenticated user ID
+    
+    Returns:
+        The updated workout entry
+    """
+    fields = workout.model_dump(exclude_none=True)
+    if not fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields to update"
+        )
+    
+    try:
+        day = date.isoformat() if date else get_ist_date_string()
         db = get_database()
-        today = get_ist_date_string()
-        
-        # Create workout entry
-        workout_entry = {
-            "id": str(uuid4()),
-            "exercise": workout.exercise,
-            "sets": workout.sets,
-            "reps": workout.reps,
-            "weight": workout.weight,
-            "duration": workout.duration,
-            "date": get_ist_now().isoformat(),
-        }
+        entry = await db.update_entry(current_user, day, WORKOUT, workout_id, fields)
+        if entry is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workout not found"
+            )
         
-        # Update or create daily log
-        daily_log = await db["daily_logs"].find_one({
-            "user_id": current_user,
-            "date": today
+        await db.record_change(current_user, day)
+        await day_cache.invalidate(current_user, day)
+        await analytics_cache.invalidate_user(current_user)
+        await event_broker.publish(current_user, {
+            "type": "entry.updated", "date": day, "kind": WORKOUT, "entry": entry,
         })
         
-        if daily_log:
-            # Append to existing day
-            result = await db["daily_logs"].update_one(
-                {"user_id": current_user, "date": today},
-                {"$push": {"workouts": workout_entry}}
+        return {
+            "message": "Workout updated successfully",
+            "workout": entry,
+            "date": day
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error updating workout: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update workout"
+        )
+
+
+@router.delete("/{workout_id}")
+async def delete_workout(
+    workout_id: str,
+    date: Optional[date_cls] = None,
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Delete a logged workout
+    
+    Args:
+        workout_id: ID of the workout entry
+        date: Day the workout was logged on (default: today, IST)
+        current_user: Authenticated user ID
+    
+    Returns:
+        Success message with the deleted workout ID
+    """
+    try:
+        db = get_database()
+        day = date.isoformat() if date else get_ist_date_string()
+        entry = await db.delete_entry(current_user, day, WORKOUT, workout_id)
+        if entry is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Workout not found"
             )
-        else:
-            # Create new day
-            result = await db["daily_logs"].insert_one({
-                "user_id": current_user,
-                "date": today,
-                "workouts": [workout_entry],
-                "nutrition": {"totalCalories": 0, "items": []},
-                "createdAt": get_ist_now(),
-            })
+        
+        # The day may no longer count towards the current run
+        try:
+            user = await db.get_user(current_user)
+            if user and touches_current_run(user, day):
+                await recompute_streak(db, current_user)
+        except Exception as e:
+            print(f"Error updating workout streak: {e}")
+        
+        await db.record_change(current_user, day, STREAK_FIELDS)
+        await day_cache.invalidate(current_user, day)
+        await analytics_cache.invalidate_user(current_user)
+        await event_broker.publish(current_user, {
+            "type": "entry.deleted", "date": day, "kind": WORKOUT, "id": workout_id,
+        })
         
         return {
-            "message": "Workout logged successfully",
-            "workoutId": workout_entry["id"],
-            "date": today
+            "message": "Workout deleted successfully",
+            "workoutId": workout_id,
+            "date": day
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error logging workout: {e}")
+        print(f"Error deleting workout: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to log workout"
+            detail="Failed to delete workout"
         )
@@ -0,0 +1,225 @@
+"""
+Storage engine interface
+Routes talk to a StorageEngine (returned by get_database()) instead of a
+driver, so the backing store can be MongoDB or an embedded SQLite file.
+
+Documents cross this boundary in the public shape used by the API:
+users carry "_id", days use "YYYY-MM-DD" dates and the embedded
+workouts / nutrition.items shape, and every write bumps "version".
+"""
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional, Tuple
+
+
+class DuplicateError(Exception):
+    """A unique constraint (e.g. users.email) was violated"""
+
+
+class StorageEngine(ABC):
+    """Base class for storage engines; every abstract method must be implemented"""
+
+    name = "base"
+
+    # ==================== LIFECYCLE ====================
+
+    @abstractmethod
+    async def ping(self) -> bool:
+        """Round-trip to the backing store"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Release connections / file handles"""
+
+    def for_history(self) -> "StorageEngine":
+        """Engine to use for history reads (may route to replicas)"""
+        return self
+
+    # ==================== USERS ====================
+
+    @abstractmethod
+    async def create_user(self, user: dict) -> str:
+        """
+        Insert a user; sets user["_id"]
+
+        Raises:
+            DuplicateError: If the email is already registered
+        """
+
+    @abstractmethod
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_user_version(self, user_id: str) -> Optional[dict]:
+        """_id, version and the streak fields of a user (enough for the profile ETag)"""
+
+    @abstractmethod
+    async def update_user(self, user_id: str, fields: dict) -> Optional[dict]:
+        """Set fields and bump the version; returns the updated user"""
+
+    @abstractmethod
+    async def record_workout_day(self, user_id: str, date: str) -> None:
+        """
+        Atomically advance the streak for a workout on `date`
+        (app/utils/streak.advance_streak); bumps the version only on change
+        """
+
+    @abstractmethod
+    def user_ids(self) -> AsyncIterator[str]:
+        """Iterate over every user id (maintenance jobs)"""
+
+    # ==================== DAILY LOGS ====================
+
+    @abstractmethod
+    async def get_day(self, user_id: str, date: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_day_version(self, user_id: str, date: str) -> Optional[dict]:
+        """Only _id and version of a day"""
+
+    @abstractmethod
+    async def get_days(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        """Days in an inclusive range, ordered by date"""
+
+    @abstractmethod
+    async def get_day_versions(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def get_daily_totals(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        """
+        Per-day totals for analytics, without loading entries
+        Rows carry date, the nutrition totals (total_calories, ...) and the
+        workout stats (workouts, volume, duration); days without data are omitted
+        """
+
+    @abstractmethod
+    async def get_workout_dates(self, user_id: str) -> List[str]:
+        """Every date (hot and archived) with at least one workout, ascending"""
+
+    @abstractmethod
+    async def add_workout(self, user_id: str, date: str, workout_entry: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def add_food_item(self, user_id: str, date: str, food_entry: dict, totals: dict) -> None:
+        """Append a food item and add `totals` (e.g. {"total_calories": 52}) to the day"""
+
+    @abstractmethod
+    async def add_entry_if_absent(self, user_id: str, date: str, kind: str, entry: dict) -> bool:
+        """
+        Atomically append an entry ("workout" / "food") unless the day already
+        holds one with the same id; food totals are derived from the entry
+
+        Returns:
+            False if the id was already stored (nothing written)
+        """
+
+    @abstractmethod
+    async def update_entry(self, user_id: str, date: str, kind: str, entry_id: str, fields: dict) -> Optional[dict]:
+        """
+        Atomically edit one workout / food entry ("workout" / "food") and bump
+        the day version; food nutrient changes move the day totals by the difference
+
+        Returns:
+            The updated entry, or None if the day has no such entry
+        """
+
+    @abstractmethod
+    async def delete_entry(self, user_id: str, date: str, kind: str, entry_id: str) -> Optional[dict]:
+        """
+        Atomically remove one entry (food items are subtracted from the totals)
+
+        Returns:
+            The removed entry, or None if the day has no such entry
+        """
+
+    # ==================== BULK EXPORT / IMPORT ====================
+
+    @abstractmethod
+    def iter_days(self, user_id: str) -> AsyncIterator[dict]:
+        """
+        Stream every day of a user (hot and archived) in date order, holding
+        at most EXPORT_BATCH_SIZE days in memory
+        """
+
+    @abstractmethod
+    async def add_entries(self, user_id: str, entries: List[Tuple[str, str, dict]]) -> None:
+        """
+        Append a batch of (date, kind, entry) triples across any number of days;
+        food totals are derived from the entries and each touched day's version is bumped
+        """
+
+    # ==================== CHANGE LOG ====================
+
+    @abstractmethod
+    async def record_change(self, user_id: str, date: Optional[str] = None, fields: Optional[List[str]] = None) -> int:
+        """
+        Append a sync change record (call after the data write has completed)
+
+        Args:
+            date: Day whose entries / totals changed
+            fields: Profile fields that changed
+
+        Returns:
+            The new per-user sequence number
+        """
+
+    @abstractmethod
+    async def get_changes(self, user_id: str, since: int) -> dict:
+        """
+        {"seq": latest, "oldest": oldest retained seq, "changes": [{"seq", "date"?, "fields"?}, ...]}
+        with only the records after `since`
+        """
+
+    # ==================== IDEMPOTENCY KEYS ====================
+
+    @abstractmethod
+    async def claim_request(self, user_id: str, key: str, fingerprint: str) -> Optional[dict]:
+        """
+        Claim an Idempotency-Key for the calling request (locked for
+        IDEMPOTENCY_LOCK_SECONDS, kept for IDEMPOTENCY_TTL_HOURS)
+
+        Returns:
+            None if the caller now owns the key, else the existing
+            {"fingerprint", "response"} record (response None while in flight)
+        """
+
+    @abstractmethod
+    async def complete_request(self, user_id: str, key: str, response: dict) -> None:
+        """Store {"status", "body"} for a claimed key"""
+
+    @abstractmethod
+    async def release_request(self, user_id: str, key: str) -> None:
+        """Drop an in-flight key whose request failed"""
+
+    # ==================== REFRESH TOKENS ====================
+
+    @abstractmethod
+    async def create_refresh_token(self, user_id: str, token_hash: str, family: str) -> None:
+        """Store a refresh token (by its SHA-256) valid for REFRESH_TOKEN_EXPIRE_DAYS"""
+
+    @abstractmethod
+    async def use_refresh_token(self, token_hash: str) -> Optional[dict]:
+        """
+        Mark a refresh token used
+
+        Returns:
+            None if unknown or expired, else {"user_id", "family", "state"}
+            with state "active" (first use), "used" or "revoked"
+        """
+
+    @abstractmethod
+    async def revoke_refresh_tokens(self, user_id: str, family: Optional[str] = None) -> int:
+        """Revoke a login session's tokens (or all of the user's); returns tokens revoked"""
+
+    # ==================== ROLLUPS ====================
+
+    @abstractmethod
+    async def archive_days(self, older_than_days: Optional[int] = None) -> int:
+        """Move expiring days into long-term storage; returns days written"""
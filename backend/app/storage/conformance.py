@@ -0,0 +1,433 @@
+"""
+Storage engine conformance suite
+Runs the same behavioural checks against every engine so they stay
+interchangeable behind get_database():
+
+    python -m app.storage.conformance                 # sqlite (temporary file)
+    python -m app.storage.conformance --engine mongo  # throwaway database at MONGO_URI
+    python -m app.storage.conformance --engine all
+
+Exits non-zero if any check fails. tests/test_storage_conformance.py runs
+the same checks under pytest.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from uuid import uuid4
+
+from app.storage.base import DuplicateError, StorageEngine
+from app.utils.timezone import get_ist_now
+
+CONFORMANCE_DB = "storage_conformance"
+
+Check = Callable[[StorageEngine], Awaitable[None]]
+CHECKS: List[Tuple[str, Check]] = []
+
+
+def check(fn: Check) -> Check:
+    CHECKS.append((fn.__name__, fn))
+    return fn
+
+
+def new_user() -> dict:
+    return {
+        "email": f"{uuid4().hex}@example.com",
+        "username": "tester",
+        "password": "hash",
+        "dailyCalorieGoal": 2000,
+        "workoutStreak": 0,
+        "createdAt": get_ist_now(),
+    }
+
+
+def workout(name: str) -> dict:
+    return {"id": str(uuid4()), "exercise": name, "sets": 3, "reps": 10,
+            "weight": 50.0, "duration": 20, "date": get_ist_now().isoformat()}
+
+
+def food(name: str, calories: float) -> Tuple[dict, dict]:
+    entry = {"id": str(uuid4()), "name": name, "calories": calories, "protein": 1.0,
+             "carbs": 2.0, "fat": 0.5, "fiber": 0.1, "confidence": 0.9,
+             "date": get_ist_now().isoformat()}
+    totals = {"total_calories": calories, "total_protein": 1.0, "total_carbs": 2.0,
+              "total_fat": 0.5, "total_fiber": 0.1}
+    return entry, totals
+
+
+# ==================== USERS ====================
+
+@check
+async def users_round_trip(engine: StorageEngine):
+    user = new_user()
+    user_id = await engine.create_user(user)
+    assert str(user["_id"]) == user_id
+
+    stored = await engine.get_user(user_id)
+    assert stored and str(stored["_id"]) == user_id
+    assert stored["email"] == user["email"] and stored["username"] == "tester"
+    assert stored["createdAt"] is not None
+
+    by_email = await engine.get_user_by_email(user["email"])
+    assert str(by_email["_id"]) == user_id
+
+
+@check
+async def users_unique_email(engine: StorageEngine):
+    user = new_user()
+    await engine.create_user(user)
+    try:
+        await engine.create_user({**new_user(), "email": user["email"]})
+    except DuplicateError:
+        return
+    raise AssertionError("duplicate email was accepted")
+
+
+@check
+async def users_update_bumps_version(engine: StorageEngine):
+    user_id = await engine.create_user(new_user())
+    before = (await engine.get_user_version(user_id)).get("version", 0)
+
+    updated = await engine.update_user(user_id, {"username": "renamed", "proteinGoal": 140})
+    assert updated["username"] == "renamed" and updated["proteinGoal"] == 140
+    assert updated["email"]
+
+    after = await engine.get_user_version(user_id)
+    assert after["version"] == before + 1
+
+
+@check
+async def users_missing(engine: StorageEngine):
+    assert await engine.get_user("000000000000000000000000") is None
+    assert await engine.get_user("not-an-id") is None
+    assert await engine.get_user_by_email("nobody@example.com") is None
+    assert await engine.update_user("000000000000000000000000", {"username": "x"}) is None
+
+
+# ==================== DAILY LOGS ====================
+
+@check
+async def day_missing(engine: StorageEngine):
+    user_id = str(uuid4())
+    assert await engine.get_day(user_id, "2024-02-23") is None
+    assert await engine.get_day_version(user_id, "2024-02-23") is None
+    assert await engine.get_days(user_id, "2024-02-01", "2024-02-29") == []
+
+
+@check
+async def day_append_and_read(engine: StorageEngine):
+    user_id, date = str(uuid4()), get_ist_now().date().isoformat()
+    first, second = workout("Squat"), workout("Bench")
+    apple, apple_totals = food("apple", 52)
+    rice, rice_totals = food("rice", 130)
+
+    await engine.add_workout(user_id, date, first)
+    await engine.add_food_item(user_id, date, apple, apple_totals)
+    await engine.add_workout(user_id, date, second)
+    await engine.add_food_item(user_id, date, rice, rice_totals)
+
+    day = await engine.get_day(user_id, date)
+    assert day["date"] == date
+    assert [w["id"] for w in day["workouts"]] == [first["id"], second["id"]]
+    assert [i["id"] for i in day["nutrition"]["items"]] == [apple["id"], rice["id"]]
+    assert day["workouts"][0]["exercise"] == "Squat"
+    assert day["nutrition"]["total_calories"] == 182
+    assert abs(day["nutrition"]["total_protein"] - 2.0) < 1e-9
+    assert day["version"] == 4
+
+    version = await engine.get_day_version(user_id, date)
+    assert version["_id"] == day["_id"] and version["version"] == 4
+
+
+@check
+async def day_range(engine: StorageEngine):
+    user_id = str(uuid4())
+    for date in ("2024-02-27", "2024-02-25", "2024-03-01"):
+        await engine.add_workout(user_id, date, workout(date))
+
+    days = await engine.get_days(user_id, "2024-02-25", "2024-02-29")
+    assert [d["date"] for d in days] == ["2024-02-25", "2024-02-27"]
+    assert days[0]["workouts"][0]["exercise"] == "2024-02-25"
+
+    versions = await engine.get_day_versions(user_id, "2024-02-25", "2024-02-29")
+    assert [(v["_id"], v["version"]) for v in versions] == [(d["_id"], d["version"]) for d in days]
+
+
+@check
+async def day_totals(engine: StorageEngine):
+    user_id = str(uuid4())
+    await engine.add_workout(user_id, "2024-02-21", workout("Squat"))
+    await engine.add_workout(user_id, "2024-02-21", workout("Bench"))
+    await engine.add_food_item(user_id, "2024-02-21", *food("apple", 52))
+    await engine.add_food_item(user_id, "2024-02-23", *food("rice", 130))
+    await engine.add_food_item(user_id, "2024-03-01", *food("pear", 57))
+
+    rows = await engine.get_daily_totals(user_id, "2024-02-20", "2024-02-29")
+    assert [row["date"] for row in rows] == ["2024-02-21", "2024-02-23"]
+    assert rows[0]["total_calories"] == 52 and rows[1]["total_calories"] == 130
+    assert (rows[0]["workouts"], rows[0]["volume"], rows[0]["duration"]) == (2, 3000, 40)
+    assert (rows[1]["workouts"], rows[1]["volume"], rows[1]["duration"]) == (0, 0, 0)
+
+
+@check
+async def entry_edit_and_delete(engine: StorageEngine):
+    user_id, date = str(uuid4()), "2024-02-23"
+    squat, bench = workout("Squat"), workout("Bench")
+    apple, apple_totals = food("apple", 52)
+    rice, rice_totals = food("rice", 130)
+    await engine.add_workout(user_id, date, squat)
+    await engine.add_workout(user_id, date, bench)
+    await engine.add_food_item(user_id, date, apple, apple_totals)
+    await engine.add_food_item(user_id, date, rice, rice_totals)
+
+    edited = await engine.update_entry(user_id, date, "workout", squat["id"], {"sets": 5, "weight": 60.0})
+    assert (edited["id"], edited["sets"], edited["weight"], edited["exercise"]) == (squat["id"], 5, 60.0, "Squat")
+    edited = await engine.update_entry(user_id, date, "food", rice["id"], {"calories": 200, "protein": 4.0})
+    assert (edited["calories"], edited["name"]) == (200, "rice")
+
+    removed = await engine.delete_entry(user_id, date, "food", apple["id"])
+    assert removed["id"] == apple["id"]
+    assert (await engine.delete_entry(user_id, date, "workout", bench["id"]))["id"] == bench["id"]
+
+    day = await engine.get_day(user_id, date)
+    assert [(w["id"], w["sets"]) for w in day["workouts"]] == [(squat["id"], 5)]
+    assert [(i["id"], i["calories"]) for i in day["nutrition"]["items"]] == [(rice["id"], 200)]
+    assert day["nutrition"]["total_calories"] == 200
+    assert abs(day["nutrition"]["total_protein"] - 4.0) < 1e-9
+    assert abs(day["nutrition"]["total_carbs"] - 2.0) < 1e-9
+    assert day["version"] == 8
+
+    # Unknown ids, other kinds and other days are not touched
+    assert await engine.delete_entry(user_id, date, "workout", apple["id"]) is None
+    assert await engine.delete_entry(user_id, date, "food", str(uuid4())) is None
+    assert await engine.update_entry(user_id, "2024-02-24", "workout", squat["id"], {"sets": 1}) is None
+    assert await engine.delete_entry(user_id, date, "workout", "not-an-id") is None
+    assert (await engine.get_day_version(user_id, date))["version"] == 8
+
+
+@check
+async def day_concurrent_writes(engine: StorageEngine):
+    user_id, date = str(uuid4()), "2024-02-23"
+    entries = [food(f"item-{n}", 10) for n in range(25)]
+    await asyncio.gather(*(engine.add_food_item(user_id, date, e, t) for e, t in entries))
+
+    day = await engine.get_day(user_id, date)
+    assert len(day["nutrition"]["items"]) == 25
+    assert day["nutrition"]["total_calories"] == 250
+    assert day["version"] == 25
+
+
+@check
+async def entry_added_once(engine: StorageEngine):
+    user_id, date = str(uuid4()), "2024-02-23"
+    apple, _ = food("apple", 52)
+    squat = workout("Squat")
+
+    # Concurrent retries of the same entries, the first on a day that does not exist yet
+    results = await asyncio.gather(
+        *(engine.add_entry_if_absent(user_id, date, "food", apple) for _ in range(5)),
+        *(engine.add_entry_if_absent(user_id, date, "workout", squat) for _ in range(5)),
+    )
+    assert sorted(results) == [False] * 8 + [True] * 2, results
+    assert not await engine.add_entry_if_absent(user_id, date, "food", apple)
+
+    day = await engine.get_day(user_id, date)
+    assert [i["id"] for i in day["nutrition"]["items"]] == [apple["id"]]
+    assert [w["id"] for w in day["workouts"]] == [squat["id"]]
+    assert day["nutrition"]["total_calories"] == 52
+    assert day["version"] == 2
+
+
+# ==================== STREAKS ====================
+
+@check
+async def streak_advances_atomically(engine: StorageEngine):
+    user_id = await engine.create_user(new_user())
+    # (date, workoutStreak, longestStreak, version bumped)
+    steps = [
+        ("2024-02-20", 1, 1, True), ("2024-02-21", 2, 2, True), ("2024-02-21", 2, 2, False),
+        ("2024-02-22", 3, 3, True), ("2024-02-25", 1, 3, True), ("2024-02-26", 2, 3, True),
+    ]
+    for date, streak, longest, bumped in steps:
+        before = (await engine.get_user_version(user_id)).get("version", 0)
+        await engine.record_workout_day(user_id, date)
+        user = await engine.get_user(user_id)
+        state = (user["workoutStreak"], user["longestStreak"], user["lastWorkoutDate"])
+        assert state == (streak, longest, date), (date, state)
+        assert (user.get("version", 0) != before) == bumped, date
+
+
+@check
+async def streak_recompute(engine: StorageEngine):
+    from app.utils.streak import recompute_streak
+
+    user_id = await engine.create_user(new_user())
+    for date in ("2024-02-24", "2024-02-20", "2024-02-21", "2024-02-25", "2024-02-26"):
+        await engine.add_workout(user_id, date, workout(date))
+    await engine.add_food_item(user_id, "2024-02-22", *food("apple", 52))
+
+    assert await engine.get_workout_dates(user_id) == [
+        "2024-02-20", "2024-02-21", "2024-02-24", "2024-02-25", "2024-02-26",
+    ]
+    user = await recompute_streak(engine, user_id)
+    assert (user["workoutStreak"], user["longestStreak"], user["lastWorkoutDate"]) == (3, 3, "2024-02-26")
+
+
+@check
+async def bulk_add_and_iterate(engine: StorageEngine):
+    user_id = str(uuid4())
+    await engine.add_workout(user_id, "2024-02-21", workout("Squat"))
+    before = (await engine.get_day_version(user_id, "2024-02-21"))["version"]
+
+    apple, _ = food("apple", 52)
+    rice, _ = food("rice", 130)
+    await engine.add_entries(user_id, [
+        ("2024-02-22", "food", apple),
+        ("2024-02-21", "workout", workout("Bench")),
+        ("2024-02-20", "workout", workout("Row")),
+        ("2024-02-22", "food", rice),
+    ])
+
+    days = [day async for day in engine.iter_days(user_id)]
+    assert [day["date"] for day in days] == ["2024-02-20", "2024-02-21", "2024-02-22"], days
+    assert [w["exercise"] for w in days[1]["workouts"]] == ["Squat", "Bench"], days[1]
+    assert days[1]["version"] != before
+    assert [i["name"] for i in days[2]["nutrition"]["items"]] == ["apple", "rice"], days[2]
+    assert days[2]["nutrition"]["total_calories"] == 182, days[2]["nutrition"]
+    assert days[2]["workouts"] == []
+
+
+@check
+async def change_log(engine: StorageEngine):
+    from app.core.config import settings
+
+    user_id = str(uuid4())
+    assert (await engine.get_changes(user_id, 0))["changes"] == []
+
+    assert await engine.record_change(user_id, "2024-02-20") == 1
+    assert await engine.record_change(user_id, fields=["proteinGoal"]) == 2
+    assert await engine.record_change(user_id, "2024-02-21", ["workoutStreak"]) == 3
+    log = await engine.get_changes(user_id, 1)
+    assert (log["seq"], log["oldest"]) == (3, 1), log
+    assert [change.get("date") for change in log["changes"]] == [None, "2024-02-21"], log
+    assert log["changes"][0]["fields"] == ["proteinGoal"], log
+
+    # Only the newest SYNC_LOG_SIZE records are kept
+    for _ in range(settings.SYNC_LOG_SIZE):
+        seq = await engine.record_change(user_id, "2024-02-22")
+    log = await engine.get_changes(user_id, seq - 1)
+    assert (log["seq"], log["oldest"]) == (seq, seq - settings.SYNC_LOG_SIZE + 1), log
+    assert [change["seq"] for change in log["changes"]] == [seq], log
+
+
+@check
+async def idempotency_keys(engine: StorageEngine):
+    user_id, key = str(uuid4()), uuid4().hex
+    assert await engine.claim_request(user_id, key, "a") is None
+    assert await engine.claim_request(user_id, key, "a") == {"fingerprint": "a", "response": None}
+
+    # A failed request releases the key; the next claim owns it
+    await engine.release_request(user_id, key)
+    assert await engine.claim_request(user_id, key, "a") is None
+
+    response = {"status": 200, "body": {"workoutId": "x"}}
+    await engine.complete_request(user_id, key, response)
+    await engine.release_request(user_id, key)
+    assert await engine.claim_request(user_id, key, "b") == {"fingerprint": "a", "response": response}
+    assert await engine.claim_request(str(uuid4()), key, "b") is None
+
+
+@check
+async def refresh_tokens(engine: StorageEngine):
+    user_id = str(uuid4())
+    first, second, other = uuid4().hex, uuid4().hex, uuid4().hex
+    assert await engine.use_refresh_token(uuid4().hex) is None
+
+    await engine.create_refresh_token(user_id, first, "f1")
+    await engine.create_refresh_token(user_id, other, "f2")
+    assert await engine.use_refresh_token(first) == {"user_id": user_id, "family": "f1", "state": "active"}
+    assert (await engine.use_refresh_token(first))["state"] == "used"
+
+    # Revoking one session leaves the others usable
+    await engine.create_refresh_token(user_id, second, "f1")
+    assert await engine.revoke_refresh_tokens(user_id, "f1") == 2
+    assert (await engine.use_refresh_token(second))["state"] == "revoked"
+    assert await engine.revoke_refresh_tokens(user_id) == 1
+    assert (await engine.use_refresh_token(other))["state"] == "revoked"
+
+
+@check
+async def rollups_callable(engine: StorageEngine):
+    assert isinstance(await engine.archive_days(), int)
+
+
+# ==================== RUNNER ====================
+
+async def run_checks(engine: StorageEngine) -> int:
+    """Run every check against an engine; returns the number of failures"""
+    failures = 0
+    for name, fn in CHECKS:
+        started = time.perf_counter()
+        try:
+            await fn(engine)
+            print(f"  ✓ {name:<32} {(time.perf_counter() - started) * 1000:7.2f} ms")
+        except Exception as e:
+            failures += 1
+            print(f"  ✗ {name:<32} {type(e).__name__}: {e}")
+    return failures
+
+
+@asynccontextmanager
+async def sqlite_engine() -> AsyncIterator[StorageEngine]:
+    """SQLite engine on a temporary file"""
+    from app.storage.sqlite import SQLiteStorage
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = SQLiteStorage(os.path.join(directory, "conformance.db"))
+        try:
+            yield engine
+        finally:
+            await engine.close()
+
+
+@asynccontextmanager
+async def mongo_engine(uri: Optional[str] = None) -> AsyncIterator[StorageEngine]:
+    """Mongo engine on a migrated throwaway database (default: MONGO_URI), dropped afterwards"""
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core.config import settings
+    from app.models.migrations import apply_migrations
+    from app.storage.mongo import MongoStorage
+
+    client = AsyncIOMotorClient(uri or settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        await client.drop_database(CONFORMANCE_DB)
+        db = client[CONFORMANCE_DB]
+        await apply_migrations(db)
+        yield MongoStorage(db)
+    finally:
+        await client.drop_database(CONFORMANCE_DB)
+        client.close()
+
+
+ENGINES = {"sqlite": sqlite_engine, "mongo": mongo_engine}
+
+
+async def _main(engine: str) -> int:
+    failures = 0
+    for name, open_engine in ENGINES.items():
+        if engine in (name, "all"):
+            async with open_engine() as storage:
+                print(name)
+                failures += await run_checks(storage)
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the storage engine conformance suite")
+    parser.add_argument("--engine", choices=["sqlite", "mongo", "all"], default="sqlite")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(_main(args.engine)) else 0)
@@ -0,0 +1,188 @@
+"""
+MongoDB storage engine (Motor)
+Daily logs go through app/models/daily_logs.py and rollups through
+app/models/archive.py, so layouts, encoding and the cold archive behave
+exactly as before.
+"""
+from typing import AsyncIterator, List, Optional, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.models import archive, change_log, daily_logs, idempotency, refresh_tokens
+from app.storage.base import DuplicateError, StorageEngine
+from app.utils.streak import previous_date
+
+# Fields needed to build the profile ETag
+USER_VERSION_PROJECTION = {"_id": 1, "version": 1, "workoutStreak": 1, "lastWorkoutDate": 1}
+
+
+def _object_id(user_id: str) -> Optional[ObjectId]:
+    return ObjectId(user_id) if ObjectId.is_valid(user_id) else None
+
+
+class MongoStorage(StorageEngine):
+    """Storage engine backed by a Motor database"""
+
+    name = "mongo"
+
+    def __init__(self, db: AsyncIOMotorDatabase, history_db: Optional[AsyncIOMotorDatabase] = None):
+        self.db = db
+        self._history = MongoStorage(history_db) if history_db is not None else self
+
+    async def ping(self) -> bool:
+        await self.db.command("ping")
+        return True
+
+    async def close(self) -> None:
+        self.db.client.close()
+
+    def for_history(self) -> StorageEngine:
+        return self._history
+
+    # ==================== USERS ====================
+
+    async def create_user(self, user: dict) -> str:
+        try:
+            result = await self.db["users"].insert_one(user)
+        except DuplicateKeyError as e:
+            raise DuplicateError(str(e))
+        return str(result.inserted_id)
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        oid = _object_id(user_id)
+        return await self.db["users"].find_one({"_id": oid}) if oid else None
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return await self.db["users"].find_one({"email": email})
+
+    async def get_user_version(self, user_id: str) -> Optional[dict]:
+        oid = _object_id(user_id)
+        return await self.db["users"].find_one({"_id": oid}, USER_VERSION_PROJECTION) if oid else None
+
+    async def update_user(self, user_id: str, fields: dict) -> Optional[dict]:
+        oid = _object_id(user_id)
+        if not oid:
+            return None
+        return await self.db["users"].find_one_and_update(
+            {"_id": oid},
+            {"$set": fields, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def record_workout_day(self, user_id: str, date: str) -> None:
+        oid = _object_id(user_id)
+        if not oid:
+            return
+        last = {"$ifNull": ["$lastWorkoutDate", ""]}
+        streak = {"$ifNull": ["$workoutStreak", 0]}
+        already_counted = {"$gte": [last, date]}
+
+        # Pipeline update: the first stage reads the pre-update values
+        await self.db["users"].update_one({"_id": oid}, [
+            {"$set": {
+                "workoutStreak": {"$switch": {
+                    "branches": [
+                        {"case": already_counted, "then": streak},
+                        {"case": {"$eq": [last, previous_date(date)]}, "then": {"$add": [streak, 1]}},
+                    ],
+                    "default": 1,
+                }},
+                "lastWorkoutDate": {"$max": ["$lastWorkoutDate", date]},
+                "version": {"$cond": [
+                    already_counted,
+                    "$version",
+                    {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                ]},
+            }},
+            {"$set": {"longestStreak": {"$max": [{"$ifNull": ["$longestStreak", 0]}, "$workoutStreak"]}}},
+        ])
+
+    async def user_ids(self) -> AsyncIterator[str]:
+        async for user in self.db["users"].find({}, {"_id": 1}):
+            yield str(user["_id"])
+
+    # ==================== DAILY LOGS ====================
+
+    async def get_day(self, user_id: str, date: str) -> Optional[dict]:
+        return await daily_logs.get_day(self.db, user_id, date)
+
+    async def get_day_version(self, user_id: str, date: str) -> Optional[dict]:
+        return await daily_logs.get_day_version(self.db, user_id, date)
+
+    async def get_days(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        return await daily_logs.get_days(self.db, user_id, start_date, end_date)
+
+    async def get_day_versions(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        return await daily_logs.get_day_versions(self.db, user_id, start_date, end_date)
+
+    async def get_daily_totals(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        return await daily_logs.get_daily_totals(self.db, user_id, start_date, end_date)
+
+    async def get_workout_dates(self, user_id: str) -> List[str]:
+        return await daily_logs.get_workout_dates(self.db, user_id)
+
+    async def add_workout(self, user_id: str, date: str, workout_entry: dict) -> None:
+        await daily_logs.add_workout(self.db, user_id, date, workout_entry)
+
+    async def add_food_item(self, user_id: str, date: str, food_entry: dict, totals: dict) -> None:
+        await daily_logs.add_food_item(self.db, user_id, date, food_entry, totals)
+
+    async def add_entry_if_absent(self, user_id: str, date: str, kind: str, entry: dict) -> bool:
+        return await daily_logs.add_entry_if_absent(self.db, user_id, date, kind, entry)
+
+    async def update_entry(self, user_id: str, date: str, kind: str, entry_id: str, fields: dict) -> Optional[dict]:
+        return await daily_logs.update_entry(self.db, user_id, date, kind, entry_id, fields)
+
+    async def delete_entry(self, user_id: str, date: str, kind: str, entry_id: str) -> Optional[dict]:
+        return await daily_logs.delete_entry(self.db, user_id, date, kind, entry_id)
+
+    # ==================== BULK EXPORT / IMPORT ====================
+
+    async def iter_days(self, user_id: str) -> AsyncIterator[dict]:
+        async for day in daily_logs.iter_days(self.db, user_id, settings.EXPORT_BATCH_SIZE):
+            yield day
+
+    async def add_entries(self, user_id: str, entries: List[Tuple[str, str, dict]]) -> None:
+        await daily_logs.add_entries(self.db, user_id, entries)
+
+    # ==================== CHANGE LOG ====================
+
+    async def record_change(self, user_id: str, date: Optional[str] = None, fields: Optional[List[str]] = None) -> int:
+        return await change_log.record_change(self.db, user_id, date, fields, settings.SYNC_LOG_SIZE)
+
+    async def get_changes(self, user_id: str, since: int) -> dict:
+        return await change_log.get_changes(self.db, user_id, since)
+
+    # ==================== IDEMPOTENCY KEYS ====================
+
+    async def claim_request(self, user_id: str, key: str, fingerprint: str) -> Optional[dict]:
+        return await idempotency.claim_request(
+            self.db, user_id, key, fingerprint,
+            settings.IDEMPOTENCY_LOCK_SECONDS, settings.IDEMPOTENCY_TTL_HOURS,
+        )
+
+    async def complete_request(self, user_id: str, key: str, response: dict) -> None:
+        await idempotency.complete_request(self.db, user_id, key, response)
+
+    async def release_request(self, user_id: str, key: str) -> None:
+        await idempotency.release_request(self.db, user_id, key)
+
+    # ==================== REFRESH TOKENS ====================
+
+    async def create_refresh_token(self, user_id: str, token_hash: str, family: str) -> None:
+        await refresh_tokens.create_refresh_token(
+            self.db, user_id, token_hash, family, settings.REFRESH_TOKEN_EXPIRE_DAYS,
+        )
+
+    async def use_refresh_token(self, token_hash: str) -> Optional[dict]:
+        return await refresh_tokens.use_refresh_token(self.db, token_hash)
+
+    async def revoke_refresh_tokens(self, user_id: str, family: Optional[str] = None) -> int:
+        return await refresh_tokens.revoke_refresh_tokens(self.db, user_id, family)
+
+    # ==================== ROLLUPS ====================
+
+    async def archive_days(self, older_than_days: Optional[int] = None) -> int:
+        return await archive.archive_days(self.db, older_than_days)
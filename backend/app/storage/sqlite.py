@@ -0,0 +1,616 @@
+"""
+Embedded SQLite storage engine for single-node deployments and tests
+One connection in WAL mode, serialized by a lock; calls run in a worker
+thread (asyncio.to_thread) so the event loop never blocks on disk I/O.
+
+Days and entries are stored relationally - one row per day with running
+totals, one row per workout / food item - so appending never rewrites a
+growing document. There is no TTL, so history is kept indefinitely and
+no archive tier is needed.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import orjson
+from bson import ObjectId
+
+from app.core.config import settings
+from app.models.codec import day_number, day_string
+from app.models.daily_logs import FOOD, FOOD_TOTALS, NUTRITION_TOTALS, WORKOUT, food_totals
+from app.storage.base import DuplicateError, StorageEngine
+from app.utils.streak import advance_streak
+from app.utils.timezone import get_ist_now
+from app.utils.tracing import KIND_CLIENT, span
+
+# Bump together with a new entry in MIGRATIONS below
+SCHEMA_VERSION = 4
+
+MIGRATIONS = {
+    1: """
+        CREATE TABLE users (
+            id TEXT PRIMARY KEY,
+            email TEXT NOT NULL UNIQUE,
+            version INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            doc TEXT NOT NULL               -- remaining fields as JSON
+        ) WITHOUT ROWID;
+
+        -- totals are untyped so ints and floats round-trip unchanged
+        CREATE TABLE days (
+            user_id TEXT NOT NULL,
+            day INTEGER NOT NULL,           -- days since 1970-01-01
+            id TEXT NOT NULL,
+            seq INTEGER NOT NULL DEFAULT 0,
+            version INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            total_calories NOT NULL DEFAULT 0,
+            total_protein NOT NULL DEFAULT 0,
+            total_carbs NOT NULL DEFAULT 0,
+            total_fat NOT NULL DEFAULT 0,
+            total_fiber NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE entries (
+            user_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            kind TEXT NOT NULL,             -- workout | food
+            entry TEXT NOT NULL,            -- JSON, public shape
+            PRIMARY KEY (user_id, day, seq)
+        ) WITHOUT ROWID;
+    """,
+    2: """
+        CREATE TABLE change_log (
+            user_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            date TEXT,                      -- day whose entries changed
+            fields TEXT,                    -- JSON list of changed profile fields
+            PRIMARY KEY (user_id, seq)
+        ) WITHOUT ROWID;
+    """,
+    3: """
+        CREATE TABLE idempotency_keys (
+            user_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            response TEXT,                  -- JSON {status, body}, NULL while in flight
+            locked_until REAL,              -- unix time, NULL once completed
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (user_id, key)
+        ) WITHOUT ROWID;
+    """,
+    4: """
+        CREATE TABLE refresh_tokens (
+            token_hash TEXT PRIMARY KEY,    -- SHA-256 of the token
+            user_id TEXT NOT NULL,
+            family TEXT NOT NULL,           -- login session
+            expires_at REAL NOT NULL,       -- unix time
+            used_at REAL,
+            revoked_at REAL
+        ) WITHOUT ROWID;
+
+        CREATE INDEX refresh_tokens_user ON refresh_tokens (user_id, family);
+    """,
+}
+
+
+def _dumps(value) -> str:
+    """JSON text (queryable with SQLite's JSON operators)"""
+    return orjson.dumps(value).decode()
+
+
+class SQLiteStorage(StorageEngine):
+    """Storage engine backed by a local SQLite database file"""
+
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._migrate()
+
+    def _migrate(self) -> None:
+        current = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    for statement in MIGRATIONS[version].split(";"):
+                        if statement.strip():
+                            self._conn.execute(statement)
+                    self._conn.execute(f"PRAGMA user_version={version}")
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+    async def _run(self, fn, *args):
+        """Run fn(conn, *args) in a worker thread under the connection lock"""
+        def call():
+            with self._lock:
+                return fn(self._conn, *args)
+        with span("sqlite", KIND_CLIENT):
+            return await asyncio.to_thread(call)
+
+    async def _transaction(self, fn, *args):
+        """Like _run, inside BEGIN IMMEDIATE ... COMMIT"""
+        def call(conn, *args):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn, *args)
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        return await self._run(call, *args)
+
+    async def ping(self) -> bool:
+        await self._run(lambda conn: conn.execute("SELECT 1").fetchone())
+        return True
+
+    async def close(self) -> None:
+        await self._run(lambda conn: conn.close())
+
+    # ==================== USERS ====================
+
+    @staticmethod
+    def _user(row: Optional[sqlite3.Row]) -> Optional[dict]:
+        if row is None:
+            return None
+        return {
+            "_id": row["id"],
+            "email": row["email"],
+            **orjson.loads(row["doc"]),
+            "version": row["version"],
+            "createdAt": datetime.fromisoformat(row["created_at"]),
+        }
+
+    async def create_user(self, user: dict) -> str:
+        user_id = str(ObjectId())
+        doc = {k: v for k, v in user.items() if k not in ("_id", "email", "version", "createdAt")}
+        created_at = user.get("createdAt") or get_ist_now()
+
+        def insert(conn):
+            conn.execute(
+                "INSERT INTO users (id, email, version, created_at, doc) VALUES (?, ?, ?, ?, ?)",
+                (user_id, user["email"], user.get("version", 0), created_at.isoformat(), _dumps(doc)),
+            )
+
+        try:
+            await self._run(insert)
+        except sqlite3.IntegrityError as e:
+            raise DuplicateError(str(e))
+        user["_id"] = user_id
+        return user_id
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        return self._user(await self._run(
+            lambda conn: conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+        ))
+
+    async def get_user_by_email(self, email: str) -> Optional[dict]:
+        return self._user(await self._run(
+            lambda conn: conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone()
+        ))
+
+    async def get_user_version(self, user_id: str) -> Optional[dict]:
+        row = await self._run(lambda conn: conn.execute(
+            "SELECT id, version, doc ->> '$.workoutStreak' AS workoutStreak, "
+            "doc ->> '$.lastWorkoutDate' AS lastWorkoutDate FROM users WHERE id = ?",
+            (user_id,),
+        ).fetchone())
+        return dict(row, _id=row["id"]) if row else None
+
+    async def update_user(self, user_id: str, fields: dict) -> Optional[dict]:
+        def update(conn):
+            row = conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
+            if row is None:
+                return None
+            doc = {**orjson.loads(row["doc"]), **fields}
+            return conn.execute(
+                "UPDATE users SET doc = ?, version = version + 1 WHERE id = ? RETURNING *",
+                (_dumps(doc), user_id),
+            ).fetchall()[0]
+
+        return self._user(await self._transaction(update))
+
+    async def record_workout_day(self, user_id: str, date: str) -> None:
+        def update(conn):
+            row = conn.execute("SELECT doc FROM users WHERE id = ?", (user_id,)).fetchone()
+            if row is None:
+                return
+            doc = orjson.loads(row["doc"])
+            streak = advance_streak(doc, date)
+            if all(doc.get(field) == value for field, value in streak.items()):
+                return
+            conn.execute(
+                "UPDATE users SET doc = ?, version = version + 1 WHERE id = ?",
+                (_dumps({**doc, **streak}), user_id),
+            )
+
+        await self._transaction(update)
+
+    async def user_ids(self) -> AsyncIterator[str]:
+        rows = await self._run(lambda conn: conn.execute("SELECT id FROM users").fetchall())
+        for row in rows:
+            yield row["id"]
+
+    # ==================== DAILY LOGS ====================
+
+    @staticmethod
+    def _day(row: sqlite3.Row, entries: List[sqlite3.Row]) -> dict:
+        workouts, items = [], []
+        for entry in entries:
+            (workouts if entry["kind"] == WORKOUT else items).append(orjson.loads(entry["entry"]))
+        return {
+            "_id": row["id"],
+            "user_id": row["user_id"],
+            "date": day_string(row["day"]),
+            "workouts": workouts,
+            "nutrition": {**{field: row[field] for field in NUTRITION_TOTALS}, "items": items},
+            "version": row["version"],
+            "createdAt": datetime.fromisoformat(row["created_at"]),
+        }
+
+    async def get_day(self, user_id: str, date: str) -> Optional[dict]:
+        key = (user_id, day_number(date))
+
+        def read(conn):
+            row = conn.execute("SELECT * FROM days WHERE user_id = ? AND day = ?", key).fetchone()
+            if row is None:
+                return None
+            entries = conn.execute(
+                "SELECT kind, entry FROM entries WHERE user_id = ? AND day = ? ORDER BY seq", key
+            ).fetchall()
+            return self._day(row, entries)
+
+        return await self._run(read)
+
+    async def get_day_version(self, user_id: str, date: str) -> Optional[dict]:
+        row = await self._run(lambda conn: conn.execute(
+            "SELECT id, day, version FROM days WHERE user_id = ? AND day = ?",
+            (user_id, day_number(date)),
+        ).fetchone())
+        return {"_id": row["id"], "day": row["day"], "version": row["version"]} if row else None
+
+    async def get_days(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        params = (user_id, day_number(start_date), day_number(end_date))
+
+        def read(conn):
+            rows = conn.execute(
+                "SELECT * FROM days WHERE user_id = ? AND day BETWEEN ? AND ? ORDER BY day", params
+            ).fetchall()
+            if not rows:
+                return []
+            by_day: Dict[int, List[sqlite3.Row]] = defaultdict(list)
+            for entry in conn.execute(
+                "SELECT day, kind, entry FROM entries WHERE user_id = ? AND day BETWEEN ? AND ? "
+                "ORDER BY day, seq",
+                params,
+            ):
+                by_day[entry["day"]].append(entry)
+            return [self._day(row, by_day.get(row["day"], [])) for row in rows]
+
+        return await self._run(read)
+
+    async def get_day_versions(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT id, day, version FROM days WHERE user_id = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (user_id, day_number(start_date), day_number(end_date)),
+        ).fetchall())
+        return [{"_id": row["id"], "day": row["day"], "version": row["version"]} for row in rows]
+
+    async def get_daily_totals(self, user_id: str, start_date: str, end_date: str) -> List[dict]:
+        rows = await self._run(lambda conn: conn.execute(
+            f"""
+            SELECT d.day, {', '.join(f'd.{field}' for field in NUTRITION_TOTALS)},
+                   COUNT(e.seq) AS workouts,
+                   COALESCE(SUM(COALESCE(e.entry ->> '$.sets', 0) * COALESCE(e.entry ->> '$.reps', 0)
+                                * COALESCE(e.entry ->> '$.weight', 0)), 0) AS volume,
+                   COALESCE(SUM(e.entry ->> '$.duration'), 0) AS duration
+            FROM days d
+            LEFT JOIN entries e ON e.user_id = d.user_id AND e.day = d.day AND e.kind = ?
+            WHERE d.user_id = ? AND d.day BETWEEN ? AND ?
+            GROUP BY d.day
+            ORDER BY d.day
+            """,
+            (WORKOUT, user_id, day_number(start_date), day_number(end_date)),
+        ).fetchall())
+        return [{"date": day_string(row["day"]), **{k: row[k] for k in row.keys() if k != "day"}} for row in rows]
+
+    async def get_workout_dates(self, user_id: str) -> List[str]:
+        rows = await self._run(lambda conn: conn.execute(
+            "SELECT DISTINCT day FROM entries WHERE user_id = ? AND kind = ? ORDER BY day",
+            (user_id, WORKOUT),
+        ).fetchall())
+        return [day_string(row["day"]) for row in rows]
+
+    async def _add_entry(
+        self, user_id: str, date: str, kind: str, entry: dict, totals: dict, if_absent: bool = False,
+    ) -> bool:
+        day = day_number(date)
+        increments = {field: totals.get(field, 0) for field in NUTRITION_TOTALS}
+
+        def write(conn):
+            if if_absent and conn.execute(
+                "SELECT 1 FROM entries WHERE user_id = ? AND day = ? AND entry ->> '$.id' = ?",
+                (user_id, day, entry["id"]),
+            ).fetchone():
+                return False
+            conn.execute(
+                "INSERT INTO days (user_id, day, id, created_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id, day) DO NOTHING",
+                (user_id, day, str(ObjectId()), get_ist_now().isoformat()),
+            )
+            seq = conn.execute(
+                f"UPDATE days SET seq = seq + 1, version = version + 1, "
+                f"{', '.join(f'{field} = {field} + ?' for field in NUTRITION_TOTALS)} "
+                f"WHERE user_id = ? AND day = ? RETURNING seq",
+                (*increments.values(), user_id, day),
+            ).fetchall()[0][0]
+            conn.execute(
+                "INSERT INTO entries (user_id, day, seq, kind, entry) VALUES (?, ?, ?, ?, ?)",
+                (user_id, day, seq, kind, _dumps(entry)),
+            )
+            return True
+
+        return await self._transaction(write)
+
+    async def add_workout(self, user_id: str, date: str, workout_entry: dict) -> None:
+        await self._add_entry(user_id, date, WORKOUT, workout_entry, {})
+
+    async def add_food_item(self, user_id: str, date: str, food_entry: dict, totals: dict) -> None:
+        await self._add_entry(user_id, date, FOOD, food_entry, totals)
+
+    async def add_entry_if_absent(self, user_id: str, date: str, kind: str, entry: dict) -> bool:
+        # The id check runs inside the BEGIN IMMEDIATE write transaction
+        totals = food_totals(entry) if kind == FOOD else {}
+        return await self._add_entry(user_id, date, kind, entry, totals, if_absent=True)
+
+    async def _change_entry(self, user_id: str, date: str, kind: str, entry_id: str, fields: Optional[dict]):
+        """Edit (fields) or delete (None) one entry and move the day totals, in one transaction"""
+        day = day_number(date)
+
+        def write(conn):
+            row = conn.execute(
+                "SELECT seq, entry FROM entries WHERE user_id = ? AND day = ? AND kind = ? AND entry ->> '$.id' = ?",
+                (user_id, day, kind, entry_id),
+            ).fetchone()
+            if row is None:
+                return None
+            old = orjson.loads(row["entry"])
+            new = None if fields is None else {**old, **fields}
+
+            if new is None:
+                conn.execute("DELETE FROM entries WHERE user_id = ? AND day = ? AND seq = ?", (user_id, day, row["seq"]))
+            else:
+                conn.execute(
+                    "UPDATE entries SET entry = ? WHERE user_id = ? AND day = ? AND seq = ?",
+                    (_dumps(new), user_id, day, row["seq"]),
+                )
+
+            deltas = {
+                total: ((new or {}).get(field) or 0) - (old.get(field) or 0)
+                for field, total in FOOD_TOTALS.items()
+            } if kind == FOOD else {}
+            conn.execute(
+                f"UPDATE days SET version = version + 1"
+                f"{''.join(f', {total} = {total} + ?' for total in deltas)} "
+                f"WHERE user_id = ? AND day = ?",
+                (*deltas.values(), user_id, day),
+            )
+            return new or old
+
+        return await self._transaction(write)
+
+    async def update_entry(self, user_id: str, date: str, kind: str, entry_id: str, fields: dict) -> Optional[dict]:
+        return await self._change_entry(user_id, date, kind, entry_id, fields)
+
+    async def delete_entry(self, user_id: str, date: str, kind: str, entry_id: str) -> Optional[dict]:
+        return await self._change_entry(user_id, date, kind, entry_id, None)
+
+    # ==================== BULK EXPORT / IMPORT ====================
+
+    async def iter_days(self, user_id: str) -> AsyncIterator[dict]:
+        # Keyset pages, so no read transaction stays open between batches
+        def read(conn, after):
+            rows = conn.execute(
+                "SELECT * FROM days WHERE user_id = ? AND day > ? ORDER BY day LIMIT ?",
+                (user_id, after, settings.EXPORT_BATCH_SIZE),
+            ).fetchall()
+            if not rows:
+                return []
+            by_day: Dict[int, List[sqlite3.Row]] = defaultdict(list)
+            for entry in conn.execute(
+                "SELECT day, kind, entry FROM entries WHERE user_id = ? AND day BETWEEN ? AND ? "
+                "ORDER BY day, seq",
+                (user_id, rows[0]["day"], rows[-1]["day"]),
+            ):
+                by_day[entry["day"]].append(entry)
+            return [(row["day"], self._day(row, by_day.get(row["day"], []))) for row in rows]
+
+        after = -1
+        while True:
+            page = await self._run(read, after)
+            for after, day in page:
+                yield day
+            if len(page) < settings.EXPORT_BATCH_SIZE:
+                return
+
+    async def add_entries(self, user_id: str, entries: List[Tuple[str, str, dict]]) -> None:
+        by_day: Dict[int, List[Tuple[str, dict]]] = defaultdict(list)
+        for date, kind, entry in entries:
+            by_day[day_number(date)].append((kind, entry))
+
+        def write(conn):
+            now = get_ist_now().isoformat()
+            for day, day_entries in by_day.items():
+                increments = {field: 0 for field in NUTRITION_TOTALS}
+                for kind, entry in day_entries:
+                    if kind == FOOD:
+                        for field, value in food_totals(entry).items():
+                            increments[field] += value
+                conn.execute(
+                    "INSERT INTO days (user_id, day, id, created_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (user_id, day) DO NOTHING",
+                    (user_id, day, str(ObjectId()), now),
+                )
+                seq = conn.execute(
+                    f"UPDATE days SET seq = seq + ?, version = version + 1, "
+                    f"{', '.join(f'{field} = {field} + ?' for field in NUTRITION_TOTALS)} "
+                    f"WHERE user_id = ? AND day = ? RETURNING seq",
+                    (len(day_entries), *increments.values(), user_id, day),
+                ).fetchall()[0][0]
+                first_seq = seq - len(day_entries) + 1
+                conn.executemany(
+                    "INSERT INTO entries (user_id, day, seq, kind, entry) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (user_id, day, first_seq + index, kind, _dumps(entry))
+                        for index, (kind, entry) in enumerate(day_entries)
+                    ],
+                )
+
+        await self._transaction(write)
+
+    # ==================== CHANGE LOG ====================
+
+    async def record_change(self, user_id: str, date: Optional[str] = None, fields: Optional[List[str]] = None) -> int:
+        def write(conn):
+            seq = conn.execute(
+                "INSERT INTO change_log (user_id, seq, date, fields) "
+                "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ? FROM change_log WHERE user_id = ? RETURNING seq",
+                (user_id, date, _dumps(sorted(fields)) if fields else None, user_id),
+            ).fetchall()[0][0]
+            conn.execute(
+                "DELETE FROM change_log WHERE user_id = ? AND seq <= ?",
+                (user_id, seq - settings.SYNC_LOG_SIZE),
+            )
+            return seq
+
+        return await self._transaction(write)
+
+    async def get_changes(self, user_id: str, since: int) -> dict:
+        def read(conn):
+            bounds = conn.execute(
+                "SELECT MIN(seq), MAX(seq) FROM change_log WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            rows = conn.execute(
+                "SELECT seq, date, fields FROM change_log WHERE user_id = ? AND seq > ? ORDER BY seq",
+                (user_id, since),
+            ).fetchall()
+            return bounds, rows
+
+        (oldest, latest), rows = await self._run(read)
+        changes = []
+        for row in rows:
+            change = {"seq": row["seq"]}
+            if row["date"]:
+                change["date"] = row["date"]
+            if row["fields"]:
+                change["fields"] = orjson.loads(row["fields"])
+            changes.append(change)
+        return {"seq": latest or 0, "oldest": oldest or 1, "changes": changes}
+
+    # ==================== IDEMPOTENCY KEYS ====================
+
+    async def claim_request(self, user_id: str, key: str, fingerprint: str) -> Optional[dict]:
+        def claim(conn):
+            now = time.time()
+            # No TTL monitor here - expired keys are dropped per user on claim
+            conn.execute("DELETE FROM idempotency_keys WHERE user_id = ? AND expires_at < ?", (user_id, now))
+            row = conn.execute(
+                "SELECT fingerprint, response, locked_until FROM idempotency_keys WHERE user_id = ? AND key = ?",
+                (user_id, key),
+            ).fetchone()
+            if row is not None and (row["locked_until"] is None or row["locked_until"] >= now):
+                return {
+                    "fingerprint": row["fingerprint"],
+                    "response": orjson.loads(row["response"]) if row["response"] else None,
+                }
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys "
+                "(user_id, key, fingerprint, response, locked_until, expires_at) VALUES (?, ?, ?, NULL, ?, ?)",
+                (user_id, key, fingerprint, now + settings.IDEMPOTENCY_LOCK_SECONDS,
+                 now + settings.IDEMPOTENCY_TTL_HOURS * 3600),
+            )
+            return None
+
+        return await self._transaction(claim)
+
+    async def complete_request(self, user_id: str, key: str, response: dict) -> None:
+        await self._run(lambda conn: conn.execute(
+            "UPDATE idempotency_keys SET response = ?, locked_until = NULL WHERE user_id = ? AND key = ?",
+            (_dumps(response), user_id, key),
+        ))
+
+    async def release_request(self, user_id: str, key: str) -> None:
+        await self._run(lambda conn: conn.execute(
+            "DELETE FROM idempotency_keys WHERE user_id = ? AND key = ? AND response IS NULL",
+            (user_id, key),
+        ))
+
+    # ==================== REFRESH TOKENS ====================
+
+    async def create_refresh_token(self, user_id: str, token_hash: str, family: str) -> None:
+        def create(conn):
+            now = time.time()
+            # No TTL monitor here - expired tokens are dropped per user on issue
+            conn.execute("DELETE FROM refresh_tokens WHERE user_id = ? AND expires_at < ?", (user_id, now))
+            conn.execute(
+                "INSERT INTO refresh_tokens (token_hash, user_id, family, expires_at) VALUES (?, ?, ?, ?)",
+                (token_hash, user_id, family, now + settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400),
+            )
+
+        await self._transaction(create)
+
+    async def use_refresh_token(self, token_hash: str) -> Optional[dict]:
+        def use(conn):
+            now = time.time()
+            row = conn.execute(
+                "SELECT user_id, family, used_at, revoked_at FROM refresh_tokens "
+                "WHERE token_hash = ? AND expires_at > ?",
+                (token_hash, now),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["used_at"] is None:
+                conn.execute("UPDATE refresh_tokens SET used_at = ? WHERE token_hash = ?", (now, token_hash))
+
+            if row["revoked_at"] is not None:
+                state = "revoked"
+            elif row["used_at"] is not None:
+                state = "used"
+            else:
+                state = "active"
+            return {"user_id": row["user_id"], "family": row["family"], "state": state}
+
+        return await self._transaction(use)
+
+    async def revoke_refresh_tokens(self, user_id: str, family: Optional[str] = None) -> int:
+        def revoke(conn):
+            query = "UPDATE refresh_tokens SET revoked_at = ? WHERE user_id = ? AND revoked_at IS NULL"
+            params = [time.time(), user_id]
+            if family is not None:
+                query += " AND family = ?"
+                params.append(family)
+            return conn.execute(query, params).rowcount
+
+        return await self._run(revoke)
+
+    # ==================== ROLLUPS ====================
+
+    async def archive_days(self, older_than_days: Optional[int] = None) -> int:
+        # Nothing expires in SQLite - days stay queryable in place
+        return 0
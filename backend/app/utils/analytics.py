@@ -0,0 +1,95 @@
+"""
+Trend summaries built from per-day totals (StorageEngine.get_daily_totals)
+Only totals cross the wire from the database; weekly roll-ups and goal
+comparisons are computed here in a single pass
+"""
+from datetime import date as date_cls, timedelta
+from typing import Dict, List
+
+# Nutrition total field -> short name used in the response
+NUTRIENTS = {
+    "total_calories": "calories",
+    "total_protein": "protein",
+    "total_carbs": "carbs",
+    "total_fat": "fat",
+    "total_fiber": "fiber",
+}
+WORKOUT_FIELDS = ("workouts", "volume", "duration")
+
+# User goal field -> nutrient it applies to
+GOALS = {
+    "dailyCalorieGoal": "calories",
+    "proteinGoal": "protein",
+    "carbsGoal": "carbs",
+    "fiberGoal": "fiber",
+}
+
+
+def _empty_day(date: str) -> dict:
+    return {"date": date, **{name: 0 for name in NUTRIENTS.values()}, **{f: 0 for f in WORKOUT_FIELDS}}
+
+
+def _vs_goals(averages: dict, goals: dict) -> dict:
+    """Average intake per logged day as a fraction of each goal"""
+    return {
+        nutrient: round(averages[nutrient] / goal, 3) if goal else None
+        for nutrient, goal in goals.items()
+    }
+
+
+def _rollup(days: List[dict], goals: dict) -> dict:
+    """Totals, per-logged-day averages and goal ratios for a group of days"""
+    logged = [day for day in days if day["logged"]]
+    totals = {name: round(sum(day[name] for day in days), 1) for name in NUTRIENTS.values()}
+    averages = {
+        name: round(totals[name] / len(logged), 1) if logged else 0
+        for name in NUTRIENTS.values()
+    }
+    return {
+        "days_logged": len(logged),
+        "workout_days": sum(1 for day in days if day["workouts"]),
+        "totals": {**totals, **{f: round(sum(day[f] for day in days), 1) for f in WORKOUT_FIELDS}},
+        "averages": averages,
+        "vs_goals": _vs_goals(averages, goals),
+    }
+
+
+def build_summary(rows: List[dict], user: dict, start_date: str, end_date: str) -> dict:
+    """
+    Per-day and per-week trend summary
+
+    Args:
+        rows: Per-day totals from get_daily_totals (days without data omitted)
+        user: Profile dict with goal fields (defaults already applied)
+        start_date: First day of the range (YYYY-MM-DD)
+        end_date: Last day of the range (YYYY-MM-DD)
+
+    Returns:
+        JSON-ready summary with a row for every day, ISO weeks (Monday
+        start) and range totals compared with the user's goals
+    """
+    goals = {nutrient: user.get(field) for field, nutrient in GOALS.items()}
+    by_date: Dict[str, dict] = {row["date"]: row for row in rows}
+
+    start, end = date_cls.fromisoformat(start_date), date_cls.fromisoformat(end_date)
+    days, weeks = [], {}
+    current = start
+    while current <= end:
+        date = current.isoformat()
+        row = by_date.get(date)
+        day = _empty_day(date)
+        if row is not None:
+            day.update({name: row.get(field) or 0 for field, name in NUTRIENTS.items()})
+            day.update({f: row.get(f) or 0 for f in WORKOUT_FIELDS})
+        day["logged"] = row is not None and (day["calories"] > 0 or day["workouts"] > 0)
+        days.append(day)
+        weeks.setdefault((current - timedelta(days=current.weekday())).isoformat(), []).append(day)
+        current += timedelta(days=1)
+
+    return {
+        "range": {"start_date": start_date, "end_date": end_date, "days": len(days)},
+        "goals": goals,
+        "days": days,
+        "weeks": [{"week_start": week_start, **_rollup(week_days, goals)} for week_start, week_days in weeks.items()],
+        "summary": _rollup(days, goals),
+    }
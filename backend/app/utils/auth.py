@@ -1,32 +1,112 @@
-from fastapi import HTTPException, status, Depends
+"""
+Bearer token authentication
+get_current_user is the single dependency protected routes use. A token
+is verified once; after that its user ID comes from a bounded LRU keyed by
+the token's SHA-256 until the token's `exp`
+"""
+import hashlib
+import hmac
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Header, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.core.security import verify_token
+
+from app.core.config import settings
+from app.core.security import jwt_backend, verify_token
+from app.utils.cache import LRUCache, register_cache
+from app.utils.tracing import record_span
 
 security = HTTPBearer()
 
+# Only tokens that verified are cached, so invalid ones cannot fill it
+token_cache = LRUCache("auth_tokens", maxsize=settings.AUTH_TOKEN_CACHE_MAX_ENTRIES, ttl=0)
+register_cache("auth_tokens", token_cache)
+
+_timings = {"cached": 0, "cached_seconds": 0.0, "verified": 0, "verify_seconds": 0.0, "rejected": 0}
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> str:
     """
     Dependency to extract and verify user from JWT token
-    
+    The time spent is stored on request.state.auth_ms and traced as "auth"
+
     Args:
+        request: Incoming request
         credentials: HTTP Bearer token from Authorization header
-    
+
     Returns:
         user_id: The authenticated user's ID
-    
+
     Raises:
-        HTTPException: If token is invalid
+        HTTPException: 401 if the token is invalid or expired
+    """
+    started = time.perf_counter()
+    key = _token_key(credentials.credentials)
+
+    user_id = token_cache.get(key)
+    if user_id is not None:
+        elapsed = time.perf_counter() - started
+        _timings["cached"] += 1
+        _timings["cached_seconds"] += elapsed
+        request.state.auth_ms = elapsed * 1000
+        record_span("auth", started, elapsed, cached="true")
+        return user_id
+
+    try:
+        token_data = verify_token(credentials.credentials)
+    except HTTPException:
+        _timings["rejected"] += 1
+        raise
+
+    user_id = token_data["user_id"]
+    if token_data["exp"] is not None:
+        ttl = token_data["exp"] - time.time()
+        if ttl > 0:
+            token_cache.set(key, user_id, ttl=ttl)
+
+    elapsed = time.perf_counter() - started
+    _timings["verified"] += 1
+    _timings["verify_seconds"] += elapsed
+    request.state.auth_ms = elapsed * 1000
+    record_span("auth", started, elapsed, cached="false")
+    return user_id
+
+
+async def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
     """
-    token = credentials.credentials
-    token_data = verify_token(token)
-    user_id = token_data.get("user_id")
-    
-    if not user_id:
+    Dependency guarding /metrics and the /health stats endpoints
+    Callers must send `Authorization: Bearer <METRICS_TOKEN>`; without a
+    configured token those endpoints are not served at all
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), settings.METRICS_TOKEN.encode()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
+            detail="Invalid metrics token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    return user_id
+
+
+def auth_timing_stats() -> Dict[str, Any]:
+    """JWT backend and mean time per request for cached and fully verified tokens"""
+    def mean_ms(seconds: float, count: int) -> float:
+        return round(seconds / count * 1000, 4) if count else 0.0
+
+    return {
+        "backend": jwt_backend(),
+        "cached": _timings["cached"],
+        "cached_avg_ms": mean_ms(_timings["cached_seconds"], _timings["cached"]),
+        "verified": _timings["verified"],
+        "verified_avg_ms": mean_ms(_timings["verify_seconds"], _timings["verified"]),
+        "rejected": _timings["rejected"],
+    }
@@ -0,0 +1,305 @@
+"""
+Bulk export / import of a user's logs (GET /export, POST /import)
+One row per workout / food entry, in date order:
+
+    {"day": "2024-02-23", "kind": "workout", "id": "...", "loggedAt": "...", "exercise": "Squat", ...}
+
+NDJSON rows carry the stored entry fields as-is; CSV uses EXPORT_COLUMNS
+(workout and food fields side by side, unused ones left empty). Both
+directions stream: export serializes each day as the storage cursor yields
+it, and import parses the request body line by line and writes
+IMPORT_BATCH_SIZE entries at a time - the body is not read any further
+until a batch is stored, so a fast upload waits for the database.
+"""
+import asyncio
+import csv
+import io
+from collections import defaultdict
+from datetime import date as date_cls, datetime, time
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+import orjson
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.daily_logs import FOOD, WORKOUT
+from app.models.schemas import SyncFoodSchema, SyncWorkoutSchema
+from app.storage.base import StorageEngine
+from app.utils.timezone import IST, get_ist_now, get_ist_date_string
+
+NDJSON = "ndjson"
+CSV = "csv"
+MEDIA_TYPES = {NDJSON: "application/x-ndjson", CSV: "text/csv"}
+
+EXPORT_COLUMNS = [
+    "day", "kind", "id", "loggedAt",
+    "exercise", "sets", "reps", "weight", "duration",
+    "name", "calories", "protein", "carbs", "fat", "fiber", "confidence",
+]
+SCHEMAS = {WORKOUT: SyncWorkoutSchema, FOOD: SyncFoodSchema}
+
+# Rejected rows listed in the import response; later ones are only counted
+MAX_REPORTED_ERRORS = 50
+
+# (line number, parsed row or None, error or None)
+Record = Tuple[int, Optional[dict], Optional[str]]
+
+
+def build_entry(item: Union[SyncWorkoutSchema, SyncFoodSchema]) -> Tuple[str, dict]:
+    """
+    Validated client entry -> (IST day, entry in the stored public shape)
+    A missing id or loggedAt is generated server-side
+    """
+    logged_at = item.loggedAt or get_ist_now()
+    logged_at = logged_at.replace(tzinfo=IST) if logged_at.tzinfo is None else logged_at.astimezone(IST)
+    entry = {
+        "id": str(item.id or uuid4()),
+        **item.model_dump(exclude={"id", "loggedAt"}),
+        "date": logged_at.isoformat(),
+    }
+    return logged_at.date().isoformat(), entry
+
+
+# ==================== EXPORT ====================
+
+def _day_rows(day: dict) -> List[dict]:
+    """One export row per entry of a day (the entry timestamp becomes loggedAt)"""
+    rows = []
+    for kind, entries in ((WORKOUT, day.get("workouts", [])), (FOOD, (day.get("nutrition") or {}).get("items", []))):
+        for entry in entries:
+            row = {"day": day["date"], "kind": kind}
+            for key, value in entry.items():
+                row["loggedAt" if key == "date" else key] = value
+            rows.append(row)
+    return rows
+
+
+async def export_chunks(engine: StorageEngine, user_id: str, fmt: str) -> AsyncIterator[bytes]:
+    """
+    Serialize every day of a user as it is read - one chunk per day
+
+    Args:
+        engine: Storage engine to read from
+        user_id: Owner of the logs
+        fmt: NDJSON or CSV
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, EXPORT_COLUMNS, extrasaction="ignore", lineterminator="\n")
+    if fmt == CSV:
+        writer.writeheader()
+        yield buffer.getvalue().encode()
+
+    async for day in engine.iter_days(user_id):
+        rows = _day_rows(day)
+        if not rows:
+            continue
+        if fmt == NDJSON:
+            yield b"".join(orjson.dumps(row) + b"\n" for row in rows)
+        else:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+
+
+# ==================== IMPORT ====================
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[str]:
+    """
+    Split a byte stream into text lines without reading it whole
+
+    Raises:
+        ValueError: A line is longer than max_bytes
+    """
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if len(line) > max_bytes:
+                raise ValueError(f"Line {number} is longer than {max_bytes} bytes")
+            yield line.decode("utf-8-sig" if number == 1 else "utf-8").rstrip("\r")
+        if len(buffer) > max_bytes:
+            raise ValueError(f"Line {number + 1} is longer than {max_bytes} bytes")
+    if buffer:
+        yield buffer.decode("utf-8-sig" if number == 0 else "utf-8").rstrip("\r")
+
+
+async def parse_records(lines: AsyncIterator[str], fmt: str) -> AsyncIterator[Record]:
+    """
+    Lines -> rows; unparseable lines are yielded with an error instead
+    CSV needs a header line; quoted values may span lines
+    """
+    number = 0
+    if fmt == NDJSON:
+        async for line in lines:
+            number += 1
+            if not line.strip():
+                continue
+            try:
+                row = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                yield number, None, "Invalid JSON"
+                continue
+            if isinstance(row, dict):
+                yield number, row, None
+            else:
+                yield number, None, "Expected a JSON object"
+        return
+
+    header = None
+    pending, start = None, 0
+    async for line in lines:
+        number += 1
+        if pending is None:
+            pending, start = line, number
+        else:
+            pending += "\n" + line
+        if pending.count('"') % 2:
+            continue
+        values, pending = next(csv.reader([pending])), None
+        if not any(values):
+            continue
+        if header is None:
+            header = values
+        elif len(values) != len(header):
+            yield start, None, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            yield start, dict(zip(header, values)), None
+    if pending is not None:
+        yield start, None, "Unterminated quoted value"
+
+
+def _error_message(error: ValueError) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+        )
+    return str(error)
+
+
+def parse_row(row: dict) -> Tuple[str, str, dict]:
+    """
+    Export row -> (date, kind, entry); empty CSV cells count as missing
+
+    Raises:
+        ValueError: Unknown kind, invalid fields or dates
+    """
+    schema = SCHEMAS.get(row.get("kind"))
+    if schema is None:
+        raise ValueError("kind must be 'workout' or 'food'")
+
+    fields = {key: value for key, value in row.items() if key not in ("day", "kind") and value not in ("", None)}
+    day = row.get("day") or None
+    if day is not None:
+        day = date_cls.fromisoformat(day).isoformat()
+        fields.setdefault("loggedAt", datetime.combine(date_cls.fromisoformat(day), time(), IST))
+
+    logged_day, entry = build_entry(schema.model_validate(fields))
+    return day or logged_day, row["kind"], entry
+
+
+async def _write_batch(
+    engine: StorageEngine,
+    user_id: str,
+    batch: List[Tuple[int, str, str, dict]],
+    summary: dict,
+    dates: Dict[str, bool],
+) -> None:
+    """
+    Store a batch, skipping ids already stored on their day and days that only exist archived
+    The day reads only spare re-imports a write per row; each entry is then
+    added with the atomic id check of POST /sync, so an overlapping import
+    of the same rows cannot store them twice
+    """
+    days = sorted({date for _, date, _, _ in batch})
+    stored = await asyncio.gather(*(engine.get_day(user_id, date) for date in days))
+
+    known, archived = {}, set()
+    for date, day in zip(days, stored):
+        day = day or {}
+        if day.get("archived"):
+            archived.add(date)
+        known[date] = {entry["id"] for entry in day.get("workouts", []) + (day.get("nutrition") or {}).get("items", [])}
+
+    by_day: Dict[str, List[Tuple[str, dict]]] = defaultdict(list)
+    for number, date, kind, entry in batch:
+        if date in archived:
+            _reject(summary, number, "Day is archived and read-only")
+        elif entry["id"] in known[date]:
+            summary["duplicates"] += 1
+        else:
+            known[date].add(entry["id"])
+            by_day[date].append((kind, entry))
+
+    async def write_day(date: str, day_entries: List[Tuple[str, dict]]) -> None:
+        # In file order within a day; days are written concurrently
+        for kind, entry in day_entries:
+            if await engine.add_entry_if_absent(user_id, date, kind, entry):
+                summary["imported"] += 1
+                dates[date] = dates.get(date, False) or kind == WORKOUT
+            else:
+                summary["duplicates"] += 1
+
+    await asyncio.gather(*(write_day(date, day_entries) for date, day_entries in by_day.items()))
+
+
+def _reject(summary: dict, line: int, error: str) -> None:
+    summary["rejected"] += 1
+    if len(summary["errors"]) < MAX_REPORTED_ERRORS:
+        summary["errors"].append({"line": line, "error": error})
+
+
+async def import_entries(
+    engine: StorageEngine,
+    user_id: str,
+    records: AsyncIterator[Record],
+    dates: Dict[str, bool],
+) -> dict:
+    """
+    Validate and store parsed rows in IMPORT_BATCH_SIZE batches
+    Re-importing the same file only reports duplicates
+
+    Args:
+        engine: Storage engine to write to
+        user_id: Owner of the logs
+        records: Output of parse_records
+        dates: Filled with every day written to (True if it got a workout),
+            also when the import fails half-way
+
+    Returns:
+        imported / duplicates / rejected counts, the first rejected rows and
+        truncated=true when IMPORT_MAX_ENTRIES was reached
+    """
+    summary = {"imported": 0, "duplicates": 0, "rejected": 0, "errors": [], "truncated": False}
+    today = get_ist_date_string()
+    batch: List[Tuple[int, str, str, dict]] = []
+    accepted = 0
+
+    async for number, row, error in records:
+        if error is None:
+            try:
+                date, kind, entry = parse_row(row)
+                if date > today:
+                    raise ValueError("Date is in the future")
+            except ValueError as e:
+                error = _error_message(e)
+        if error is not None:
+            _reject(summary, number, error)
+            continue
+
+        if accepted >= settings.IMPORT_MAX_ENTRIES:
+            summary["truncated"] = True
+            break
+        accepted += 1
+        batch.append((number, date, kind, entry))
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            await _write_batch(engine, user_id, batch, summary, dates)
+            batch = []
+
+    if batch:
+        await _write_batch(engine, user_id, batch, summary, dates)
+    return summary
@@ -0,0 +1,451 @@
+"""
+In-process caching utilities
+Bounded LRU caches with TTL, an optional shared second-level backend,
+and a registry so hit rates and memory usage can be exported
+"""
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.utils.timezone import get_ist_date_string
+
+
+def estimate_size(obj: Any, _seen: Optional[set] = None) -> int:
+    """
+    Roughly estimate the memory footprint of a JSON-like object
+
+    Args:
+        obj: Object to measure (dicts, lists and scalars)
+
+    Returns:
+        Approximate size in bytes
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += estimate_size(key, _seen) + estimate_size(value, _seen)
+    elif isinstance(obj, (list, tuple, set)):
+        for item in obj:
+            size += estimate_size(item, _seen)
+    return size
+
+
+class LRUCache:
+    """
+    Size-bounded LRU cache with per-entry TTL
+    Not thread-safe; meant to be used from the event loop only
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on miss/expiry"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, size, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting least recently used entries when full"""
+        if self.maxsize <= 0:
+            return
+
+        if key in self._data:
+            self._remove(key)
+
+        size = estimate_size(value)
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, size, value)
+        self._bytes += size
+
+        while len(self._data) > self.maxsize:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Drop a single key if present"""
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "approx_bytes": self._bytes,
+        }
+
+
+class CacheBackend:
+    """
+    Shared second-level cache backend (e.g. Redis, Memcached)
+    Subclasses implement async get/set/delete over serializable values
+    """
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalSharedBackend(CacheBackend):
+    """
+    Local stand-in for a shared cache server
+    Keeps values in a process-wide dict with expiry so the two-level
+    code path can be exercised without external infrastructure
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[float, Any]] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class Generations:
+    """
+    Per-key write generations, so a read that started before a write cannot
+    cache what it loaded after that write's invalidation
+    Readers take a token() before loading; bump() marks a key written.
+    Only the last `maxsize` written keys are remembered - a read that began
+    before the newest forgotten write is treated as stale
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._clock = 0
+        self._floor = 0
+        self._written: "OrderedDict[str, int]" = OrderedDict()
+        self.rejected = 0
+
+    def token(self) -> int:
+        return self._clock
+
+    def bump(self, key: str) -> None:
+        self._clock += 1
+        self._written[key] = self._clock
+        self._written.move_to_end(key)
+        while len(self._written) > self.maxsize:
+            _, generation = self._written.popitem(last=False)
+            self._floor = max(self._floor, generation)
+
+    def is_stale(self, key: str, token: int) -> bool:
+        if self._written.get(key, self._floor) > token:
+            self.rejected += 1
+            return True
+        return False
+
+
+def create_shared_backend(name: str) -> Optional[CacheBackend]:
+    """
+    Build the shared cache backend selected in settings
+
+    Args:
+        name: Backend name ("none" or "local")
+
+    Returns:
+        CacheBackend instance or None for in-process caching only
+    """
+    name = (name or "none").lower()
+    if name == "local":
+        return LocalSharedBackend()
+    return None
+
+
+class DayCache:
+    """
+    Per-user cache of GET /data/{date} payloads
+    Today's entry uses a short TTL; past days only change when edited,
+    so they are kept much longer and rely on write-path invalidation
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        today_ttl: float,
+        past_ttl: float,
+        backend: Optional[CacheBackend] = None,
+    ):
+        self.local = LRUCache("day_cache", maxsize, past_ttl)
+        self.today_ttl = today_ttl
+        self.past_ttl = past_ttl
+        self.backend = backend
+        self.backend_hits = 0
+        self.generations = Generations(maxsize)
+
+    @staticmethod
+    def _key(user_id: str, date: str) -> str:
+        return f"day:{user_id}:{date}"
+
+    def _ttl_for(self, date: str) -> float:
+        return self.past_ttl if date < get_ist_date_string() else self.today_ttl
+
+    async def get(self, user_id: str, date: str) -> Optional[dict]:
+        """Look up a day payload in the local cache, then the shared backend"""
+        key = self._key(user_id, date)
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+
+        value = await self.backend.get(key)
+        if value is not None:
+            self.backend_hits += 1
+            self.local.set(key, value, self._ttl_for(date))
+        return value
+
+    def read_token(self) -> int:
+        """Take before loading a day from the database; pass to set()"""
+        return self.generations.token()
+
+    async def set(self, user_id: str, date: str, payload: dict, token: int) -> None:
+        """
+        Store a day payload in both cache levels, unless the day was
+        invalidated after `token` was taken (the payload may predate that write)
+        """
+        key = self._key(user_id, date)
+        if self.generations.is_stale(key, token):
+            return
+        ttl = self._ttl_for(date)
+        self.local.set(key, payload, ttl)
+        if self.backend is not None:
+            await self.backend.set(key, payload, ttl)
+
+    async def invalidate(self, user_id: str, date: str) -> None:
+        """Drop a day after it was written"""
+        key = self._key(user_id, date)
+        self.generations.bump(key)
+        self.local.delete(key)
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats["backend"] = type(self.backend).__name__ if self.backend else None
+        stats["backend_hits"] = self.backend_hits
+        stats["stale_sets_skipped"] = self.generations.rejected
+        return stats
+
+
+class ProfileCache:
+    """
+    Per-user cache of users documents (without the password hash)
+    Writes made by this worker update or drop the entry; other workers'
+    local copies are bounded by the TTL unless a shared backend is used
+    """
+
+    def __init__(self, maxsize: int, ttl: float, backend: Optional[CacheBackend] = None):
+        self.local = LRUCache("profile_cache", maxsize, ttl)
+        self.ttl = ttl
+        self.backend = backend
+        self.backend_hits = 0
+        self.generations = Generations(maxsize)
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"profile:{user_id}"
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        """Look up a profile in the local cache, then the shared backend"""
+        key = self._key(user_id)
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+
+        value = await self.backend.get(key)
+        if value is not None:
+            self.backend_hits += 1
+            self.local.set(key, value)
+        return value
+
+    def read_token(self) -> int:
+        """Take before loading a users document from the database; pass to set()"""
+        return self.generations.token()
+
+    async def set(self, user_id: str, user: dict, token: Optional[int] = None) -> dict:
+        """
+        Store a users document in both cache levels; returns the profile
+        A document read with `token` is not cached if the user was written
+        since. Without a token the document is the result of a write, and
+        reads that started before it can no longer cache theirs
+        """
+        key = self._key(user_id)
+        profile = {field: value for field, value in user.items() if field != "password"}
+        if token is None:
+            self.generations.bump(key)
+        elif self.generations.is_stale(key, token):
+            return profile
+        self.local.set(key, profile)
+        if self.backend is not None:
+            await self.backend.set(key, profile, self.ttl)
+        return profile
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a profile after a write that did not return the new document"""
+        key = self._key(user_id)
+        self.generations.bump(key)
+        self.local.delete(key)
+        if self.backend is not None:
+            await self.backend.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats["backend"] = type(self.backend).__name__ if self.backend else None
+        stats["backend_hits"] = self.backend_hits
+        stats["stale_sets_skipped"] = self.generations.rejected
+        return stats
+
+
+class UserScopedCache:
+    """
+    Cache of derived per-user payloads (several keys per user, e.g. one per
+    analytics range), dropped together whenever the user writes.
+    Other workers' local copies are only bounded by the TTL.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, backend: Optional[CacheBackend] = None):
+        self.name = name
+        self.local = LRUCache(name, maxsize, ttl)
+        self.ttl = ttl
+        self.backend = backend
+        self._keys: Dict[str, Set[str]] = {}
+
+    def _key(self, user_id: str, key: str) -> str:
+        return f"{self.name}:{user_id}:{key}"
+
+    async def get(self, user_id: str, key: str) -> Optional[Any]:
+        full_key = self._key(user_id, key)
+        value = self.local.get(full_key)
+        if value is not None or self.backend is None:
+            return value
+
+        value = await self.backend.get(full_key)
+        if value is not None:
+            self.local.set(full_key, value)
+            self._keys.setdefault(user_id, set()).add(key)
+        return value
+
+    async def set(self, user_id: str, key: str, value: Any) -> None:
+        full_key = self._key(user_id, key)
+        self.local.set(full_key, value)
+        self._keys.setdefault(user_id, set()).add(key)
+        if self.backend is not None:
+            await self.backend.set(full_key, value, self.ttl)
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached payload of a user"""
+        for key in self._keys.pop(user_id, ()):
+            full_key = self._key(user_id, key)
+            self.local.delete(full_key)
+            if self.backend is not None:
+                await self.backend.delete(full_key)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.local.stats()
+        stats["users"] = len(self._keys)
+        stats["backend"] = type(self.backend).__name__ if self.backend else None
+        return stats
+
+
+# Registry of named caches whose stats are exported by /health/cache
+_registry: Dict[str, Any] = {}
+
+
+def register_cache(name: str, cache: Any) -> None:
+    """Register a cache exposing a stats() method for export"""
+    _registry[name] = cache
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Collect stats from every registered cache"""
+    return {name: cache.stats() for name, cache in _registry.items()}
+
+
+# Global day cache instance
+day_cache = DayCache(
+    maxsize=settings.DAY_CACHE_MAX_ENTRIES,
+    today_ttl=settings.DAY_CACHE_TODAY_TTL_SECONDS,
+    past_ttl=settings.DAY_CACHE_PAST_TTL_SECONDS,
+    backend=create_shared_backend(settings.CACHE_BACKEND),
+)
+register_cache("day_cache", day_cache)
+
+# Global analytics summary cache instance
+analytics_cache = UserScopedCache(
+    "analytics",
+    maxsize=settings.ANALYTICS_CACHE_MAX_ENTRIES,
+    ttl=settings.ANALYTICS_CACHE_TTL_SECONDS,
+    backend=create_shared_backend(settings.CACHE_BACKEND),
+)
+register_cache("analytics_cache", analytics_cache)
+
+# Global user profile cache instance
+profile_cache = ProfileCache(
+    maxsize=settings.PROFILE_CACHE_MAX_ENTRIES,
+    ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+    backend=create_shared_backend(settings.CACHE_BACKEND),
+)
+register_cache("profile_cache", profile_cache)
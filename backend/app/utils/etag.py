@@ -0,0 +1,62 @@
+"""
+ETag helpers for conditional GET requests
+ETags are derived from document ids and version counters, so they can be
+computed from a projected query without loading or serializing the body
+"""
+import hashlib
+from typing import Iterable
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a strong ETag from identifying parts
+
+    Args:
+        parts: Values that change whenever the representation changes
+
+    Returns:
+        Quoted ETag string
+    """
+    raw = "|".join(str(part) for part in parts)
+    digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def day_etag(user_id: str, date: str, version_doc: dict = None) -> str:
+    """ETag for a single day; empty days get their own stable tag"""
+    if not version_doc:
+        return make_etag("day", user_id, date, "empty")
+    return make_etag("day", user_id, date, version_doc["_id"], version_doc.get("version", 0))
+
+
+def range_etag(user_id: str, start_date: str, end_date: str, version_docs: Iterable[dict]) -> str:
+    """ETag for a date range, combining every day's id and version"""
+    parts = [f'{doc["_id"]}:{doc.get("version", 0)}' for doc in version_docs]
+    return make_etag("range", user_id, start_date, end_date, *parts)
+
+
+def batch_etag(user_id: str, dates: Iterable[str], summary: bool, version_docs: Iterable[dict]) -> str:
+    """ETag for a /data/batch response (requested dates + projection + versions)"""
+    parts = [f'{doc["_id"]}:{doc.get("version", 0)}' for doc in version_docs]
+    return make_etag("batch", user_id, ",".join(dates), summary, *parts)
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the If-None-Match header against an ETag
+    Uses weak comparison as required for If-None-Match (RFC 9110)
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the current ETag"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
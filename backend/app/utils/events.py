@@ -0,0 +1,226 @@
+"""
+Live update events (GET /events/stream)
+Write paths publish small per-user deltas; every open stream of that user
+receives them, so clients stop polling /data/{date} and /users/me:
+
+    entry.added     {"date", "kind", "entry", "delta"?}   delta = food totals added
+    entry.updated   {"date", "kind", "entry"}
+    entry.deleted   {"date", "kind", "id", "delta"?}
+    profile.updated {"fields"}                            e.g. changed goals
+
+Events are hints - a client that reconnects or receives "resync" refetches.
+Fan-out is in-process; with EVENTS_BACKEND=mongo events are also written to
+a capped collection that every worker tails, so a write handled by one
+process reaches streams held by another.
+"""
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Set
+from uuid import uuid4
+
+import orjson
+from bson import ObjectId
+from pymongo import CursorType
+
+from app.core.config import settings
+from app.utils.timezone import get_ist_now
+
+logger = logging.getLogger(__name__)
+
+EVENTS_COLLECTION = "events"
+
+# Sent instead of the backlog when a slow client's buffer overflows
+RESYNC = {"type": "resync"}
+
+Deliver = Callable[[str, dict], None]
+
+
+def format_sse(event: dict) -> bytes:
+    """Event dict -> one text/event-stream message"""
+    return b"event: " + event["type"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+
+
+class Subscription:
+    """One open stream: a bounded queue of pending events"""
+
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def push(self, event: dict) -> None:
+        """Queue an event; on overflow replace the backlog with a resync"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(RESYNC)
+
+
+class EventBackend:
+    """
+    Cross-process transport for events
+    publish() sends to every worker; run() delivers events published by
+    other workers until cancelled
+    """
+
+    async def publish(self, user_id: str, event: dict) -> None:
+        raise NotImplementedError
+
+    async def run(self, deliver: Deliver) -> None:
+        raise NotImplementedError
+
+
+class MongoEventBackend(EventBackend):
+    """
+    Capped collection + tailable cursor (created by migration 8)
+    Each worker skips its own events, which it already delivered locally
+    """
+
+    def __init__(self, db):
+        self.collection = db[EVENTS_COLLECTION]
+        self.origin = f"{os.getpid()}-{uuid4().hex[:8]}"
+
+    async def publish(self, user_id: str, event: dict) -> None:
+        await self.collection.insert_one({
+            "origin": self.origin,
+            "user_id": user_id,
+            "event": event,
+            "createdAt": get_ist_now(),
+        })
+
+    async def run(self, deliver: Deliver) -> None:
+        # Start after the newest existing event; resume after the last seen one
+        newest = await self.collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        last_id: Optional[ObjectId] = newest["_id"] if newest else None
+
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id else {}
+            cursor = self.collection.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            try:
+                while cursor.alive:
+                    async for doc in cursor:
+                        last_id = doc["_id"]
+                        if doc.get("origin") != self.origin:
+                            deliver(doc["user_id"], doc["event"])
+                    await asyncio.sleep(0.1)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event tail interrupted: {e}")
+            finally:
+                await cursor.close()
+            await asyncio.sleep(1)
+
+
+def create_event_backend(name: str, storage: Any) -> Optional[EventBackend]:
+    """
+    Build the cross-process event backend selected in settings
+
+    Args:
+        name: Backend name ("none" or "mongo")
+        storage: Active storage engine (the mongo backend needs MongoStorage)
+
+    Returns:
+        EventBackend instance or None for in-process fan-out only
+    """
+    name = (name or "none").lower()
+    if name == "mongo":
+        if getattr(storage, "name", None) != "mongo":
+            logger.warning("⚠ EVENTS_BACKEND=mongo needs the mongo storage engine; using in-process events")
+            return None
+        return MongoEventBackend(storage.db)
+    return None
+
+
+class EventBroker:
+    """
+    Per-user pub/sub for live updates
+    Meant to be used from the event loop only
+    """
+
+    def __init__(self, buffer_size: int, max_streams_per_user: int):
+        self.buffer_size = buffer_size
+        self.max_streams_per_user = max_streams_per_user
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._backend: Optional[EventBackend] = None
+        self._listener: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: str) -> Optional[Subscription]:
+        """Open a stream for a user; None when they already have too many"""
+        if len(self._subscribers[user_id]) >= self.max_streams_per_user:
+            return None
+        subscription = Subscription(user_id, self.buffer_size)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Close a stream; safe to call more than once"""
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.remove(subscription)
+        self.dropped += subscription.dropped
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def deliver(self, user_id: str, event: dict) -> None:
+        """Push an event to this process's streams for a user"""
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.push(event)
+            self.delivered += 1
+
+    async def publish(self, user_id: str, event: dict) -> None:
+        """
+        Send an event to every stream of a user, in every worker
+        Never raises - the write that triggered it has already succeeded
+        """
+        self.published += 1
+        self.deliver(user_id, event)
+        if self._backend is not None:
+            try:
+                await self._backend.publish(user_id, event)
+            except Exception as e:
+                logger.warning(f"Failed to publish event: {e}")
+
+    def start(self, backend: Optional[EventBackend]) -> None:
+        """Attach a cross-process backend and start listening to it"""
+        self._backend = backend
+        if backend is not None:
+            self._listener = asyncio.create_task(backend.run(self.deliver))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._backend = None
+        self._listener = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Open streams and event counters"""
+        return {
+            "backend": type(self._backend).__name__ if self._backend else None,
+            "users": len(self._subscribers),
+            "streams": sum(len(subs) for subs in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped + sum(
+                sub.dropped for subs in self._subscribers.values() for sub in subs
+            ),
+        }
+
+
+event_broker = EventBroker(
+    buffer_size=settings.EVENTS_BUFFER_SIZE,
+    max_streams_per_user=settings.EVENTS_MAX_STREAMS_PER_USER,
+)
@@ -0,0 +1,162 @@
+"""
+Idempotency-Key support for POST /workout and POST /scan
+A retried request (same user and key) gets the first response back
+instead of logging the entry twice or re-running the scan pipeline:
+
+- the first request claims the key, runs, and stores its response; 2xx
+  and 4xx responses are kept, a 5xx or 429 releases the key so a retry
+  runs again
+- a duplicate arriving while the first is in flight waits for it - on a
+  future in the same worker, by polling the record across workers - for up
+  to IDEMPOTENCY_WAIT_SECONDS, then gets 409
+- reusing a key for a different request is a 422
+
+Replayed responses carry `Idempotent-Replayed: true`.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.responses import ORJSONResponse
+from app.storage.base import StorageEngine
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_SECONDS = 0.1
+
+# Keys owned by requests running in this process -> their response (None if released)
+_inflight: Dict[Tuple[str, str], "asyncio.Future[Optional[dict]]"] = {}
+
+
+def fingerprint(*parts: bytes) -> str:
+    """Hash identifying the request a key was first sent with"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _replay(response: dict) -> Any:
+    headers = {REPLAYED_HEADER: "true"}
+    if response["status"] >= 400:
+        raise HTTPException(status_code=response["status"], detail=response["body"].get("detail"), headers=headers)
+    return ORJSONResponse(response["body"], status_code=response["status"], headers=headers)
+
+
+def _check_fingerprint(record: dict, request_fingerprint: str) -> None:
+    if record["fingerprint"] != request_fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+
+async def _wait(engine: StorageEngine, user_id: str, key: str, request_fingerprint: str) -> Optional[dict]:
+    """
+    Wait for the request that owns a key
+
+    Returns:
+        Its stored response, or None once the caller has claimed the key
+        (the owner failed or its lock expired)
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still in progress"
+            )
+
+        future = _inflight.get((user_id, key))
+        if future is not None:
+            try:
+                response = await asyncio.wait_for(asyncio.shield(future), remaining)
+            except asyncio.TimeoutError:
+                continue
+            if response is not None:
+                return response
+        else:
+            await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+
+        record = await engine.claim_request(user_id, key, request_fingerprint)
+        if record is None:
+            return None
+        _check_fingerprint(record, request_fingerprint)
+        if record["response"] is not None:
+            return record["response"]
+
+
+async def run_idempotent(
+    engine: StorageEngine,
+    user_id: str,
+    key: Optional[str],
+    request_fingerprint: str,
+    handler: Callable[[], Awaitable[Any]],
+) -> Any:
+    """
+    Run a handler at most once per (user, Idempotency-Key)
+
+    Args:
+        engine: Storage engine holding the key records
+        user_id: Authenticated user ID
+        key: Idempotency-Key header value (None runs the handler unconditionally)
+        request_fingerprint: fingerprint() of the request body
+        handler: Performs the request and returns its JSON-serializable result
+
+    Returns:
+        The handler's result, or the stored response of an earlier request
+    """
+    if key is None:
+        return await handler()
+    if len(key) > MAX_KEY_LENGTH or not key.isprintable() or not key.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} printable characters"
+        )
+
+    record = await engine.claim_request(user_id, key, request_fingerprint)
+    if record is not None:
+        _check_fingerprint(record, request_fingerprint)
+        response = record["response"] or await _wait(engine, user_id, key, request_fingerprint)
+        if response is not None:
+            return _replay(response)
+
+    future = asyncio.get_running_loop().create_future()
+    while _inflight.setdefault((user_id, key), future) is not future:
+        # The claim took over the expired lock of a request still running in
+        # this worker - let it finish rather than run the handler twice
+        response = await _wait(engine, user_id, key, request_fingerprint)
+        if response is not None:
+            return _replay(response)
+
+    response = None
+    try:
+        result = await handler()
+        response = {"status": status.HTTP_200_OK, "body": jsonable_encoder(result)}
+        return result
+    except HTTPException as e:
+        if e.status_code < 500 and e.status_code != status.HTTP_429_TOO_MANY_REQUESTS:
+            response = {"status": e.status_code, "body": {"detail": e.detail}}
+        raise
+    finally:
+        if _inflight.get((user_id, key)) is future:
+            del _inflight[(user_id, key)]
+        try:
+            if response is not None:
+                await engine.complete_request(user_id, key, response)
+            else:
+                await engine.release_request(user_id, key)
+        except Exception as e:
+            logger.warning(f"Failed to record Idempotency-Key result: {e}")
+        future.set_result(response)
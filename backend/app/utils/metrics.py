@@ -0,0 +1,286 @@
+"""
+Prometheus metrics (text exposition format, served at GET /metrics)
+Hand-rolled counters, gauges and histograms so instrumentation costs one
+lock and a bisect per observation - cheap enough to leave on in
+production. Observations may come from driver threads (pymongo command
+listener), so every metric guards its state with a lock.
+
+Metrics backed by state other modules already keep (model loader,
+password pool, connection pool, rate limiter, event broker) are read
+through callbacks at scrape time; see app/routes/metrics.py.
+"""
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.tracing import KIND_CLIENT, record_span
+
+# Request and stage latencies: 1 ms .. 30 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Mongo commands and event-loop lag: 100 us .. 5 s
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class _Sampled(_Metric):
+    """
+    One value per label set, either kept here or read at scrape time from
+    a callback returning a number (no labels) or {label values: number}
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        callback: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None,
+    ):
+        super().__init__(name, help, labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback = callback
+
+    def render(self) -> List[str]:
+        if self._callback is not None:
+            result = self._callback()
+            values = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in values
+        ]
+
+
+class Counter(_Sampled):
+    """Monotonic counter per label set"""
+
+    kind = "counter"
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Sampled):
+    """Current value per label set"""
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """Observe the duration of a block (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *label_values)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+
+        lines = self._header()
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named metrics rendered together in registration order"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # One failing callback must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    labels=("method", "route", "status"),
+))
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests being served",
+    callback=lambda: MetricsMiddleware.in_progress,
+))
+scan_stage_duration = registry.register(Histogram(
+    "scan_stage_duration_seconds", "POST /scan/ latency per pipeline stage",
+    labels=("stage",),
+))
+external_api_requests = registry.register(Counter(
+    "external_api_requests_total", "Calls to external APIs by outcome (HTTP status or error)",
+    labels=("api", "outcome"),
+))
+mongo_command_duration = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trips",
+    labels=("command", "outcome"), buckets=FAST_BUCKETS,
+))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "Delay of a periodic event-loop timer beyond its due time",
+    buckets=FAST_BUCKETS,
+))
+
+
+# ==================== MIDDLEWARE ====================
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request by route template (path parameters collapsed)
+    Requests that match no route are labelled "unmatched" to bound cardinality
+    """
+
+    # Requests being served by this process (event loop only, no lock needed)
+    in_progress = 0
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        MetricsMiddleware.in_progress += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            MetricsMiddleware.in_progress -= 1
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"], route.path if route is not None else "unmatched", str(status_code),
+            )
+
+
+# ==================== MONGO COMMANDS ====================
+
+class CommandTimer(monitoring.CommandListener):
+    """
+    Records the driver-measured duration of every MongoDB command, and adds
+    it as a span to the trace of the request that issued it
+    """
+
+    def started(self, event):
+        pass
+
+    def _record(self, event, outcome: str) -> None:
+        duration = event.duration_micros / 1e6
+        mongo_command_duration.observe(duration, event.command_name, outcome)
+        record_span(
+            f"mongo.{event.command_name}", time.perf_counter() - duration, duration, KIND_CLIENT,
+            outcome=outcome,
+        )
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+command_timer = CommandTimer()
+
+
+# ==================== EVENT LOOP LAG ====================
+
+async def monitor_event_loop(interval: float) -> None:
+    """Sleep `interval` seconds in a loop and record how late each wake-up is"""
+    loop = asyncio.get_running_loop()
+    while True:
+        due = loop.time() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag.observe(max(0.0, loop.time() - due))
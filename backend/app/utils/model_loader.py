@@ -3,6 +3,8 @@ import numpy as np
 from datetime import datetime
 from typing import Optional, Dict, Tuple
 import logging
+from app.utils.metrics import scan_stage_duration
+from app.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -123,36 +125,36 @@ class FoodModelLoader:
             # Convert to correct dtype (TFLite usually expects float32)
             image_array = image_array.astype(self.input_details[0]['dtype'])
             
-            # Set input tensor
-            self.interpreter.set_tensor(self.input_details[0]['index'], image_array)
+            # Set input tensor and run inference
+            with scan_stage_duration.time("invoke"), span("scan.invoke"):
+                self.interpreter.set_tensor(self.input_details[0]['index'], image_array)
+                self.interpreter.invoke()
             
-            # Run inference
-            self.interpreter.invoke()
-            
-            # Get output tensor
-            predictions = self.interpreter.get_tensor(self.output_details[0]['index'])[0]
-            
-            # Ensure top_k doesn't exceed available classes
-            num_classes = len(predictions)
-            top_k = min(top_k, num_classes)
-            
-            # Get top K predictions
-            top_indices = np.argsort(predictions)[-top_k:][::-1]
-            
-            results = []
-            for idx in top_indices:
-                # Make sure idx is within bounds
-                if idx >= len(predictions):
-                    continue
-                    
-                class_name = self.class_names[idx] if (self.class_names and idx < len(self.class_names)) else f"Class_{idx}"
-                confidence = float(predictions[idx])
+            with scan_stage_duration.time("postprocess"), span("scan.postprocess"):
+                # Get output tensor
+                predictions = self.interpreter.get_tensor(self.output_details[0]['index'])[0]
+                
+                # Ensure top_k doesn't exceed available classes
+                num_classes = len(predictions)
+                top_k = min(top_k, num_classes)
                 
-                results.append({
-                    "class_index": int(idx),
-                    "class_name": class_name,
-                    "confidence": confidence
-                })
+                # Get top K predictions
+                top_indices = np.argsort(predictions)[-top_k:][::-1]
+                
+                results = []
+                for idx in top_indices:
+                    # Make sure idx is within bounds
+                    if idx >= len(predictions):
+                        continue
+                        
+                    class_name = self.class_names[idx] if (self.class_names and idx < len(self.class_names)) else f"Class_{idx}"
+                    confidence = float(predictions[idx])
+                    
+                    results.append({
+                        "class_index": int(idx),
+                        "class_name": class_name,
+                        "confidence": confidence
+                    })
             
             return {
                 "predictions": results,
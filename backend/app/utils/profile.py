@@ -0,0 +1,52 @@
+"""
+Cached user profile reads
+Profiles are served from profile_cache. Writes that return the new users
+document (update_profile) refresh the entry. Writes that do not, such as
+StorageEngine.record_workout_day, must call profile_cache.invalidate
+"""
+from typing import Optional
+
+from app.storage.base import StorageEngine
+from app.utils.cache import profile_cache
+
+
+async def get_profile(storage: StorageEngine, user_id: str) -> Optional[dict]:
+    """
+    Users document without the password hash, from the cache when possible
+    The returned dict is shared with the cache and must not be modified
+
+    Args:
+        storage: Storage engine
+        user_id: User to load
+
+    Returns:
+        The profile, or None if the user does not exist
+    """
+    user = await profile_cache.get(user_id)
+    if user is not None:
+        return user
+
+    token = profile_cache.read_token()
+    user = await storage.get_user(user_id)
+    if user is None:
+        return None
+    return await profile_cache.set(user_id, user, token)
+
+
+async def update_profile(storage: StorageEngine, user_id: str, fields: dict) -> Optional[dict]:
+    """
+    Update a user and write the new document through to the cache
+
+    Args:
+        storage: Storage engine
+        user_id: User to update
+        fields: Fields to set
+
+    Returns:
+        The updated profile, or None if the user does not exist
+    """
+    user = await storage.update_user(user_id, fields)
+    if user is None:
+        await profile_cache.invalidate(user_id)
+        return None
+    return await profile_cache.set(user_id, user)
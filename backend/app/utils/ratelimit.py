@@ -0,0 +1,245 @@
+"""
+Token-bucket rate limiting for expensive endpoints
+Each route class has a limit RATE_LIMIT_<CLASS> = "<requests>/<seconds>":
+one bucket per user (or client IP) holds up to <requests> tokens and
+refills at <requests> per <seconds>. Every request takes a token (a replayed
+Idempotency-Key does not); an empty bucket answers 429 with Retry-After, so
+one client hammering /scan/ or /auth/login cannot take over a worker.
+
+Buckets are kept in process (bounded by RATE_LIMIT_MAX_KEYS) unless
+RATE_LIMIT_BACKEND selects a shared store, which makes a limit hold across
+workers. If the shared store fails, requests are let through.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.config import settings
+from app.utils.auth import get_current_user
+
+logger = logging.getLogger(__name__)
+
+USER = "user"
+IP = "ip"
+
+# Route class -> whose bucket a request takes from
+ROUTE_CLASSES = {"scan": USER, "auth": IP}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(spec: str) -> Optional[Tuple[float, float]]:
+    """
+    Parse a "<requests>/<seconds>" limit
+
+    Returns:
+        (bucket capacity, tokens refilled per second), or None if the
+        limit is empty, "off" or zero
+    """
+    spec = (spec or "").strip().lower()
+    if spec in ("", "off", "none", "0"):
+        return None
+    requests, _, seconds = spec.partition("/")
+    capacity, period = float(requests), float(seconds or 1)
+    if capacity <= 0 or period <= 0:
+        return None
+    return capacity, capacity / period
+
+
+def _take(bucket: Optional[Tuple[float, float]], now: float, capacity: float, rate: float) -> Tuple[Tuple[float, float], float]:
+    """
+    Refill a (tokens, updated_at) bucket and take one token
+
+    Returns:
+        The new bucket and 0 if the request may proceed, else the
+        seconds until a token is available
+    """
+    tokens, updated_at = bucket if bucket is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class _Buckets:
+    """LRU-bounded bucket map; an evicted bucket comes back full"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, now: float, capacity: float, rate: float) -> float:
+        self._data[key], retry_after = _take(self._data.get(key), now, capacity, rate)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return retry_after
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RateLimitBackend:
+    """
+    Shared bucket store (e.g. Redis running the refill as a script)
+    Subclasses implement take() atomically for a key
+    """
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        """Take a token; returns 0 or the seconds until one is available"""
+        raise NotImplementedError
+
+
+class LocalRateLimitBackend(RateLimitBackend):
+    """
+    Local stand-in for a shared bucket store
+    Keeps buckets in a process-wide map on wall-clock time (like a shared
+    server would) so the shared code path can be exercised without
+    external infrastructure
+    """
+
+    def __init__(self, maxsize: int):
+        self._buckets = _Buckets(maxsize)
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        return self._buckets.take(key, time.time(), capacity, rate)
+
+
+def create_rate_limit_backend(name: str) -> Optional[RateLimitBackend]:
+    """
+    Build the shared rate limit backend selected in settings
+
+    Args:
+        name: Backend name ("none" or "local")
+
+    Returns:
+        RateLimitBackend instance or None for per-process buckets
+    """
+    name = (name or "none").lower()
+    if name == "local":
+        return LocalRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS)
+    return None
+
+
+class RateLimiter:
+    """
+    Token buckets per (route class, user or IP) with allowed / limited counters
+    Not thread-safe; meant to be used from the event loop only
+    """
+
+    def __init__(self, maxsize: int, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend
+        self._buckets = _Buckets(maxsize)
+        self.allowed: Dict[str, int] = defaultdict(int)
+        self.limited: Dict[str, int] = defaultdict(int)
+        self.backend_errors = 0
+
+    async def hit(self, route_class: str, key: str, capacity: float, rate: float) -> float:
+        """Take a token for a request; returns 0 or the seconds until one is available"""
+        bucket_key = f"{route_class}:{key}"
+        if self.backend is None:
+            retry_after = self._buckets.take(bucket_key, time.monotonic(), capacity, rate)
+        else:
+            try:
+                retry_after = await self.backend.take(bucket_key, capacity, rate)
+            except Exception as e:
+                self.backend_errors += 1
+                logger.warning(f"Rate limit backend failed, allowing request: {e}")
+                retry_after = 0.0
+
+        if retry_after > 0:
+            self.limited[route_class] += 1
+        else:
+            self.allowed[route_class] += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, Any]:
+        """Configured limits and allowed / limited requests per route class"""
+        return {
+            "enabled": settings.RATE_LIMIT_ENABLED,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "buckets": len(self._buckets),
+            "backend_errors": self.backend_errors,
+            "classes": {
+                route_class: {
+                    "per": per,
+                    "limit": getattr(settings, f"RATE_LIMIT_{route_class.upper()}"),
+                    "allowed": self.allowed[route_class],
+                    "limited": self.limited[route_class],
+                }
+                for route_class, per in ROUTE_CLASSES.items()
+            },
+        }
+
+
+def client_ip(request: Request) -> str:
+    """
+    Client address of a request
+    Each of the TRUSTED_PROXY_HOPS reverse proxies in front of the app
+    appends the address it saw to X-Forwarded-For, so the client is that
+    many entries from the end; entries further left come from the client
+    and could be forged to dodge the limit
+    """
+    hops = settings.TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [
+            host.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for host in header.split(",")
+            if host.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+async def check_rate_limit(route_class: str, key: str) -> None:
+    """
+    Take a token from a bucket, raising 429 when it is empty
+    For handlers that must decide first whether a request does any work
+    (e.g. Idempotency-Key replays are not charged)
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    limit = parse_rate(getattr(settings, f"RATE_LIMIT_{route_class.upper()}"))
+    if limit is None:
+        return
+
+    retry_after = await rate_limiter.hit(route_class, key, *limit)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def rate_limit(route_class: str):
+    """
+    Route dependency enforcing a route class's limit
+
+    Args:
+        route_class: Key of ROUTE_CLASSES (limit read from RATE_LIMIT_<CLASS>)
+
+    Returns:
+        Dependency for `dependencies=[Depends(rate_limit(...))]`
+    """
+    if ROUTE_CLASSES[route_class] == USER:
+        async def limit_user(current_user: str = Depends(get_current_user)) -> None:
+            await check_rate_limit(route_class, current_user)
+        return limit_user
+
+    async def limit_ip(request: Request) -> None:
+        await check_rate_limit(route_class, client_ip(request))
+    return limit_ip
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    maxsize=settings.RATE_LIMIT_MAX_KEYS,
+    backend=create_rate_limit_backend(settings.RATE_LIMIT_BACKEND),
+)
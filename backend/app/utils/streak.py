@@ -0,0 +1,156 @@
+"""
+Workout streak tracking
+The user document carries the streak state, so profile reads stay a
+single fetch:
+
+    workoutStreak    consecutive IST days with a workout, ending at lastWorkoutDate
+    longestStreak    best run seen so far
+    lastWorkoutDate  YYYY-MM-DD (IST) of the latest workout
+
+log_workout advances it in O(1) with one atomic update (see
+StorageEngine.record_workout_day). Changes to past days inside or just
+before the current run (touches_current_run), and the initial backfill,
+go through recompute_streak:
+
+    python -m app.utils.streak [--user USER_ID]
+"""
+import argparse
+import asyncio
+from datetime import date as date_cls, timedelta
+from typing import Iterable, Optional
+
+from app.utils.profile import update_profile
+from app.utils.timezone import get_ist_date_string
+
+# Profile fields a workout write can change (sync change records)
+STREAK_FIELDS = ["workoutStreak", "longestStreak", "lastWorkoutDate"]
+
+
+def previous_date(date: str) -> str:
+    """The IST calendar day before `date` (YYYY-MM-DD)"""
+    return (date_cls.fromisoformat(date) - timedelta(days=1)).isoformat()
+
+
+def advance_streak(user: dict, date: str) -> dict:
+    """
+    Streak fields after a workout on `date`
+    Reference implementation of the atomic update the storage engines run
+
+    Args:
+        user: Current user document (streak fields may be missing)
+        date: IST date of the workout
+
+    Returns:
+        Updated workoutStreak, longestStreak and lastWorkoutDate
+    """
+    last = user.get("lastWorkoutDate")
+    streak = user.get("workoutStreak") or 0
+
+    if last is not None and last >= date:
+        # Same day (or an older day - handled by recompute_streak)
+        pass
+    elif last == previous_date(date):
+        streak += 1
+    else:
+        streak = 1
+
+    return {
+        "workoutStreak": streak,
+        "longestStreak": max(user.get("longestStreak") or 0, streak),
+        "lastWorkoutDate": max(filter(None, (last, date))),
+    }
+
+
+def current_streak(user: dict, today: Optional[str] = None) -> int:
+    """
+    Streak to display: the stored run only counts while it can still be
+    continued, i.e. the last workout was today or yesterday (IST)
+    """
+    last = user.get("lastWorkoutDate")
+    if not last:
+        return 0
+    today = today or get_ist_date_string()
+    if last == today or last == previous_date(today):
+        return user.get("workoutStreak") or 0
+    return 0
+
+
+def current_run_start(user: dict) -> Optional[str]:
+    """First day of the stored run ending at lastWorkoutDate, or None without workouts"""
+    last = user.get("lastWorkoutDate")
+    if not last:
+        return None
+    length = max(1, user.get("workoutStreak") or 0)
+    return (date_cls.fromisoformat(last) - timedelta(days=length - 1)).isoformat()
+
+
+def touches_current_run(user: dict, date: str) -> bool:
+    """
+    Whether adding or removing workouts on a past `date` can change the
+    current run: it lies inside the run or on the day before it
+    Older days can only join earlier runs (longestStreak, which never
+    decreases); those are picked up by the next full recompute
+    """
+    start = current_run_start(user)
+    return start is not None and previous_date(start) <= date <= user["lastWorkoutDate"]
+
+
+def streak_from_dates(dates: Iterable[str]) -> dict:
+    """
+    Streak fields from every date with at least one workout
+
+    Args:
+        dates: YYYY-MM-DD strings, any order, duplicates allowed
+    """
+    ordered = sorted(set(dates))
+    state: dict = {"workoutStreak": 0, "longestStreak": 0, "lastWorkoutDate": None}
+    for date in ordered:
+        state = advance_streak(state, date)
+    return state
+
+
+async def recompute_streak(storage, user_id: str) -> Optional[dict]:
+    """
+    Rebuild a user's streak from their workout history
+    longestStreak never decreases, since days past the hot TTL may not
+    be archived
+
+    Args:
+        storage: Storage engine
+        user_id: User to recompute
+
+    Returns:
+        The updated user, or None if the user does not exist
+    """
+    user = await storage.get_user(user_id)
+    if user is None:
+        return None
+
+    state = streak_from_dates(await storage.get_workout_dates(user_id))
+    state["longestStreak"] = max(state["longestStreak"], user.get("longestStreak") or 0)
+
+    unchanged = all(user.get(field) == value for field, value in state.items())
+    return user if unchanged else await update_profile(storage, user_id, state)
+
+
+async def _main(user_id: Optional[str]) -> None:
+    from app.models import database
+
+    await database.connect_storage()
+    storage = database.current_storage()
+    if storage is None:
+        return
+    try:
+        user_ids = [user_id] if user_id else [uid async for uid in storage.user_ids()]
+        for uid in user_ids:
+            await recompute_streak(storage, uid)
+        print(f"✓ Recomputed streaks for {len(user_ids)} user(s)")
+    finally:
+        await database.close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill / recompute workout streaks")
+    parser.add_argument("--user", default=None, help="only recompute this user id")
+    args = parser.parse_args()
+    asyncio.run(_main(args.user))
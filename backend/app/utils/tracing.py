@@ -0,0 +1,403 @@
+"""
+Lightweight request tracing
+A sampled request carries a Trace in a context variable. Code on its path
+records spans with `span(...)`: scan stages, the auth dependency, database
+calls and external HTTP calls. Motor runs pymongo with the caller's context,
+so the command listener attributes MongoDB commands to the right request.
+Unsampled requests have no trace; span() then does one ContextVar lookup
+and returns a shared no-op.
+
+The breakdown is returned in a Server-Timing response header and handed
+to the exporter selected by TRACING_EXPORTER, as OTLP/JSON.
+
+A request is sampled with probability TRACING_SAMPLE_RATE. A W3C
+`traceparent` header supplies the trace ID it joins; its sampled flag
+forces tracing only with TRACING_TRUST_PARENT, since any public client
+could otherwise have every request traced.
+"""
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "workout-tracker-api"
+
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+# Server-Timing metric names are HTTP tokens
+_TIMING_NAME = re.compile(r"[^A-Za-z0-9!#$%&'*+\-.^_`|~]")
+
+
+def _new_id(size: int) -> str:
+    return os.urandom(size).hex()
+
+
+class Span:
+    __slots__ = ("name", "span_id", "parent_id", "kind", "start", "duration", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], kind: int, start: float, attributes: Optional[dict]):
+        self.name = name
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start = start
+        self.duration = 0.0
+        self.attributes = attributes
+
+
+class Trace:
+    """Spans of one sampled request; durations from perf_counter"""
+
+    def __init__(self, trace_id: str, parent_id: Optional[str]):
+        self.trace_id = trace_id
+        self.start_ns = time.time_ns()
+        self.root = Span("request", parent_id, KIND_SERVER, time.perf_counter(), {})
+        self.spans: List[Span] = []
+
+    def server_timing(self) -> str:
+        """
+        Server-Timing header value: total time so far, then each span name
+        with its summed duration (and call count when more than one)
+        """
+        totals: Dict[str, List[float]] = {}
+        for item in self.spans:
+            total = totals.setdefault(item.name, [0.0, 0])
+            total[0] += item.duration
+            total[1] += 1
+
+        entries = [f"total;dur={(time.perf_counter() - self.root.start) * 1000:.2f}"]
+        for name, (duration, count) in totals.items():
+            entry = f"{_TIMING_NAME.sub('_', name)};dur={duration * 1000:.2f}"
+            entries.append(entry + f';desc="x{count}"' if count > 1 else entry)
+        entries.append(f'trace;desc="{self.trace_id}"')
+        return ", ".join(entries)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """OTLP/JSON ExportTraceServiceRequest for this trace"""
+        def encode(item: Span) -> Dict[str, Any]:
+            start_ns = self.start_ns + int((item.start - self.root.start) * 1e9)
+            encoded = {
+                "traceId": self.trace_id,
+                "spanId": item.span_id,
+                "name": item.name,
+                "kind": item.kind,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(item.duration * 1e9)),
+                "attributes": [
+                    {"key": key, "value": {"stringValue": str(value)}}
+                    for key, value in (item.attributes or {}).items()
+                ],
+            }
+            if item.parent_id:
+                encoded["parentSpanId"] = item.parent_id
+            return encoded
+
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [encode(self.root)] + [encode(item) for item in self.spans],
+            }],
+        }]}
+
+
+_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_parent: ContextVar[Optional[str]] = ContextVar("trace_parent", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace of the request being served, or None when it is not sampled"""
+    return _trace.get()
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class _SpanScope:
+    __slots__ = ("trace", "item", "token")
+
+    def __init__(self, trace: Trace, item: Span):
+        self.trace = trace
+        self.item = item
+
+    def __enter__(self) -> None:
+        self.token = _parent.set(self.item.span_id)
+        self.item.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        _parent.reset(self.token)
+        self.item.duration = time.perf_counter() - self.item.start
+        self.trace.spans.append(self.item)
+
+
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any):
+    """
+    Record a `with` block as a span of the current trace
+    When the request is not sampled this returns a shared no-op
+
+    Args:
+        name: Span name, also the Server-Timing metric name
+        kind: OTLP span kind (KIND_CLIENT for calls to other services)
+        **attributes: Extra span attributes
+    """
+    trace = _trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _SpanScope(trace, Span(name, _parent.get() or trace.root.span_id, kind, 0.0, attributes))
+
+
+def record_span(name: str, start: float, duration: float, kind: int = KIND_INTERNAL, **attributes: Any) -> None:
+    """
+    Add an already timed span to the current trace (no-op when unsampled)
+    Safe to call from driver threads running in the request's context
+
+    Args:
+        name: Span name
+        start: perf_counter() value when the work started
+        duration: Seconds taken
+        kind: OTLP span kind
+        **attributes: Extra span attributes
+    """
+    trace = _trace.get()
+    if trace is None:
+        return
+    item = Span(name, _parent.get() or trace.root.span_id, kind, start, attributes)
+    item.duration = duration
+    # list.append is atomic, so driver threads can add spans concurrently
+    trace.spans.append(item)
+
+
+# ==================== EXPORTERS ====================
+
+class SpanExporter:
+    """
+    Destination for finished traces
+    export() is called on the event loop once per sampled request and must
+    not block; start() / stop() run any background delivery
+    """
+
+    def export(self, trace: Trace) -> None:
+        raise NotImplementedError
+
+    def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class LocalSpanExporter(SpanExporter):
+    """
+    Local stand-in for an OTLP collector
+    Keeps the last `max_traces` traces as OTLP/JSON in memory, readable at
+    /health/traces, so the export path works without external infrastructure
+    """
+
+    def __init__(self, max_traces: int):
+        self.traces: Deque[Dict[str, Any]] = deque(maxlen=max_traces)
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace.to_otlp())
+
+    def recent(self) -> List[Dict[str, Any]]:
+        return list(self.traces)
+
+
+class OTLPHttpExporter(SpanExporter):
+    """
+    Sends traces to an OTLP/HTTP collector (JSON encoding) in batches
+    A full queue drops new traces rather than slow requests down
+    """
+
+    BATCH_SIZE = 64
+    MAX_QUEUED = 2048
+
+    def __init__(self, endpoint: str, interval: float = 5.0):
+        self.endpoint = endpoint
+        self.interval = interval
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.failures = 0
+
+    def export(self, trace: Trace) -> None:
+        if len(self._queue) >= self.MAX_QUEUED:
+            self.dropped += 1
+            return
+        self._queue.append(trace.to_otlp())
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        await self._flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._flush()
+
+    async def _flush(self) -> None:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(min(self.BATCH_SIZE, len(self._queue)))]
+                payload = {"resourceSpans": [spans for item in batch for spans in item["resourceSpans"]]}
+                try:
+                    response = await client.post(self.endpoint, json=payload)
+                    response.raise_for_status()
+                    self.sent += len(batch)
+                except Exception as e:
+                    self.failures += 1
+                    self.dropped += len(batch)
+                    logger.warning(f"Trace export to {self.endpoint} failed: {e}")
+                    return
+
+
+def create_span_exporter(name: str) -> Optional[SpanExporter]:
+    """
+    Build the trace exporter selected in settings
+
+    Args:
+        name: Exporter name ("none", "local" or "otlp")
+
+    Returns:
+        SpanExporter instance or None to keep traces in the response header only
+    """
+    name = (name or "none").lower()
+    if name == "local":
+        return LocalSpanExporter(settings.TRACING_LOCAL_MAX_TRACES)
+    if name == "otlp":
+        return OTLPHttpExporter(settings.TRACING_OTLP_ENDPOINT)
+    return None
+
+
+class Tracer:
+    """Sampling decision and exporter for the process"""
+
+    def __init__(self, sample_rate: float, trust_parent: bool = False):
+        self.sample_rate = sample_rate
+        self.trust_parent = trust_parent
+        self.exporter: Optional[SpanExporter] = None
+        self.sampled = 0
+
+    def start(self, exporter: Optional[SpanExporter]) -> None:
+        self.exporter = exporter
+        if exporter is not None:
+            exporter.start()
+
+    async def stop(self) -> None:
+        if self.exporter is not None:
+            await self.exporter.stop()
+
+    def begin(self, traceparent: Optional[str]) -> Optional[Trace]:
+        """
+        Start a trace for a request, or None when it is not sampled
+        An upstream sampling decision is only honoured with trust_parent;
+        otherwise the local rate applies and the parent's trace ID is kept
+        """
+        parent = _TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+        if parent is not None and self.trust_parent and int(parent.group(3), 16) & 1:
+            self.sampled += 1
+            return Trace(parent.group(1), parent.group(2))
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self.sampled += 1
+            return Trace(parent.group(1), parent.group(2)) if parent is not None else Trace(_new_id(16), None)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        exporter = self.exporter
+        return {
+            "sample_rate": self.sample_rate,
+            "trust_parent": self.trust_parent,
+            "sampled": self.sampled,
+            "exporter": type(exporter).__name__ if exporter else None,
+            "sent": getattr(exporter, "sent", None),
+            "dropped": getattr(exporter, "dropped", None),
+        }
+
+
+tracer = Tracer(settings.TRACING_SAMPLE_RATE, settings.TRACING_TRUST_PARENT)
+
+
+# ==================== MIDDLEWARE ====================
+
+class TracingMiddleware:
+    """
+    Traces sampled requests and adds their Server-Timing header
+    The header is written when the response starts, so it covers the work
+    done before the body is sent
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        trace = tracer.begin(traceparent)
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                trace.root.attributes["http.status_code"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", trace.server_timing().encode("latin-1")),
+                ]
+            await send(message)
+
+        token = _trace.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _trace.reset(token)
+            root = trace.root
+            root.duration = time.perf_counter() - root.start
+            route = scope.get("route")
+            root.name = f"{scope['method']} {route.path if route is not None else 'unmatched'}"
+            root.attributes["http.method"] = scope["method"]
+            if tracer.exporter is not None:
+                try:
+                    tracer.exporter.export(trace)
+                except Exception as e:
+                    logger.warning(f"Trace export failed: {e}")
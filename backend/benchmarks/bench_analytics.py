@@ -0,0 +1,120 @@
+"""
+Analytics summary benchmark
+Builds a 90-day trend summary two ways: loading full days (get_days) and
+summing entries in Python, vs the totals-only get_daily_totals query the
+/analytics/summary endpoint uses. Reports latency and bytes read per
+query on a temporary SQLite engine, or with --live against the MongoDB at
+MONGO_URI (uses a throwaway database)
+
+Usage:
+    python -m benchmarks.bench_analytics [--days 90] [--items 12] [--runs 20] [--live]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date as date_cls, timedelta
+from uuid import uuid4
+
+import orjson
+
+from app.models.daily_logs import NUTRITION_TOTALS, workout_stats
+from app.storage.base import StorageEngine
+from app.utils.analytics import build_summary
+from app.utils.timezone import get_ist_now
+
+USER = {"dailyCalorieGoal": 2000, "proteinGoal": 150, "carbsGoal": 200, "fiberGoal": 25}
+BENCH_DB = "bench_analytics"
+
+
+async def seed(engine: StorageEngine, user_id: str, dates: list, items: int) -> None:
+    now = get_ist_now().isoformat()
+    for date in dates:
+        for _ in range(max(1, items // 4)):
+            await engine.add_workout(user_id, date, {
+                "id": str(uuid4()), "exercise": "Deadlift", "sets": 3, "reps": 5,
+                "weight": 120.0, "duration": 30, "date": now,
+            })
+        for _ in range(items):
+            entry = {"id": str(uuid4()), "name": "idli", "calories": 150, "protein": 3.8,
+                     "carbs": 30.0, "fat": 2.0, "fiber": 0.6, "confidence": 0.87, "date": now}
+            totals = {"total_calories": 150, "total_protein": 3.8, "total_carbs": 30.0,
+                      "total_fat": 2.0, "total_fiber": 0.6}
+            await engine.add_food_item(user_id, date, entry, totals)
+
+
+async def from_days(engine: StorageEngine, user_id: str, start: str, end: str):
+    days = await engine.get_days(user_id, start, end)
+    rows = [
+        {"date": day["date"],
+         **{field: day["nutrition"].get(field, 0) for field in NUTRITION_TOTALS},
+         **workout_stats(day.get("workouts", []))}
+        for day in days
+    ]
+    return build_summary(rows, USER, start, end), len(orjson.dumps(days, default=str))
+
+
+async def from_totals(engine: StorageEngine, user_id: str, start: str, end: str):
+    rows = await engine.get_daily_totals(user_id, start, end)
+    return build_summary(rows, USER, start, end), len(orjson.dumps(rows))
+
+
+async def run(engine: StorageEngine, days: int, items: int, runs: int) -> None:
+    end = date_cls(2024, 6, 30)
+    dates = [(end - timedelta(days=n)).isoformat() for n in range(days)][::-1]
+    user_id = str(uuid4())
+    await seed(engine, user_id, dates, items)
+    print(f"{days} days, {items} food items/day, {runs} runs")
+
+    results = {}
+    for name, fn in (("get_days + Python", from_days), ("get_daily_totals", from_totals)):
+        summary, size = await fn(engine, user_id, dates[0], dates[-1])
+        start = time.perf_counter()
+        for _ in range(runs):
+            await fn(engine, user_id, dates[0], dates[-1])
+        elapsed = (time.perf_counter() - start) / runs
+        results[name] = summary
+        print(f"  {name:<18} {elapsed * 1000:8.2f} ms/query  {size / 1024:8.1f} KiB read")
+
+    assert results["get_days + Python"]["summary"] == results["get_daily_totals"]["summary"]
+
+
+async def run_sqlite(days: int, items: int, runs: int) -> None:
+    from app.storage.sqlite import SQLiteStorage
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = SQLiteStorage(os.path.join(directory, "bench.db"))
+        try:
+            print("sqlite")
+            await run(engine, days, items, runs)
+        finally:
+            await engine.close()
+
+
+async def run_mongo(days: int, items: int, runs: int) -> None:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.core.config import settings
+    from app.models.migrations import apply_migrations
+    from app.storage.mongo import MongoStorage
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    try:
+        await client.drop_database(BENCH_DB)
+        db = client[BENCH_DB]
+        await apply_migrations(db)
+        print("mongo")
+        await run(MongoStorage(db), days, items, runs)
+    finally:
+        await client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--items", type=int, default=12)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="benchmark MongoDB instead of SQLite")
+    args = parser.parse_args()
+    asyncio.run((run_mongo if args.live else run_sqlite)(args.days, args.items, args.runs))
@@ -0,0 +1,102 @@
+"""
+Cold archive benchmark
+Compares a month of hot day documents with the same month packed into one
+columnar archive document: stored size, full decode throughput and a
+totals-only scan (the shape long-range analytics use)
+
+Usage:
+    python -m benchmarks.bench_archive [--months 12] [--items 12]
+"""
+import argparse
+import time
+from uuid import uuid4
+
+import bson
+from bson import ObjectId
+
+from app.models.archive import _day_record, _pack_archive
+from app.models.codec import day_number, decode_day, encode_entry, month_key, unpack_columns
+from app.models.daily_logs import _archived_day
+from app.utils.timezone import get_ist_now
+
+USER_ID = "6ad5dc8f5313f7d0d7463de6"
+
+
+def hot_day(day: int, items: int) -> dict:
+    now = get_ist_now()
+    return {
+        "_id": ObjectId(),
+        "user_id": USER_ID,
+        "day": day,
+        "workouts": [
+            encode_entry({"id": str(uuid4()), "exercise": "Deadlift", "sets": 3, "reps": 5,
+                          "weight": 120.0, "duration": 30, "date": now.isoformat()})
+            for _ in range(max(1, items // 4))
+        ],
+        "nutrition": {
+            "total_calories": 150 * items, "total_protein": 3.8 * items, "total_carbs": 30.0 * items,
+            "total_fat": 2.0 * items, "total_fiber": 0.6 * items,
+            "items": [
+                encode_entry({"id": str(uuid4()), "name": "idli", "calories": 150, "protein": 3.8,
+                              "carbs": 30.0, "fat": 2.0, "fiber": 0.6, "confidence": 0.87,
+                              "date": now.isoformat()})
+                for _ in range(items)
+            ],
+        },
+        "version": items,
+        "createdAt": now,
+    }
+
+
+def main(months: int, items: int):
+    first = day_number("2024-01-01")
+    hot_docs, archives = [], []
+    day = first
+    for _ in range(months):
+        month = month_key(day)
+        days = []
+        while month_key(day) == month:
+            days.append(hot_day(day, items))
+            day += 1
+        hot_docs += [bson.encode(d) for d in days]
+        records = {d["day"]: _day_record(d, []) for d in days}
+        archives.append(bson.encode({"user_id": USER_ID, "month": month, "version": 1, **_pack_archive(records)}))
+
+    total_days = len(hot_docs)
+    hot_size = sum(len(d) for d in hot_docs)
+    archive_size = sum(len(a) for a in archives)
+    print(f"{total_days} days, {items} food items/day")
+    print(f"  hot documents:     {hot_size / 1024:8.1f} KiB ({hot_size / total_days:.0f} B/day)")
+    print(f"  archive documents: {archive_size / 1024:8.1f} KiB ({archive_size / total_days:.0f} B/day, "
+          f"{hot_size / archive_size:.1f}x smaller)")
+
+    start = time.perf_counter()
+    decoded = [decode_day(bson.decode(d)) for d in hot_docs]
+    hot_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    archived = []
+    for raw in archives:
+        archive = bson.decode(raw)
+        columns = unpack_columns(archive["entries"])
+        archived += [_archived_day(archive, i, columns) for i in range(len(archive["days"]))]
+    archive_elapsed = time.perf_counter() - start
+    assert len(decoded) == len(archived)
+
+    start = time.perf_counter()
+    calories = 0
+    for raw in archives:
+        calories += sum(bson.decode(raw)["nutrition"]["total_calories"])
+    totals_elapsed = time.perf_counter() - start
+
+    print(f"  full decode, hot:     {total_days / hot_elapsed:10.0f} days/s")
+    print(f"  full decode, archive: {total_days / archive_elapsed:10.0f} days/s")
+    print(f"  totals-only scan:     {total_days / totals_elapsed:10.0f} days/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--items", type=int, default=12)
+    args = parser.parse_args()
+    main(args.months, args.items)
@@ -0,0 +1,102 @@
+"""
+Token verification benchmark
+Times verify_token with each JWT backend (jose, pyjwt when installed,
+builtin) and a cached get_current_user lookup, then serves GET /data/{date}
+in process (temporary SQLite database) with the token cache disabled and
+enabled to show the share of request latency spent on authentication
+
+Usage:
+    python -m benchmarks.bench_auth [--tokens 20000] [--requests 2000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("SKIP_TFLITE", "true")
+
+from app.core import security
+from app.core.config import settings
+from app.utils import auth
+from app.utils.timezone import get_ist_date_string
+
+
+def bench_backends(tokens: int) -> None:
+    token = security.create_access_token({"sub": "bench-user"})
+    backends = ["jose", "builtin"] + (["pyjwt"] if security.pyjwt is not None else [])
+    for backend in backends:
+        settings.JWT_BACKEND = backend
+        start = time.perf_counter()
+        for _ in range(tokens):
+            security.verify_token(token)
+        elapsed = time.perf_counter() - start
+        print(f"  {'verify_token ' + backend:<26} {elapsed / tokens * 1e6:8.1f} us/token")
+    settings.JWT_BACKEND = "jose"
+
+
+async def bench_cached(tokens: int) -> None:
+    class State:
+        pass
+
+    class Request:
+        state = State()
+
+    credentials = auth.HTTPAuthorizationCredentials(scheme="Bearer", credentials=security.create_access_token({"sub": "bench-user"}))
+    await auth.get_current_user(Request, credentials)
+    start = time.perf_counter()
+    for _ in range(tokens):
+        await auth.get_current_user(Request, credentials)
+    elapsed = time.perf_counter() - start
+    print(f"  {'get_current_user cached':<26} {elapsed / tokens * 1e6:8.1f} us/token")
+
+
+async def bench_requests(requests: int) -> None:
+    from app.main import app
+    from app.models import database
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.STORAGE_ENGINE = "sqlite"
+        settings.SQLITE_PATH = os.path.join(directory, "bench.db")
+        await database.connect_storage()
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+                response = await client.post("/auth/register", json={
+                    "email": "bench@example.com", "username": "bench", "password": "correct horse battery staple",
+                })
+                assert response.status_code == 201, response.text
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                path = f"/data/{get_ist_date_string()}"
+
+                for name, maxsize in (("no token cache", 0), ("token cache", settings.AUTH_TOKEN_CACHE_MAX_ENTRIES)):
+                    auth.token_cache.maxsize = maxsize
+                    auth.token_cache.clear()
+                    auth._timings.update(cached=0, cached_seconds=0.0, verified=0, verify_seconds=0.0)
+                    latencies = []
+                    for _ in range(requests):
+                        start = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        assert response.status_code == 200, response.text
+                    stats = auth.auth_timing_stats()
+                    print(f"  {'GET /data/{date} ' + name:<32} p50 {statistics.median(latencies):6.3f} ms  "
+                          f"auth: {stats['verified']} verified ({stats['verified_avg_ms']:.3f} ms avg), "
+                          f"{stats['cached']} cached ({stats['cached_avg_ms']:.4f} ms avg)")
+        finally:
+            security.shutdown_password_pool()
+            await database.close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    settings.BCRYPT_ROUNDS = 4
+    print(f"{settings.JWT_ALGORITHM}, {args.tokens} verifications, {args.requests} requests per run")
+    bench_backends(args.tokens)
+    asyncio.run(bench_cached(args.tokens))
+    asyncio.run(bench_requests(args.requests))
@@ -0,0 +1,103 @@
+"""
+Login burst load test
+Fires a burst of concurrent POST /auth/login requests at the app (in
+process, on a temporary SQLite database) while a probe polls GET /health
+every few milliseconds. Reports login throughput and the latency the probe
+sees (from when each probe was due), with bcrypt on the event loop (how login used to work) and on the
+bounded password pool
+
+Usage:
+    python -m benchmarks.bench_login [--logins 40] [--rounds 12] [--threads 4]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import bcrypt
+import httpx
+
+os.environ.setdefault("SKIP_TFLITE", "true")
+
+from app.core import security
+from app.core.config import settings
+
+PASSWORD = "correct horse battery staple"
+PROBE_INTERVAL = 0.005
+
+
+async def _inline_verify(plain_password: str, hashed_password: str) -> bool:
+    """The old verify_password: bcrypt directly on the event loop"""
+    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+
+async def burst(client: httpx.AsyncClient, logins: int) -> None:
+    probe_latencies = []
+    done = asyncio.Event()
+
+    # Latency counts from when the probe was due, so time spent waiting for a
+    # blocked event loop shows up too
+    async def probe():
+        while not done.is_set():
+            due = time.perf_counter() + PROBE_INTERVAL
+            await asyncio.sleep(PROBE_INTERVAL)
+            await client.get("/health")
+            probe_latencies.append(time.perf_counter() - due)
+
+    async def login():
+        response = await client.post("/auth/login", json={"email": "bench@example.com", "password": PASSWORD})
+        assert response.status_code == 200, response.text
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    latencies = sorted(latency * 1000 for latency in probe_latencies)
+    print(f"    logins/s {logins / elapsed:8.1f}   burst {elapsed:6.2f} s   "
+          f"/health p50 {statistics.median(latencies):7.1f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:7.1f} ms  "
+          f"max {latencies[-1]:7.1f} ms  ({len(latencies)} probes)")
+
+
+async def run(logins: int) -> None:
+    from app.main import app
+    from app.models import database
+    from app.routes import auth
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.STORAGE_ENGINE = "sqlite"
+        settings.SQLITE_PATH = os.path.join(directory, "bench.db")
+        await database.connect_storage()
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+                response = await client.post("/auth/register", json={
+                    "email": "bench@example.com", "username": "bench", "password": PASSWORD,
+                })
+                assert response.status_code == 201, response.text
+
+                for name, verify in (("bcrypt on the event loop", _inline_verify), ("password pool", security.verify_password)):
+                    print(f"  {name}")
+                    auth.verify_password = verify
+                    await burst(client, logins)
+        finally:
+            security.shutdown_password_pool()
+            await database.close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS)
+    parser.add_argument("--threads", type=int, default=settings.BCRYPT_THREADS)
+    args = parser.parse_args()
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.BCRYPT_THREADS = args.threads
+    print(f"{args.logins} concurrent logins, BCRYPT_ROUNDS={args.rounds}, BCRYPT_THREADS={args.threads}, "
+          f"{os.cpu_count()} CPUs")
+    asyncio.run(run(args.logins))
@@ -0,0 +1,100 @@
+"""
+Metrics instrumentation overhead
+Times the primitives on the hot path (histogram observation, counter
+increment, stage timer) and serves GET /data/{date} in process (temporary
+SQLite database) with MetricsMiddleware removed and installed, then
+renders /metrics once to show scrape cost
+
+Usage:
+    python -m benchmarks.bench_metrics [--observations 200000] [--requests 3000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("SKIP_TFLITE", "true")
+
+from app.core import security
+from app.core.config import settings
+from app.utils import metrics
+from app.utils.timezone import get_ist_date_string
+
+
+def bench_primitives(observations: int) -> None:
+    histogram = metrics.Histogram("bench_seconds", "bench", labels=("method", "route", "status"))
+    counter = metrics.Counter("bench_total", "bench", labels=("api", "outcome"))
+
+    def timed_block():
+        with histogram.time("POST", "/scan/", "200"):
+            pass
+
+    cases = (
+        ("Histogram.observe", lambda: histogram.observe(0.004, "GET", "/data/{date}", "200")),
+        ("Counter.inc", lambda: counter.inc("spoonacular", "200")),
+        ("Histogram.time (with block)", timed_block),
+    )
+    for name, call in cases:
+        start = time.perf_counter()
+        for _ in range(observations):
+            call()
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<30} {elapsed / observations * 1e9:8.0f} ns")
+
+
+async def bench_requests(requests: int) -> None:
+    from app.main import app
+    from app.models import database
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.STORAGE_ENGINE = "sqlite"
+        settings.SQLITE_PATH = os.path.join(directory, "bench.db")
+        await database.connect_storage()
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+                response = await client.post("/auth/register", json={
+                    "email": "bench@example.com", "username": "bench", "password": "correct horse battery staple",
+                })
+                assert response.status_code == 201, response.text
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                path = f"/data/{get_ist_date_string()}"
+
+                installed = list(app.user_middleware)
+                without = [m for m in installed if m.cls is not metrics.MetricsMiddleware]
+                for name, stack in (("without metrics", without), ("with metrics", installed)):
+                    app.user_middleware = stack
+                    app.middleware_stack = None  # rebuilt on the next request
+                    latencies = []
+                    for _ in range(requests):
+                        start = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        assert response.status_code == 200, response.text
+                    latencies.sort()
+                    print(f"  {'GET /data/{date} ' + name:<34} p50 {statistics.median(latencies):6.3f} ms  "
+                          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.3f} ms")
+
+                settings.METRICS_TOKEN = settings.METRICS_TOKEN or "bench"
+                start = time.perf_counter()
+                response = await client.get("/metrics", headers={"Authorization": f"Bearer {settings.METRICS_TOKEN}"})
+                assert response.status_code == 200, response.text
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"  {'GET /metrics':<34} {elapsed:6.3f} ms  {len(response.content)} bytes")
+        finally:
+            security.shutdown_password_pool()
+            await database.close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--observations", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    settings.BCRYPT_ROUNDS = 4
+    print(f"{args.observations} observations, {args.requests} requests per run")
+    bench_primitives(args.observations)
+    asyncio.run(bench_requests(args.requests))
@@ -0,0 +1,102 @@
+"""
+Rate limiting under a login flood
+One client IP floods POST /auth/login from many concurrent connections
+while a second IP signs in at a steady pace (in process, temporary SQLite
+database). Reports the second client's login latency and how many of the
+flood's requests were served or answered 429, with the limiter off and on
+
+Usage:
+    python -m benchmarks.bench_ratelimit [--seconds 30] [--flood 16] [--rounds 10]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("SKIP_TFLITE", "true")
+
+from app.core import security
+from app.core.config import settings
+from app.utils.ratelimit import rate_limiter
+
+PASSWORD = "correct horse battery staple"
+CREDENTIALS = {"email": "bench@example.com", "password": PASSWORD}
+STEADY_INTERVAL = 3.0
+# One login per STEADY_INTERVAL stays within this; the flood gets 20 and then one per 3 s
+BENCH_LIMIT = "20/60"
+
+
+def ip_client(app, ip: str) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app, client=(ip, 40000)), base_url="http://bench")
+
+
+async def run_once(app, seconds: float, flood: int) -> None:
+    deadline = time.perf_counter() + seconds
+    codes = {}
+    latencies = []
+
+    async def flooder(client: httpx.AsyncClient):
+        while time.perf_counter() < deadline:
+            status = (await client.post("/auth/login", json=CREDENTIALS)).status_code
+            codes[status] = codes.get(status, 0) + 1
+            if status == 429:
+                # A real client would honour Retry-After; keep the pressure on
+                await asyncio.sleep(0.01)
+
+    async def steady(client: httpx.AsyncClient):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await client.post("/auth/login", json=CREDENTIALS)
+            latencies.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.text
+            await asyncio.sleep(STEADY_INTERVAL)
+
+    async with ip_client(app, "203.0.113.1") as abuser, ip_client(app, "198.51.100.7") as user:
+        await asyncio.gather(steady(user), *(flooder(abuser) for _ in range(flood)))
+
+    latencies.sort()
+    print(f"    steady client: {len(latencies):3d} logins  p50 {statistics.median(latencies):7.1f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:7.1f} ms  max {latencies[-1]:7.1f} ms")
+    print(f"    flood: {sum(codes.values())} requests  " + "  ".join(f"{code}: {n}" for code, n in sorted(codes.items())))
+
+
+async def run(seconds: float, flood: int) -> None:
+    from app.main import app
+    from app.models import database
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.STORAGE_ENGINE = "sqlite"
+        settings.SQLITE_PATH = os.path.join(directory, "bench.db")
+        await database.connect_storage()
+        try:
+            async with ip_client(app, "192.0.2.1") as client:
+                response = await client.post("/auth/register", json={
+                    "email": CREDENTIALS["email"], "username": "bench", "password": PASSWORD,
+                })
+                assert response.status_code == 201, response.text
+
+            for name, enabled in (("limiter off", False), (f"limiter on (RATE_LIMIT_AUTH={settings.RATE_LIMIT_AUTH})", True)):
+                print(f"  {name}")
+                settings.RATE_LIMIT_ENABLED = enabled
+                await run_once(app, seconds, flood)
+        finally:
+            security.shutdown_password_pool()
+            await database.close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--flood", type=int, default=16, help="concurrent connections from the flooding IP")
+    parser.add_argument("--rounds", type=int, default=10, help="BCRYPT_ROUNDS")
+    args = parser.parse_args()
+    settings.BCRYPT_ROUNDS = args.rounds
+    settings.RATE_LIMIT_AUTH = BENCH_LIMIT
+    print(f"{args.flood} flooding connections for {args.seconds:.0f} s, BCRYPT_ROUNDS={args.rounds}, "
+          f"BCRYPT_THREADS={settings.BCRYPT_THREADS}, {os.cpu_count()} CPUs")
+    asyncio.run(run(args.seconds, args.flood))
+    print(f"  {rate_limiter.stats()['classes']['auth']}")
@@ -0,0 +1,109 @@
+"""
+Serialization benchmark for a 30-day history payload
+Compares the default jsonable_encoder + json.dumps path with the orjson
+response class, and reports compressed body sizes
+
+Usage:
+    python -m benchmarks.bench_serialization [--days 30] [--items 8] [--runs 200]
+"""
+import argparse
+import gzip
+import json
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from app.core.compression import brotli
+from app.core.responses import dumps
+from app.utils.timezone import get_ist_now, get_ist_date_string
+
+
+def build_history(days: int, items_per_day: int) -> dict:
+    """Build a range payload shaped like raw daily_logs documents"""
+    now = get_ist_now()
+    logs = []
+    for offset in range(days):
+        day = now - timedelta(days=offset)
+        logs.append({
+            "_id": ObjectId(),
+            "user_id": str(ObjectId()),
+            "date": get_ist_date_string(day),
+            "workouts": [
+                {
+                    "id": str(uuid4()),
+                    "exercise": "Bench Press",
+                    "sets": 4,
+                    "reps": 8,
+                    "weight": 80.0,
+                    "duration": 45,
+                    "date": day.isoformat(),
+                }
+                for _ in range(items_per_day // 2)
+            ],
+            "nutrition": {
+                "total_calories": 2150,
+                "total_protein": 120.5,
+                "total_carbs": 210.0,
+                "total_fat": 70.2,
+                "total_fiber": 25.1,
+                "items": [
+                    {
+                        "id": str(uuid4()),
+                        "name": "chicken_biryani",
+                        "calories": 240,
+                        "protein": 12.0,
+                        "carbs": 34.0,
+                        "fat": 7.0,
+                        "fiber": 0.5,
+                        "confidence": 0.91,
+                        "date": day.isoformat(),
+                    }
+                    for _ in range(items_per_day)
+                ],
+            },
+            "version": 5,
+            "createdAt": day.replace(tzinfo=None),
+        })
+    return {"startDate": logs[-1]["date"], "endDate": logs[0]["date"], "logs": logs, "count": len(logs)}
+
+
+def encode_default(content: dict) -> bytes:
+    """FastAPI default path (ObjectId needs a custom encoder to work at all)"""
+    encoded = jsonable_encoder(content, custom_encoder={ObjectId: str})
+    return json.dumps(encoded, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def measure(fn, content: dict, runs: int) -> float:
+    """Average CPU milliseconds per call"""
+    fn(content)  # warm-up
+    start = time.process_time()
+    for _ in range(runs):
+        fn(content)
+    return (time.process_time() - start) * 1000 / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--items", type=int, default=8, help="food items per day")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    content = build_history(args.days, args.items)
+    before = measure(encode_default, content, args.runs)
+    after = measure(dumps, content, args.runs)
+    body = dumps(content)
+
+    print(f"Payload: {args.days} days x {args.items} items, {len(body) / 1024:.1f} KiB JSON")
+    print(f"jsonable_encoder + json.dumps: {before:8.3f} ms CPU/request")
+    print(f"orjson response class:         {after:8.3f} ms CPU/request ({before / after:.1f}x faster)")
+    print(f"gzip body:   {len(gzip.compress(body, compresslevel=6)) / 1024:.1f} KiB")
+    if brotli is not None:
+        print(f"brotli body: {len(brotli.compress(body, quality=4)) / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Storage layout benchmark: embedded arrays vs bucketed entries
+Reports write amplification (BSON bytes rewritten per logged entry) for
+10/100/1000 entries per day, and with --live also measures write and read
+latency against the MongoDB at MONGO_URI (uses a throwaway database)
+
+Usage:
+    python -m benchmarks.bench_storage_layout [--sizes 10 100 1000] [--live]
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.models import daily_logs
+from app.models.codec import day_number, encode_entry
+from app.models.migrations import apply_migrations
+from app.models.schemas import empty_nutrition
+from app.utils.timezone import get_ist_now
+
+DATE = "2024-02-23"
+
+
+def food_entry() -> dict:
+    return {
+        "id": str(uuid4()),
+        "name": "chicken_biryani",
+        "calories": 240,
+        "protein": 12.0,
+        "carbs": 34.0,
+        "fat": 7.0,
+        "fiber": 0.5,
+        "confidence": 0.9132,
+        "date": get_ist_now().isoformat(),
+    }
+
+
+TOTALS = {"total_calories": 240, "total_protein": 12.0, "total_carbs": 34.0, "total_fat": 7.0, "total_fiber": 0.5}
+
+
+def write_amplification(entries: int) -> tuple:
+    """
+    Bytes rewritten to log `entries` items into one day
+    Embedded: every $push rewrites the whole (growing) day document
+    Bucketed: each write stores one entry document and rewrites the small day document
+    """
+    day = {"_id": bson.ObjectId(), "user_id": "u" * 24, "day": day_number(DATE), "workouts": [],
+           "nutrition": empty_nutrition(), "version": 0, "createdAt": get_ist_now()}
+    embedded_total = 0
+    for _ in range(entries):
+        day["nutrition"]["items"].append(encode_entry(food_entry()))
+        day["version"] += 1
+        embedded_total += len(bson.encode(day))
+
+    head = {"_id": bson.ObjectId(), "user_id": "u" * 24, "day": day_number(DATE), "seq": 0,
+            "nutrition": {k: v for k, v in empty_nutrition().items() if k != "items"},
+            "version": 0, "createdAt": get_ist_now()}
+    bucketed_total = 0
+    for seq in range(1, entries + 1):
+        head["seq"] = seq
+        entry = {"_id": bson.ObjectId(), "user_id": "u" * 24, "day": day_number(DATE), "seq": seq,
+                 "kind": daily_logs.FOOD, "entry": encode_entry(food_entry()), "createdAt": get_ist_now()}
+        bucketed_total += len(bson.encode(entry)) + len(bson.encode(head))
+
+    return embedded_total, bucketed_total, len(bson.encode(day)), len(bson.encode(head))
+
+
+async def live(sizes, reads: int):
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client["bench_storage_layout"]
+    try:
+        await client.drop_database("bench_storage_layout")
+        await apply_migrations(db)
+
+        for layout in ("embedded", "bucketed"):
+            settings.STORAGE_LAYOUT = layout
+            for size in sizes:
+                user_id = f"{layout}-{size}"
+                start = time.perf_counter()
+                for _ in range(size):
+                    await daily_logs.add_food_item(db, user_id, DATE, food_entry(), TOTALS)
+                write_ms = (time.perf_counter() - start) * 1000 / size
+
+                start = time.perf_counter()
+                for _ in range(reads):
+                    await daily_logs.get_day(db, user_id, DATE)
+                read_ms = (time.perf_counter() - start) * 1000 / reads
+
+                start = time.perf_counter()
+                for _ in range(reads):
+                    await daily_logs.get_day_version(db, user_id, DATE)
+                version_ms = (time.perf_counter() - start) * 1000 / reads
+
+                print(f"{layout:9s} {size:5d} items   write {write_ms:7.3f} ms   "
+                      f"read {read_ms:7.3f} ms   version check {version_ms:6.3f} ms")
+    finally:
+        await client.drop_database("bench_storage_layout")
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--reads", type=int, default=200)
+    parser.add_argument("--live", action="store_true", help="also time writes/reads against MONGO_URI")
+    args = parser.parse_args()
+
+    print("Write amplification (BSON bytes rewritten while logging N items into one day)")
+    for size in args.sizes:
+        embedded, bucketed, day_size, head_size = write_amplification(size)
+        print(f"  {size:5d} items   embedded {embedded / 1024:10.1f} KiB   bucketed {bucketed / 1024:8.1f} KiB"
+              f"   ({embedded / bucketed:5.1f}x)   final day doc {day_size / 1024:7.1f} KiB vs {head_size} B")
+
+    if args.live:
+        asyncio.run(live(args.sizes, args.reads))
+
+
+if __name__ == "__main__":
+    main()
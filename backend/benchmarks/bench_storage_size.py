@@ -0,0 +1,111 @@
+"""
+Storage size benchmark for the compact binary encoding
+Compares BSON document and index key sizes of the legacy encoding
+(UUID strings, ISO timestamp strings, "YYYY-MM-DD" keys) with the compact
+one. With --live, loads a synthetic legacy dataset into a throwaway
+database at MONGO_URI, runs the migration and reports collStats
+
+Usage:
+    python -m benchmarks.bench_storage_size [--items 20] [--live --users 50 --days 7]
+"""
+import argparse
+import asyncio
+from datetime import timedelta
+from uuid import uuid4
+
+import bson
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.core.config import settings
+from app.models.codec import day_number, encode_entry
+from app.models.migrations import apply_migrations
+from app.models.schemas import empty_nutrition
+from app.utils.timezone import get_ist_now, get_ist_date_string
+
+
+def legacy_day(user_id: str, date: str, items: int) -> dict:
+    now = get_ist_now().isoformat()
+    nutrition = empty_nutrition()
+    nutrition["items"] = [
+        {"id": str(uuid4()), "name": "idli", "calories": 150, "protein": 3.8, "carbs": 30.0,
+         "fat": 2.0, "fiber": 0.6, "confidence": 0.87, "date": now}
+        for _ in range(items)
+    ]
+    return {
+        "user_id": user_id,
+        "date": date,
+        "workouts": [
+            {"id": str(uuid4()), "exercise": "Deadlift", "sets": 3, "reps": 5,
+             "weight": 120.0, "duration": 30, "date": now}
+            for _ in range(max(1, items // 4))
+        ],
+        "nutrition": nutrition,
+        "version": items,
+        "createdAt": get_ist_now(),
+    }
+
+
+def compact_day(day: dict) -> dict:
+    compact = {k: v for k, v in day.items() if k != "date"}
+    compact["day"] = day_number(day["date"])
+    compact["workouts"] = [encode_entry(w) for w in day["workouts"]]
+    compact["nutrition"] = {**day["nutrition"], "items": [encode_entry(i) for i in day["nutrition"]["items"]]}
+    return compact
+
+
+def offline(items: int):
+    day = legacy_day("6ad5dc8f5313f7d0d7463de6", "2024-02-23", items)
+    legacy_size = len(bson.encode(day))
+    compact_size = len(bson.encode(compact_day(day)))
+    print(f"Day document with {items} food items: legacy {legacy_size} B, compact {compact_size} B "
+          f"({100 * (legacy_size - compact_size) / legacy_size:.1f}% smaller)")
+
+    # Index key payloads: (user_id, date) vs (user_id, day)
+    date_key = len(bson.encode({"u": "6ad5dc8f5313f7d0d7463de6", "d": "2024-02-23"}))
+    day_key = len(bson.encode({"u": "6ad5dc8f5313f7d0d7463de6", "d": day_number("2024-02-23")}))
+    print(f"(user_id, date) key {date_key} B vs (user_id, day) key {day_key} B")
+
+    uuid_str = len(bson.encode({"id": str(uuid4())}))
+    uuid_bin = len(bson.encode({"id": encode_entry({"id": str(uuid4())})["id"]}))
+    print(f"Entry id: string {uuid_str} B vs binary {uuid_bin} B")
+
+
+async def live(users: int, days: int, items: int):
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = client["bench_storage_size"]
+    try:
+        await client.drop_database("bench_storage_size")
+        await apply_migrations(db, target=5)
+        today = get_ist_now()
+        await db["daily_logs"].insert_many([
+            legacy_day(f"user-{u}", get_ist_date_string(today - timedelta(days=d)), items)
+            for u in range(users) for d in range(days)
+        ])
+
+        before = await db.command("collStats", "daily_logs")
+        await apply_migrations(db)
+        after = await db.command("collStats", "daily_logs")
+
+        for label, key in (("data size", "size"), ("avg doc", "avgObjSize"), ("index size", "totalIndexSize")):
+            print(f"{label:10s} {before[key]:>10} B -> {after[key]:>10} B "
+                  f"({100 * (before[key] - after[key]) / max(before[key], 1):.1f}% smaller)")
+    finally:
+        await client.drop_database("bench_storage_size")
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="migrate a synthetic dataset at MONGO_URI")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--days", type=int, default=7)
+    args = parser.parse_args()
+
+    offline(args.items)
+    if args.live:
+        asyncio.run(live(args.users, args.days, args.items))
+
+
+if __name__ == "__main__":
+    main()
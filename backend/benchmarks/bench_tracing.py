@@ -0,0 +1,89 @@
+"""
+Tracing overhead
+Times span() with and without an active trace, then serves GET /data/{date}
+in process (temporary SQLite database) at several sample rates and reports
+latency and the size of the Server-Timing header
+
+Usage:
+    python -m benchmarks.bench_tracing [--spans 200000] [--requests 3000]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+
+os.environ.setdefault("SKIP_TFLITE", "true")
+
+from app.core import security
+from app.core.config import settings
+from app.utils import tracing
+from app.utils.timezone import get_ist_date_string
+
+
+def bench_spans(spans: int) -> None:
+    def run(label: str) -> None:
+        start = time.perf_counter()
+        for _ in range(spans):
+            with tracing.span("bench"):
+                pass
+        elapsed = time.perf_counter() - start
+        print(f"  {'span() ' + label:<26} {elapsed / spans * 1e9:8.0f} ns")
+
+    run("unsampled")
+    token = tracing._trace.set(tracing.Trace(tracing._new_id(16), None))
+    try:
+        run("sampled")
+    finally:
+        tracing._trace.reset(token)
+
+
+async def bench_requests(requests: int) -> None:
+    from app.main import app
+    from app.models import database
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings.STORAGE_ENGINE = "sqlite"
+        settings.SQLITE_PATH = os.path.join(directory, "bench.db")
+        await database.connect_storage()
+        tracing.tracer.start(tracing.LocalSpanExporter(settings.TRACING_LOCAL_MAX_TRACES))
+        try:
+            async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+                response = await client.post("/auth/register", json={
+                    "email": "bench@example.com", "username": "bench", "password": "correct horse battery staple",
+                })
+                assert response.status_code == 201, response.text
+                headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                path = f"/data/{get_ist_date_string()}"
+
+                for rate in (0.0, 0.01, 1.0):
+                    tracing.tracer.sample_rate = rate
+                    latencies = []
+                    header = ""
+                    for _ in range(requests):
+                        start = time.perf_counter()
+                        response = await client.get(path, headers=headers)
+                        latencies.append((time.perf_counter() - start) * 1000)
+                        assert response.status_code == 200, response.text
+                        header = response.headers.get("server-timing", header)
+                    latencies.sort()
+                    print(f"  {f'sample rate {rate:g}':<18} p50 {statistics.median(latencies):6.3f} ms  "
+                          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.3f} ms  Server-Timing {len(header)} bytes")
+        finally:
+            await tracing.tracer.stop()
+            security.shutdown_password_pool()
+            await database.close_storage()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--spans", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+    settings.BCRYPT_ROUNDS = 4
+    print(f"{args.spans} spans, {args.requests} requests per run, exporter: local")
+    bench_spans(args.spans)
+    asyncio.run(bench_requests(args.requests))
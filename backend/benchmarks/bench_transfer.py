@@ -0,0 +1,132 @@
+"""
+Bulk export / import benchmark
+Imports a synthetic NDJSON dataset (default 100k entries) through the same
+parse -> validate -> batched write path as POST /import, then exports it
+again as NDJSON and CSV like GET /export. Reports entries/s and the peak
+Python heap of each export (which should not grow with the dataset), plus
+per-entry add_workout / add_food_item writes for comparison. Runs on a
+temporary SQLite engine, or with --live against the MongoDB at MONGO_URI
+(uses a throwaway database)
+
+Usage:
+    python -m benchmarks.bench_transfer [--entries 100000] [--per-day 20] [--baseline 5000] [--live]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import date as date_cls, timedelta
+from uuid import uuid4
+
+import orjson
+
+from app.core.config import settings
+from app.models.daily_logs import food_totals
+from app.storage.base import StorageEngine
+from app.utils.bulk import CSV, NDJSON, export_chunks, import_entries, iter_lines, parse_records
+
+BENCH_DB = "bench_transfer"
+CHUNK_SIZE = 64 * 1024
+
+
+def dataset(entries: int, per_day: int) -> bytes:
+    """NDJSON rows in /export format, one workout for every four food items"""
+    start = date_cls.today() - timedelta(days=entries // per_day + 1)
+    lines = []
+    for n in range(entries):
+        day = (start + timedelta(days=n // per_day)).isoformat()
+        if n % 5 == 0:
+            row = {"day": day, "kind": "workout", "id": str(uuid4()), "exercise": "Deadlift",
+                   "sets": 3, "reps": 5, "weight": 120.0, "duration": 30}
+        else:
+            row = {"day": day, "kind": "food", "id": str(uuid4()), "name": "idli", "calories": 150,
+                   "protein": 3.8, "carbs": 30.0, "fat": 2.0, "fiber": 0.6, "confidence": 0.87}
+        lines.append(orjson.dumps(row))
+    return b"\n".join(lines) + b"\n"
+
+
+async def chunks(body: bytes):
+    for offset in range(0, len(body), CHUNK_SIZE):
+        yield body[offset:offset + CHUNK_SIZE]
+
+
+async def run(engine: StorageEngine, entries: int, per_day: int, baseline: int) -> None:
+    body = dataset(entries, per_day)
+    user_id = str(uuid4())
+    print(f"{entries} entries over {entries // per_day} days, {len(body) / 2 ** 20:.1f} MiB NDJSON, "
+          f"IMPORT_BATCH_SIZE={settings.IMPORT_BATCH_SIZE}")
+
+    start = time.perf_counter()
+    records = parse_records(iter_lines(chunks(body), settings.IMPORT_MAX_LINE_BYTES), NDJSON)
+    summary = await import_entries(engine, user_id, records, {})
+    elapsed = time.perf_counter() - start
+    assert summary["imported"] == entries, summary
+    print(f"  {'import (batched)':<22} {entries / elapsed:10.0f} entries/s  {elapsed:7.2f} s")
+
+    rows = [orjson.loads(line) for line in body.splitlines()[:baseline]]
+    baseline_user = str(uuid4())
+    start = time.perf_counter()
+    for row in rows:
+        entry = {k: v for k, v in row.items() if k not in ("day", "kind")}
+        if row["kind"] == "workout":
+            await engine.add_workout(baseline_user, row["day"], entry)
+        else:
+            await engine.add_food_item(baseline_user, row["day"], entry, food_totals(entry))
+    elapsed = time.perf_counter() - start
+    print(f"  {'per-entry writes':<22} {len(rows) / elapsed:10.0f} entries/s  ({len(rows)} entries)")
+
+    for fmt in (NDJSON, CSV):
+        start = time.perf_counter()
+        size = 0
+        async for chunk in export_chunks(engine, user_id, fmt):
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        async for chunk in export_chunks(engine, user_id, fmt):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  {'export ' + fmt:<22} {entries / elapsed:10.0f} entries/s  {elapsed:7.2f} s  "
+              f"{size / 2 ** 20:6.1f} MiB  peak heap {peak / 1024:8.1f} KiB")
+
+
+async def run_sqlite(entries: int, per_day: int, baseline: int) -> None:
+    from app.storage.sqlite import SQLiteStorage
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = SQLiteStorage(os.path.join(directory, "bench.db"))
+        try:
+            print("sqlite")
+            await run(engine, entries, per_day, baseline)
+        finally:
+            await engine.close()
+
+
+async def run_mongo(entries: int, per_day: int, baseline: int) -> None:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.models.migrations import apply_migrations
+    from app.storage.mongo import MongoStorage
+
+    client = AsyncIOMotorClient(settings.MONGO_URI)
+    try:
+        await client.drop_database(BENCH_DB)
+        db = client[BENCH_DB]
+        await apply_migrations(db)
+        print("mongo")
+        await run(MongoStorage(db), entries, per_day, baseline)
+    finally:
+        await client.drop_database(BENCH_DB)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--per-day", type=int, default=20)
+    parser.add_argument("--baseline", type=int, default=5000, help="entries written one at a time")
+    parser.add_argument("--live", action="store_true", help="benchmark MongoDB instead of SQLite")
+    args = parser.parse_args()
+    asyncio.run((run_mongo if args.live else run_sqlite)(args.entries, args.per_day, args.baseline))
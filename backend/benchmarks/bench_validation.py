@@ -0,0 +1,122 @@
+"""
+Response validation benchmark
+Compares building response models field by field and letting FastAPI
+re-validate them against response_model with the trusted-document fast
+path that emits response dicts directly
+
+Usage:
+    python -m benchmarks.bench_validation [--items 20] [--runs 2000]
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from bson import ObjectId
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import dumps
+from app.models.schemas import DailyHistoryResponseSchema, UserResponseSchema
+from app.utils.timezone import get_ist_now
+
+
+def build_user() -> dict:
+    return {
+        "_id": ObjectId(),
+        "email": "athlete@example.com",
+        "username": "athlete",
+        "password": "$2b$12$" + "x" * 53,
+        "dailyCalorieGoal": 2200,
+        "proteinGoal": 160,
+        "carbsGoal": 220,
+        "fiberGoal": 30,
+        "workoutStreak": 12,
+        "version": 7,
+        "createdAt": get_ist_now(),
+    }
+
+
+def build_day(items: int) -> dict:
+    now = get_ist_now().isoformat()
+    return {
+        "_id": ObjectId(),
+        "workouts": [
+            {"id": str(uuid4()), "exercise": "Squat", "sets": 5, "reps": 5,
+             "weight": 100.0, "duration": 40, "date": now}
+            for _ in range(items // 2)
+        ],
+        "nutrition": {
+            "total_calories": 2100,
+            "items": [
+                {"id": str(uuid4()), "name": "dosa", "calories": 168, "protein": 3.5,
+                 "carbs": 28.0, "fat": 5.0, "fiber": 1.8, "confidence": 0.88, "date": now}
+                for _ in range(items)
+            ],
+        },
+    }
+
+
+async def validated_user(user: dict, field) -> bytes:
+    """Old path: build field by field, then FastAPI validates response_model"""
+    model = UserResponseSchema(
+        id=str(user["_id"]),
+        email=user["email"],
+        username=user["username"],
+        dailyCalorieGoal=user.get("dailyCalorieGoal", 2000),
+        proteinGoal=user.get("proteinGoal", 150),
+        carbsGoal=user.get("carbsGoal", 200),
+        fiberGoal=user.get("fiberGoal", 25),
+        workoutStreak=user.get("workoutStreak", 0),
+        createdAt=user.get("createdAt"),
+    )
+    return dumps(await serialize_response(field=field, response_content=model))
+
+
+async def trusted_user(user: dict, field) -> bytes:
+    """Fast path: response dict straight from the trusted document"""
+    return dumps(UserResponseSchema.dump_document(user))
+
+
+async def validated_day(day: dict, field) -> bytes:
+    model = DailyHistoryResponseSchema(workouts=day["workouts"], nutrition=day["nutrition"])
+    return dumps(await serialize_response(field=field, response_content=model))
+
+
+async def trusted_day(day: dict, field) -> bytes:
+    return dumps(DailyHistoryResponseSchema.dump_document(day))
+
+
+async def measure(fn, doc: dict, field, runs: int) -> float:
+    """Average microseconds per call"""
+    await fn(doc, field)
+    start = time.perf_counter()
+    for _ in range(runs):
+        await fn(doc, field)
+    return (time.perf_counter() - start) * 1_000_000 / runs
+
+
+async def run(items: int, runs: int):
+    user_field = create_response_field(name="Response_user", type_=UserResponseSchema)
+    day_field = create_response_field(name="Response_day", type_=DailyHistoryResponseSchema)
+    user, day = build_user(), build_day(items)
+
+    for label, slow, fast, doc, field in (
+        ("/users/me", validated_user, trusted_user, user, user_field),
+        (f"/data/{{date}} ({items} items)", validated_day, trusted_day, day, day_field),
+    ):
+        before = await measure(slow, doc, field, runs)
+        after = await measure(fast, doc, field, runs)
+        print(f"{label:28s} validated {before:8.1f} us   trusted {after:8.1f} us   ({before / after:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=20, help="food items per day")
+    parser.add_argument("--runs", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.runs))
+
+
+if __name__ == "__main__":
+    main()
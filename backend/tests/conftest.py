@@ -0,0 +1,48 @@
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.models import database
+from app.utils import ratelimit
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch):
+    """API client on a fresh SQLite database, with fresh rate limit buckets"""
+    from app.main import app
+
+    monkeypatch.setattr(settings, "STORAGE_ENGINE", "sqlite")
+    monkeypatch.setattr(settings, "SQLITE_PATH", str(tmp_path / "test.db"))
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(ratelimit, "rate_limiter", ratelimit.RateLimiter(settings.RATE_LIMIT_MAX_KEYS))
+
+    await database.connect_storage()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as api:
+            yield api
+    finally:
+        security.shutdown_password_pool()
+        await database.close_storage()
+
+
+@pytest.fixture
+async def tokens(client):
+    """Token response of a newly registered user"""
+    response = await client.post("/auth/register", json={
+        "email": f"{uuid4().hex}@example.com", "username": "tester", "password": "correct horse battery staple",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def auth_headers(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.mark.anyio
+async def test_refresh_token_rotates(client, tokens):
+    response = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    me = await client.get("/users/me", headers={"Authorization": f"Bearer {rotated['access_token']}"})
+    assert me.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_reused_refresh_token_signs_out_the_session(client, tokens):
+    rotated = (await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})).json()
+
+    replay = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert replay.status_code == 401
+
+    # The replacement handed out before the replay is revoked with its session
+    response = await client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_logout_revokes_the_refresh_token(client, tokens):
+    response = await client.post("/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 204
+
+    response = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
@@ -0,0 +1,63 @@
+import asyncio
+from uuid import uuid4
+
+import orjson
+import pytest
+
+from app.models import database
+from app.utils.bulk import import_entries
+
+DAYS = ["2024-03-01", "2024-03-02", "2024-03-03"]
+
+
+def _rows(count: int) -> list:
+    return [
+        {"day": DAYS[n % len(DAYS)], "kind": "food", "id": str(uuid4()), "name": "rice", "calories": 130}
+        for n in range(count)
+    ]
+
+
+async def _records(rows: list):
+    for number, row in enumerate(rows, start=1):
+        yield number, dict(row), None
+
+
+@pytest.mark.anyio
+async def test_export_reimports_as_duplicates(client, auth_headers):
+    body = b"".join(orjson.dumps(row) + b"\n" for row in _rows(6))
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+
+    first = (await client.post("/import", content=body, headers=headers)).json()
+    assert (first["imported"], first["duplicates"], first["rejected"]) == (6, 0, 0)
+
+    exported = (await client.get("/export", params={"format": "ndjson"}, headers=auth_headers)).content
+    assert len(exported.splitlines()) == 6
+    again = (await client.post("/import", content=exported, headers=headers)).json()
+    assert (again["imported"], again["duplicates"]) == (0, 6)
+
+
+@pytest.mark.anyio
+async def test_overlapping_imports_store_each_entry_once(client):
+    engine = database.get_database()
+    rows = _rows(30)
+
+    first, second = await asyncio.gather(
+        import_entries(engine, "user", _records(rows), {}),
+        import_entries(engine, "user", _records(rows), {}),
+    )
+
+    assert first["imported"] + second["imported"] == 30
+    assert first["duplicates"] + second["duplicates"] == 30
+    day = await engine.get_day("user", DAYS[0])
+    assert len(day["nutrition"]["items"]) == 10
+    assert day["nutrition"]["total_calories"] == 1300
+
+
+@pytest.mark.anyio
+async def test_invalid_rows_are_rejected_with_their_line(client, auth_headers):
+    body = b'{"day": "2024-03-01", "kind": "food", "name": "x", "calories": 1}\n{"kind": "nap"}\nnot json\n'
+    headers = {**auth_headers, "Content-Type": "application/x-ndjson"}
+
+    summary = (await client.post("/import", content=body, headers=headers)).json()
+    assert summary["imported"] == 1
+    assert [error["line"] for error in summary["errors"]] == [2, 3]
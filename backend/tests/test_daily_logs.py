@@ -0,0 +1,56 @@
+"""Mongo day documents in both storage layouts (mongomock)"""
+from uuid import uuid4
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.config import settings
+from app.models import daily_logs
+
+DATE = "2024-02-23"
+
+
+def _food(calories: float) -> dict:
+    return {"id": str(uuid4()), "name": "apple", "calories": calories, "protein": 1.0,
+            "carbs": 2.0, "fat": 0.5, "fiber": 0.1, "date": f"{DATE}T09:00:00+05:30"}
+
+
+@pytest.fixture
+async def db():
+    db = AsyncMongoMockClient()["daily_logs"]
+    # The unique indexes of migrations 6 and 11
+    await db["daily_logs"].create_index([("user_id", 1), ("day", 1)], unique=True)
+    await db[daily_logs.ENTRIES_COLLECTION].create_index(
+        [("user_id", 1), ("day", 1), ("entry.id", 1)], unique=True,
+    )
+    return db
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("layout", ["embedded", "bucketed"])
+async def test_entry_id_is_stored_once(db, monkeypatch, layout):
+    monkeypatch.setattr(settings, "STORAGE_LAYOUT", layout)
+    apple = _food(52)
+
+    assert await daily_logs.add_entry_if_absent(db, "u1", DATE, "food", apple)
+    assert not await daily_logs.add_entry_if_absent(db, "u1", DATE, "food", apple)
+
+    day = await daily_logs.get_day(db, "u1", DATE)
+    assert [item["id"] for item in day["nutrition"]["items"]] == [apple["id"]]
+    assert day["nutrition"]["total_calories"] == 52
+
+
+@pytest.mark.anyio
+async def test_bucketed_totals_are_summed_from_the_entries(db, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_LAYOUT", "bucketed")
+    for calories in (52, 130):
+        food = _food(calories)
+        await daily_logs.add_food_item(db, "u1", DATE, food, daily_logs.food_totals(food))
+
+    # An edit whose second write (the day's totals) was lost
+    await db["daily_logs"].update_one({"user_id": "u1"}, {"$set": {"nutrition.total_calories": 999}})
+
+    day = await daily_logs.get_day(db, "u1", DATE)
+    assert day["nutrition"]["total_calories"] == 182
+    totals = await daily_logs.get_daily_totals(db, "u1", DATE, DATE)
+    assert totals[0]["total_calories"] == 182
@@ -0,0 +1,39 @@
+import pytest
+
+from app.utils.cache import DayCache
+from app.utils.timezone import get_ist_date_string
+
+WORKOUT = {"exercise": "Squat", "sets": 3, "reps": 5, "weight": 100.0, "duration": 20}
+
+
+@pytest.mark.anyio
+async def test_day_etag_revalidates_until_the_day_changes(client, auth_headers):
+    path = f"/data/{get_ist_date_string()}"
+    assert (await client.post("/workout/", json=WORKOUT, headers=auth_headers)).status_code == 200
+
+    first = await client.get(path, headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = await client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+    assert (await client.post("/workout/", json=WORKOUT, headers=auth_headers)).status_code == 200
+    changed = await client.get(path, headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()["workouts"]) == 2
+
+
+@pytest.mark.anyio
+async def test_day_cache_drops_a_read_that_predates_an_invalidation():
+    cache = DayCache(maxsize=10, today_ttl=60, past_ttl=60)
+    token = cache.read_token()
+    await cache.invalidate("user", "2024-02-23")
+
+    await cache.set("user", "2024-02-23", {"etag": '"old"', "body": b"{}"}, token)
+    assert await cache.get("user", "2024-02-23") is None
+
+    await cache.set("user", "2024-02-23", {"etag": '"new"', "body": b"{}"}, cache.read_token())
+    assert (await cache.get("user", "2024-02-23"))["etag"] == '"new"'
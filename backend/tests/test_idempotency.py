@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from app.core.config import settings
+from app.models import database
+from app.models.idempotency import IDEMPOTENCY_COLLECTION, claim_request
+from app.utils.idempotency import _inflight, run_idempotent
+from app.utils.timezone import get_ist_date_string
+
+WORKOUT = {"exercise": "Deadlift", "sets": 1, "reps": 5, "weight": 140.0, "duration": 10}
+
+
+@pytest.mark.anyio
+async def test_retried_workout_is_replayed_not_logged_twice(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "workout-1"}
+    first = await client.post("/workout/", json=WORKOUT, headers=headers)
+    retry = await client.post("/workout/", json=WORKOUT, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json()["workoutId"] == first.json()["workoutId"]
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert "idempotent-replayed" not in first.headers
+
+    day = await client.get(f"/data/{get_ist_date_string()}", headers=auth_headers)
+    assert len(day.json()["workouts"]) == 1
+
+
+@pytest.mark.anyio
+async def test_key_reused_for_a_different_request_is_rejected(client, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": "workout-2"}
+    assert (await client.post("/workout/", json=WORKOUT, headers=headers)).status_code == 200
+
+    response = await client.post("/workout/", json={**WORKOUT, "reps": 3}, headers=headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.anyio
+async def test_takeover_of_a_request_still_running_waits_for_it(client, monkeypatch):
+    # A zero lock lets the second request claim the key while the first runs
+    monkeypatch.setattr(settings, "IDEMPOTENCY_LOCK_SECONDS", 0)
+    engine = database.get_database()
+    calls = []
+
+    async def handler():
+        calls.append(None)
+        await asyncio.sleep(0.2)
+        return {"call": len(calls)}
+
+    first = asyncio.create_task(run_idempotent(engine, "user", "key", "fingerprint", handler))
+    await asyncio.sleep(0.05)
+    second = await run_idempotent(engine, "user", "key", "fingerprint", handler)
+
+    assert await first == {"call": 1}
+    assert second.body == b'{"call":1}'
+    assert second.headers["idempotent-replayed"] == "true"
+    assert len(calls) == 1
+    assert ("user", "key") not in _inflight
+
+
+class _ContendedCollection:
+    """Every claim attempt loses: the key exists, then is gone before it is read"""
+
+    async def insert_one(self, document):
+        raise DuplicateKeyError("duplicate key")
+
+    async def update_one(self, query, update):
+        return SimpleNamespace(modified_count=0)
+
+    async def find_one(self, query, projection=None):
+        return None
+
+
+@pytest.mark.anyio
+async def test_claim_that_keeps_losing_the_race_is_a_conflict():
+    db = {IDEMPOTENCY_COLLECTION: _ContendedCollection()}
+    with pytest.raises(HTTPException) as error:
+        await claim_request(db, "user", "key", "fingerprint", lock_seconds=60, ttl_hours=24)
+    assert error.value.status_code == 409
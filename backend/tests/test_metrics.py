@@ -0,0 +1,23 @@
+import pytest
+
+from app.core.config import settings
+
+STATS = ["/metrics", "/health/cache", "/health/auth", "/health/ratelimit", "/health/db"]
+
+
+@pytest.mark.anyio
+async def test_liveness_is_public(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert (await client.get("/health")).status_code == 200
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("path", STATS)
+async def test_stats_need_the_metrics_token(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+    assert (await client.get(path)).status_code == 404
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    assert (await client.get(path)).status_code == 401
+    assert (await client.get(path, headers={"Authorization": "Bearer wrong"})).status_code == 401
+    assert (await client.get(path, headers={"Authorization": "Bearer secret"})).status_code == 200
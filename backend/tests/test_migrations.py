@@ -0,0 +1,96 @@
+"""
+Mongo migrations against legacy-shaped documents (mongomock)
+mongomock has no capped collections, so create_events_collection is skipped
+"""
+from uuid import uuid4
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.core.config import settings
+from app.models import daily_logs, migrations
+from app.models.daily_logs import ENTRIES_COLLECTION
+from app.utils.timezone import get_ist_now
+
+
+@pytest.fixture
+def db(monkeypatch):
+    async def skip(db):
+        pass
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        migration._replace(apply=skip) if migration.name == "create_events_collection" else migration
+        for migration in migrations.MIGRATIONS
+    ])
+    return AsyncMongoMockClient()["legacy"]
+
+
+def _workout(exercise: str) -> dict:
+    return {"id": str(uuid4()), "exercise": exercise, "sets": 3, "reps": 5, "weight": 60.0,
+            "duration": 10, "date": "2024-02-23T08:00:00+05:30"}
+
+
+def _food(name: str, calories: float) -> dict:
+    return {"id": str(uuid4()), "name": name, "calories": calories, "protein": 1.0, "carbs": 2.0,
+            "fat": 0.5, "fiber": 0.1, "confidence": 0.9, "date": "2024-02-23T09:00:00+05:30"}
+
+
+@pytest.mark.anyio
+async def test_pending_migrations_refuse_to_serve(db):
+    with pytest.raises(RuntimeError):
+        await migrations.check_schema_version(db)
+
+    await migrations.apply_migrations(db)
+    assert await migrations.check_schema_version(db) == migrations.LATEST_VERSION
+    assert await migrations.apply_migrations(db) == []
+
+
+@pytest.mark.anyio
+async def test_legacy_days_are_normalized_merged_and_reencoded(db):
+    squat, bench, apple = _workout("Squat"), _workout("Bench"), _food("apple", 52)
+    # Two documents for one day (a concurrent first write) with legacy totals and string dates
+    await db["daily_logs"].insert_many([
+        {"user_id": "u1", "date": "2024-02-23", "workouts": [squat],
+         "nutrition": {"items": [], "totalCalories": 300}, "createdAt": get_ist_now()},
+        {"user_id": "u1", "date": "2024-02-23", "workouts": [bench],
+         "nutrition": {"items": [apple], "total_calories": 52}, "createdAt": get_ist_now()},
+    ])
+    await db["daily_logs"].create_index([("user_id", 1), ("date", 1)])
+    await db["daily_logs"].create_index([("user_id", 1)])
+
+    applied = await migrations.apply_migrations(db)
+    assert applied == [migration.name for migration in migrations.MIGRATIONS]
+
+    assert await db["daily_logs"].count_documents({}) == 1
+    day = await daily_logs.get_day(db, "u1", "2024-02-23")
+    assert [w["id"] for w in day["workouts"]] == [squat["id"], bench["id"]]
+    assert [i["id"] for i in day["nutrition"]["items"]] == [apple["id"]]
+    assert day["nutrition"]["total_calories"] == 352
+
+    indexes = await db["daily_logs"].index_information()
+    assert "user_id_1" not in indexes and "user_id_1_date_1" not in indexes
+    assert indexes["user_id_1_day_1"]["unique"]
+
+
+@pytest.mark.anyio
+async def test_duplicate_bucketed_entries_are_dropped_before_the_unique_index(db, monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_LAYOUT", "bucketed")
+    apple = _food("apple", 52)
+    await migrations.apply_migrations(db, target=10)
+    await db["daily_logs"].insert_one({
+        "user_id": "u1", "day": 19776, "seq": 2, "version": 2, "createdAt": get_ist_now(),
+        "nutrition": {"total_calories": 104},
+    })
+    # The same offline entry stored twice by a retried sync
+    await db[ENTRIES_COLLECTION].insert_many([
+        {"user_id": "u1", "day": 19776, "seq": seq, "kind": "food",
+         "entry": daily_logs.encode_entry(apple), "createdAt": get_ist_now()}
+        for seq in (1, 2)
+    ])
+
+    await migrations.apply_migrations(db)
+
+    assert await db[ENTRIES_COLLECTION].count_documents({}) == 1
+    stored = await db["daily_logs"].find_one({"user_id": "u1"})
+    assert stored["nutrition"]["total_calories"] == 52
+    assert not await daily_logs.add_entry_if_absent(db, "u1", "2024-02-23", "food", apple)
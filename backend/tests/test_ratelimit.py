@@ -0,0 +1,55 @@
+import pytest
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.utils.ratelimit import client_ip, parse_rate
+
+LOGIN = {"email": "nobody@example.com", "password": "wrong password"}
+
+
+def _request(forwarded_for=None, peer="10.0.0.1") -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 1234)})
+
+
+def test_parse_rate():
+    assert parse_rate("10/60") == (10.0, 10.0 / 60)
+    assert parse_rate("off") is None
+    assert parse_rate("0/60") is None
+
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxies(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 0)
+    assert client_ip(_request("1.2.3.4")) == "10.0.0.1"
+
+
+def test_client_ip_takes_the_hop_the_proxy_appended(monkeypatch):
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    # Everything left of the proxy's entry was sent by the client
+    assert client_ip(_request("6.6.6.6, 1.2.3.4")) == "1.2.3.4"
+    assert client_ip(_request("1.2.3.4")) == "1.2.3.4"
+    assert client_ip(_request()) == "10.0.0.1"
+
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 2)
+    assert client_ip(_request("6.6.6.6, 1.2.3.4, 172.16.0.1")) == "1.2.3.4"
+    assert client_ip(_request("172.16.0.1")) == "10.0.0.1"
+
+
+@pytest.mark.anyio
+async def test_login_is_limited_per_client(client, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_AUTH", "2/60")
+    monkeypatch.setattr(settings, "TRUSTED_PROXY_HOPS", 1)
+    first = {"X-Forwarded-For": "1.2.3.4"}
+
+    for _ in range(2):
+        assert (await client.post("/auth/login", json=LOGIN, headers=first)).status_code == 401
+    limited = await client.post("/auth/login", json=LOGIN, headers=first)
+    assert limited.status_code == 429
+    assert int(limited.headers["retry-after"]) > 0
+
+    # A forged leftmost entry still lands in the same bucket
+    spoofed = await client.post("/auth/login", json=LOGIN, headers={"X-Forwarded-For": "9.9.9.9, 1.2.3.4"})
+    assert spoofed.status_code == 429
+
+    other = await client.post("/auth/login", json=LOGIN, headers={"X-Forwarded-For": "5.6.7.8"})
+    assert other.status_code == 401
@@ -0,0 +1,29 @@
+"""
+Storage engine conformance checks (app/storage/conformance.py) under pytest
+SQLite always runs; set TEST_MONGO_URI to also run them against MongoDB
+"""
+import os
+
+import pytest
+
+from app.storage.conformance import CHECKS, ENGINES
+
+TEST_MONGO_URI = os.getenv("TEST_MONGO_URI")
+
+ENGINE_PARAMS = [
+    pytest.param("sqlite"),
+    pytest.param("mongo", marks=pytest.mark.skipif(not TEST_MONGO_URI, reason="TEST_MONGO_URI not set")),
+]
+
+
+@pytest.fixture(params=ENGINE_PARAMS)
+async def engine(request):
+    options = {"uri": TEST_MONGO_URI} if request.param == "mongo" else {}
+    async with ENGINES[request.param](**options) as storage:
+        yield storage
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("check", [fn for _, fn in CHECKS], ids=[name for name, _ in CHECKS])
+async def test_conformance(engine, check):
+    await check(engine)
@@ -0,0 +1,31 @@
+from app.utils.streak import advance_streak, current_run_start, streak_from_dates, touches_current_run
+
+
+def test_consecutive_days_extend_the_streak():
+    user = {}
+    for date in ("2024-02-20", "2024-02-21", "2024-02-21", "2024-02-22"):
+        user.update(advance_streak(user, date))
+    assert user == {"workoutStreak": 3, "longestStreak": 3, "lastWorkoutDate": "2024-02-22"}
+
+
+def test_a_gap_restarts_the_streak_but_keeps_the_longest():
+    user = {"workoutStreak": 5, "longestStreak": 5, "lastWorkoutDate": "2024-02-10"}
+    assert advance_streak(user, "2024-02-12") == {
+        "workoutStreak": 1, "longestStreak": 5, "lastWorkoutDate": "2024-02-12",
+    }
+
+
+def test_incremental_updates_match_a_full_recompute():
+    dates = ["2024-01-01", "2024-01-02", "2024-01-04", "2024-01-05", "2024-01-06"]
+    user = {}
+    for date in dates:
+        user.update(advance_streak(user, date))
+    assert user == streak_from_dates(dates)
+
+
+def test_only_days_in_or_just_before_the_run_need_a_recompute():
+    user = {"workoutStreak": 3, "longestStreak": 3, "lastWorkoutDate": "2024-02-22"}
+    assert current_run_start(user) == "2024-02-20"
+    assert touches_current_run(user, "2024-02-21")
+    assert touches_current_run(user, "2024-02-19")
+    assert not touches_current_run(user, "2024-02-10")
@@ -0,0 +1,51 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.utils.timezone import get_ist_now
+
+
+def _batch() -> dict:
+    logged_at = (get_ist_now() - timedelta(days=1)).isoformat()
+    return {
+        "workouts": [{"id": str(uuid4()), "exercise": "Row", "sets": 3, "reps": 12,
+                      "weight": 40.0, "duration": 15, "loggedAt": logged_at}],
+        "foods": [{"id": str(uuid4()), "name": "apple", "calories": 52, "loggedAt": logged_at}],
+    }
+
+
+@pytest.mark.anyio
+async def test_resent_batch_is_reported_as_duplicates(client, auth_headers):
+    batch = _batch()
+    first = (await client.post("/sync", json=batch, headers=auth_headers)).json()
+    assert len(first["accepted"]) == 2 and first["duplicates"] == []
+
+    again = (await client.post("/sync", json=batch, headers=auth_headers)).json()
+    assert again["accepted"] == []
+    assert sorted(again["duplicates"]) == sorted(entry["id"] for entry in batch["workouts"] + batch["foods"])
+
+
+@pytest.mark.anyio
+async def test_pull_returns_days_changed_after_the_cursor(client, auth_headers):
+    initial = (await client.get("/sync", params={"since": 0}, headers=auth_headers)).json()
+    cursor = initial["cursor"]
+
+    batch = _batch()
+    await client.post("/sync", json=batch, headers=auth_headers)
+    day = batch["foods"][0]["loggedAt"][:10]
+
+    changes = (await client.get("/sync", params={"since": cursor}, headers=auth_headers)).json()
+    assert not changes["reset"]
+    assert list(changes["days"]) == [day]
+    assert changes["days"][day]["nutrition"]["total_calories"] == 52
+    assert len(changes["days"][day]["workouts"]) == 1
+
+    latest = (await client.get("/sync", params={"since": changes["cursor"]}, headers=auth_headers)).json()
+    assert latest["days"] == {}
+
+
+@pytest.mark.anyio
+async def test_unknown_cursor_resets(client, auth_headers):
+    response = (await client.get("/sync", params={"since": 10_000}, headers=auth_headers)).json()
+    assert response["reset"]
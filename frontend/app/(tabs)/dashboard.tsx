@@ -7,6 +7,7 @@ import * as Progress from 'react-native-progress';
 import { useUser } from '@/context/UserContext';
 import { useRouter } from 'expo-router';
 import { dataAPI } from '@/utils/api';
+import { useLiveEvents } from '@/hooks/useLiveEvents';
 import { getISTNow, getISTDateString, formatISTDate, getISTTimeAgo } from '@/utils/istTimezone';
 
 const { width } = Dimensions.get('window');
@@ -40,7 +41,7 @@ interface WorkoutItem {
 }
 
 export default function DashboardScreen() {
-  const { user, isAuthenticated } = useUser();
+  const { user, isAuthenticated, refreshUser } = useUser();
   const router = useRouter();
   const [selectedDate, setSelectedDate] = useState(new Date());
   const [weekDays, setWeekDays] = useState<DayData[]>([]);
@@ -91,6 +92,18 @@ export default function DashboardScreen() {
     generateWeek();
   }, []);
 
+  // Bumped by live events to refetch the selected day
+  const [refreshKey, setRefreshKey] = useState(0);
+
+  // Live updates (e.g. a scan finishing on another device) instead of polling
+  useLiveEvents(isAuthenticated, (event) => {
+    if (event.type === 'profile.updated') {
+      refreshUser();
+    } else if (!event.date || event.date === getISTDateString(selectedDate)) {
+      setRefreshKey((key) => key + 1);
+    }
+  });
+
   // Fetch data for selected date
   useEffect(() => {
     const fetchDailyData = async () => {
@@ -134,7 +147,7 @@ export default function DashboardScreen() {
     };
 
     fetchDailyData();
-  }, [selectedDate, isAuthenticated]);
+  }, [selectedDate, isAuthenticated, refreshKey]);
 
   const progress = nutritionData.total_calories / dailyCalorieGoal;
   const remaining = Math.max(0, dailyCalorieGoal - nutritionData.total_calories);
@@ -15,7 +15,7 @@ import axios from 'axios';
 import { useUser } from '@/context/UserContext';
 import { ScannerLaser } from '@/components/ScannerLaser';
 import { ScanResultModal } from '@/components/ScanResultModal';
-import { API_BASE_URL } from '@/utils/api';
+import { API_BASE_URL, traceHeaders } from '@/utils/api';
 
 interface PredictionResult {
   food_item: string;
@@ -148,11 +148,16 @@ export default function ScannerScreen() {
         {
           headers: {
             'Authorization': `Bearer ${token}`,
+            ...traceHeaders(),
           },
           timeout: 30000,
         }
       );
 
+      if (__DEV__ && backendResponse.headers['server-timing']) {
+        console.log('Scan timing:', backendResponse.headers['server-timing']);
+      }
+
       if (backendResponse.data) {
         // Ensure we have valid nutrition data
         const result = {
@@ -1,6 +1,6 @@
 import React, { createContext, useContext, useEffect, useState } from 'react';
 import axios from 'axios';
-import { API_BASE_URL } from '@/utils/api';
+import { API_BASE_URL, refreshAccessToken, userAPI } from '@/utils/api';
 import { secureStorage } from '@/utils/secureStorage';
 
 export interface User {
@@ -42,7 +42,7 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({
     const initializeAuth = async () => {
       try {
         console.log('🔍 Checking for stored token...');
-        const storedToken = await secureStorage.getToken();
+        let storedToken = await secureStorage.getToken();
         
         if (storedToken) {
           console.log('✓ Token found, validating...');
@@ -55,14 +55,25 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({
             }, 10000);
             
             try {
-              const response = await axios.get(`${API_BASE_URL}/users/me`, {
+              const getProfile = (accessToken: string) => axios.get(`${API_BASE_URL}/users/me`, {
                 headers: {
-                  Authorization: `Bearer ${storedToken}`,
+                  Authorization: `Bearer ${accessToken}`,
                 },
                 signal: controller.signal,
                 timeout: 10000,
               });
               
+              let response;
+              try {
+                response = await getProfile(storedToken);
+              } catch (profileError: any) {
+                // Access token expired - exchange the refresh token instead of signing out
+                const refreshedToken = profileError?.response?.status === 401 ? await refreshAccessToken() : null;
+                if (!refreshedToken) throw profileError;
+                storedToken = refreshedToken;
+                response = await getProfile(storedToken);
+              }
+              
               clearTimeout(timeoutId);
               
               const userData = response.data;
@@ -99,7 +110,7 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({
             ) {
               console.log('🗑️ Clearing invalid/expired/unreachable token');
               try {
-                await secureStorage.removeToken();
+                await secureStorage.clearAllData();
               } catch (removeError) {
                 console.warn('⚠️ Could not remove token:', removeError);
               }
@@ -156,11 +167,13 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({
         clearTimeout(timeoutId);
 
         const accessToken = loginResponse.data.access_token;
+        const refreshToken = loginResponse.data.refresh_token;
         const userData = loginResponse.data.user;
 
         console.log('✓ Login successful, storing token...');
         // Store token securely (platform-aware)
         await secureStorage.setToken(accessToken);
+        if (refreshToken) await secureStorage.setRefreshToken(refreshToken);
 
         // Set user data from login response (no need for separate /users/me call)
         setUser({
@@ -210,11 +223,13 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({
         clearTimeout(timeoutId);
 
         const accessToken = registerResponse.data.access_token;
+        const refreshToken = registerResponse.data.refresh_token;
         const userData = registerResponse.data.user;
 
         console.log('✓ Registration successful, storing token...');
         // Store token securely (platform-aware)
         await secureStorage.setToken(accessToken);
+        if (refreshToken) await secureStorage.setRefreshToken(refreshToken);
 
         // Set user data from register response
         setUser({
@@ -246,9 +261,17 @@ export const UserProvider: React.FC<{ children: React.ReactNode }> = ({
     try {
       console.log('🚪 Starting logout process...');
       
-      // 1. Remove token from secure storage
-      await secureStorage.removeToken();
-      console.log('✓ Token removed from storage');
+      // 1. Revoke the session server-side (best effort), then remove tokens from secure storage
+      const refreshToken = await secureStorage.getRefreshToken();
+      if (refreshToken) {
+        try {
+          await userAPI.logout(refreshToken);
+        } catch (revokeError) {
+          console.warn('⚠️ Could not revoke session:', revokeError);
+        }
+      }
+      await secureStorage.clearAllData();
+      console.log('✓ Tokens removed from storage');
       
       // 2. Clear state variables
       console.log('🔄 Clearing auth state...');
@@ -0,0 +1,95 @@
+import { useEffect, useRef } from 'react';
+import { API_BASE_URL } from '@/utils/api';
+import { secureStorage } from '@/utils/secureStorage';
+
+export interface LiveEvent {
+  type: 'ready' | 'resync' | 'entry.added' | 'entry.updated' | 'entry.deleted' | 'profile.updated';
+  date?: string;
+  kind?: 'workout' | 'food';
+  entry?: any;
+  id?: string;
+  delta?: Record<string, number>;
+  fields?: Record<string, any>;
+}
+
+const RECONNECT_DELAY_MS = 5000;
+// responseText keeps the whole stream, so reopen it once it grows past this
+const MAX_STREAM_CHARS = 256 * 1024;
+
+/**
+ * Subscribes to GET /events/stream (server-sent events) while `enabled`.
+ * Uses XMLHttpRequest progress events so the bearer token can be sent as a
+ * header on every platform (React Native has no EventSource or streaming
+ * fetch), and reconnects after MAX_STREAM_CHARS to bound its memory.
+ * `ready` (sent on every (re)connect) and `resync` mean the client should
+ * refetch.
+ */
+export const useLiveEvents = (enabled: boolean, onEvent: (event: LiveEvent) => void) => {
+  const handlerRef = useRef(onEvent);
+  handlerRef.current = onEvent;
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    let xhr: XMLHttpRequest | null = null;
+    let reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+    let closed = false;
+
+    const connect = async () => {
+      const token = await secureStorage.getToken();
+      if (closed || !token) return;
+
+      let offset = 0;
+      let buffer = '';
+      xhr = new XMLHttpRequest();
+      xhr.open('GET', `${API_BASE_URL}/events/stream`);
+      xhr.setRequestHeader('Authorization', `Bearer ${token}`);
+      xhr.setRequestHeader('Accept', 'text/event-stream');
+
+      xhr.onprogress = () => {
+        if (!xhr) return;
+        buffer += xhr.responseText.slice(offset);
+        offset = xhr.responseText.length;
+
+        // Messages end with a blank line; comments (": ping") are heartbeats
+        const messages = buffer.split('\n\n');
+        buffer = messages.pop() || '';
+        messages.forEach((message) => {
+          const data = message
+            .split('\n')
+            .filter((line) => line.startsWith('data: '))
+            .map((line) => line.slice(6))
+            .join('\n');
+          if (!data) return;
+          try {
+            handlerRef.current(JSON.parse(data));
+          } catch (error) {
+            console.error('Failed to parse live event:', error);
+          }
+        });
+
+        // abort() fires neither onload nor onerror, so reconnect here
+        if (offset > MAX_STREAM_CHARS && !closed) {
+          xhr.abort();
+          connect();
+        }
+      };
+
+      const scheduleReconnect = () => {
+        if (closed) return;
+        reconnectTimer = setTimeout(connect, RECONNECT_DELAY_MS);
+      };
+      xhr.onerror = scheduleReconnect;
+      xhr.onload = scheduleReconnect;
+      xhr.send();
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      if (reconnectTimer) clearTimeout(reconnectTimer);
+      xhr?.abort();
+    };
+  }, [enabled]);
+};
@@ -9,10 +9,8 @@ import {
 } from 'react-native';
 import { Calendar } from 'react-native-calendars';
 import { MaterialIcons } from '@expo/vector-icons';
-import axios from 'axios';
 import { useUser } from '@/context/UserContext';
-import { API_BASE_URL } from '@/utils/api';
-import { secureStorage } from '@/utils/secureStorage';
+import { dataAPI } from '@/utils/api';
 
 interface DailyData {
   workouts: Array<{
@@ -25,7 +23,7 @@ interface DailyData {
     date: string;
   }>;
   nutrition: {
-    totalCalories: number;
+    total_calories: number;
     items: Array<{
       id: string;
       name: string;
@@ -40,44 +38,41 @@ export default function CalendarDashboard() {
   const [selectedDate, setSelectedDate] = useState(
     new Date().toISOString().split('T')[0]
   );
-  const [dailyData, setDailyData] = useState<DailyData | null>(null);
+  const [visibleMonth, setVisibleMonth] = useState(selectedDate.slice(0, 7));
+  const [monthData, setMonthData] = useState<Record<string, DailyData>>({});
   const [loading, setLoading] = useState(false);
   const [markedDates, setMarkedDates] = useState<any>({});
 
-  // Fetch data for selected date
+  const dailyData = monthData[selectedDate] ?? null;
+
+  // Fetch the whole visible month in one request
+  useEffect(() => {
+    fetchMonthData();
+  }, [visibleMonth]);
+
+  // Selecting a day in another month (e.g. greyed-out edge days) loads that month
   useEffect(() => {
-    fetchDailyData();
+    setVisibleMonth(selectedDate.slice(0, 7));
   }, [selectedDate]);
 
-  const fetchDailyData = async () => {
+  const fetchMonthData = async () => {
     if (!user?.id) return;
 
     setLoading(true);
     try {
-      const token = await secureStorage.getToken();
-      const response = await axios.get(
-        `${API_BASE_URL}/data/${selectedDate}`,
-        {
-          headers: {
-            Authorization: `Bearer ${token}`,
-          },
-        }
-      );
-
-      setDailyData(response.data);
+      const days: Record<string, DailyData> = await dataAPI.getBatchData({ month: visibleMonth });
+      setMonthData((prev) => ({ ...prev, ...days }));
 
       // Mark dates that have data
-      setMarkedDates((prev: any) => ({
-        ...prev,
-        [selectedDate]: {
-          selected: true,
-          selectedColor: '#3b82f6',
-          selectedTextColor: '#fff',
-        },
-      }));
+      const marks: any = {};
+      Object.entries(days).forEach(([date, day]) => {
+        if (day.workouts.length > 0 || day.nutrition.items.length > 0) {
+          marks[date] = { marked: true, dotColor: '#a855f7' };
+        }
+      });
+      setMarkedDates((prev: any) => ({ ...prev, ...marks }));
     } catch (error) {
-      console.error('Failed to fetch daily data:', error);
-      setDailyData(null);
+      console.error('Failed to fetch month data:', error);
     } finally {
       setLoading(false);
     }
@@ -117,6 +112,7 @@ export default function CalendarDashboard() {
             minDate="2020-01-01"
             maxDate="2030-12-31"
             onDayPress={(day: any) => setSelectedDate(day.dateString)}
+            onMonthChange={(month: any) => setVisibleMonth(month.dateString.slice(0, 7))}
             markedDates={{
               ...markedDates,
               [selectedDate]: {
@@ -223,7 +219,7 @@ export default function CalendarDashboard() {
                   </Text>
                   <View className="flex-row items-baseline gap-2">
                     <Text className="text-cyan-400 text-4xl font-bold">
-                      {dailyData.nutrition.totalCalories}
+                      {dailyData.nutrition.total_calories}
                     </Text>
                     <Text className="text-cyan-300 text-lg">kcal</Text>
                   </View>
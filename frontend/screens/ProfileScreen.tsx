@@ -50,7 +50,7 @@ export default function ProfileScreen() {
       );
 
       setTodayStats({
-        caloriesConsumed: response.data.nutrition.totalCalories || 0,
+        caloriesConsumed: response.data.nutrition.total_calories || 0,
         workoutCount: response.data.workouts.length || 0,
         totalDuration:
           response.data.workouts.reduce((sum: number, w: any) => sum + w.duration, 0) || 0,
@@ -33,9 +33,56 @@ apiClient.interceptors.request.use(
   }
 );
 
+// Refresh tokens are single-use, so concurrent 401s share one /auth/refresh call;
+// a second call with the same token would sign the session out
+let refreshInFlight: Promise<string | null> | null = null;
+
+export const refreshAccessToken = (): Promise<string | null> => {
+  if (!refreshInFlight) {
+    refreshInFlight = (async () => {
+      try {
+        const refreshToken = await secureStorage.getRefreshToken();
+        if (!refreshToken) return null;
+
+        const response = await axios.post(`${API_BASE_URL}/auth/refresh`, { refresh_token: refreshToken }, {
+          timeout: 15000,
+          validateStatus: (status) => status < 500,
+        });
+        if (response.status !== 200) {
+          // Expired or revoked - the user has to sign in again
+          await secureStorage.clearAllData();
+          return null;
+        }
+
+        await secureStorage.setToken(response.data.access_token);
+        await secureStorage.setRefreshToken(response.data.refresh_token);
+        return response.data.access_token as string;
+      } catch (error) {
+        console.error('Failed to refresh access token:', error);
+        return null;
+      } finally {
+        refreshInFlight = null;
+      }
+    })();
+  }
+  return refreshInFlight;
+};
+
 // Add response interceptor for better error handling
 apiClient.interceptors.response.use(
-  (response) => response,
+  async (response) => {
+    // 4xx resolve (see validateStatus): on an expired access token, refresh once and retry
+    const config: any = response.config;
+    if (response.status === 401 && !config._retried && !config.url?.startsWith('/auth/')) {
+      const accessToken = await refreshAccessToken();
+      if (accessToken) {
+        config._retried = true;
+        config.headers.Authorization = `Bearer ${accessToken}`;
+        return apiClient(config);
+      }
+    }
+    return response;
+  },
   (error) => {
     // Handle network errors gracefully
     if (error.code === 'ECONNABORTED') {
@@ -51,6 +98,38 @@ apiClient.interceptors.response.use(
   }
 );
 
+// One key per logical action; every retry of that action sends the same key,
+// so the server replays the first response instead of logging twice
+export const newIdempotencyKey = (): string =>
+  (globalThis as any).crypto?.randomUUID?.() ??
+  `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}-${Math.random().toString(36).slice(2)}`;
+
+// Development builds ask the server to trace a request (W3C traceparent, sampled;
+// honoured when the server sets TRACING_TRUST_PARENT); the stage breakdown comes
+// back in the Server-Timing response header
+const randomHex = (length: number): string =>
+  Array.from({ length }, () => Math.floor(Math.random() * 16).toString(16)).join('');
+
+export const traceHeaders = (): Record<string, string> =>
+  __DEV__ ? { traceparent: `00-${randomHex(32)}-${randomHex(16)}-01` } : {};
+
+const RETRYABLE_ERRORS = ['ECONNABORTED', 'ERR_NETWORK'];
+const IDEMPOTENT_RETRIES = 2;
+
+// POST with an Idempotency-Key, retried on timeouts / network errors and while
+// the first attempt is still in progress on the server (409)
+const postIdempotent = async (url: string, data: any, config: any = {}) => {
+  const headers = { ...config.headers, 'Idempotency-Key': newIdempotencyKey() };
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const response = await apiClient.post(url, data, { ...config, headers });
+      if (response.status !== 409 || attempt >= IDEMPOTENT_RETRIES) return response;
+    } catch (error: any) {
+      if (attempt >= IDEMPOTENT_RETRIES || !RETRYABLE_ERRORS.includes(error.code)) throw error;
+    }
+  }
+};
+
 export const userAPI = {
   getProfile: async () => {
     const response = await apiClient.get('/users/me');
@@ -75,6 +154,11 @@ export const userAPI = {
     });
     return response.data;
   },
+
+  // Revoke this device's session (or every session) on the server
+  logout: async (refreshToken: string, allSessions = false) => {
+    await apiClient.post('/auth/logout', { refresh_token: refreshToken, all_sessions: allSessions });
+  },
 };
 
 export const dataAPI = {
@@ -83,18 +167,42 @@ export const dataAPI = {
     return response.data;
   },
 
+  // Several days in one request: { month: 'YYYY-MM' } or { dates: ['YYYY-MM-DD', ...] }
+  getBatchData: async (params: { month?: string; dates?: string[]; summary?: boolean }) => {
+    const response = await apiClient.get('/data/batch', {
+      params: {
+        month: params.month,
+        dates: params.dates?.join(','),
+        summary: params.summary || undefined,
+      },
+    });
+    return response.data?.days || {};
+  },
+
   getWorkouts: async (date: string) => {
     const response = await apiClient.get(`/data/${date}`);
     return response.data?.workouts || [];
   },
 
   addWorkout: async (workoutData: any) => {
-    const response = await apiClient.post('/workout/', workoutData);
+    const response = await postIdempotent('/workout/', workoutData);
     return response.data;
   },
 
-  deleteWorkout: async (workoutId: string) => {
-    const response = await apiClient.delete(`/workouts/${workoutId}`);
+  // `date` (YYYY-MM-DD) is the day the workout was logged on; defaults to today (IST)
+  updateWorkout: async (workoutId: string, updates: {
+    exercise?: string;
+    sets?: number;
+    reps?: number;
+    weight?: number;
+    duration?: number;
+  }, date?: string) => {
+    const response = await apiClient.patch(`/workout/${workoutId}`, updates, { params: { date } });
+    return response.data;
+  },
+
+  deleteWorkout: async (workoutId: string, date?: string) => {
+    const response = await apiClient.delete(`/workout/${workoutId}`, { params: { date } });
     return response.data;
   },
 
@@ -129,9 +237,22 @@ export const nutritionAPI = {
     return response.data;
   },
 
-  deleteFoodItem: async (foodId: string) => {
-    // Backend doesn't have delete endpoint yet, mock response
-    return { success: true };
+  // `date` (YYYY-MM-DD) is the day the item was logged on; defaults to today (IST)
+  updateFoodItem: async (foodId: string, updates: {
+    name?: string;
+    calories?: number;
+    protein?: number;
+    carbs?: number;
+    fat?: number;
+    fiber?: number;
+  }, date?: string) => {
+    const response = await apiClient.patch(`/scan/items/${foodId}`, updates, { params: { date } });
+    return response.data;
+  },
+
+  deleteFoodItem: async (foodId: string, date?: string) => {
+    const response = await apiClient.delete(`/scan/items/${foodId}`, { params: { date } });
+    return response.data;
   },
 
   logMealFromPrediction: async (mealData: {
@@ -157,6 +278,29 @@ export const nutritionAPI = {
   },
 };
 
+// Offline cache: pull changes after a cursor, push entries logged while offline
+export const syncAPI = {
+  // reset=true means the cursor is too old - refetch everything and keep the new cursor
+  pull: async (since: number) => {
+    const response = await apiClient.get('/sync', { params: { since } });
+    return response.data as {
+      cursor: number;
+      reset: boolean;
+      days: Record<string, any>;
+      profile: Record<string, any> | null;
+    };
+  },
+
+  // Entries carry client-generated ids so a retried batch is not stored twice
+  push: async (batch: { workouts?: any[]; foods?: any[] }) => {
+    const response = await apiClient.post('/sync', {
+      workouts: batch.workouts || [],
+      foods: batch.foods || [],
+    });
+    return response.data as { accepted: string[]; duplicates: string[]; rejected: { id: string; reason: string }[] };
+  },
+};
+
 export const calorieDetectionAPI = {
   predictMeal: async (imageUri: string) => {
     try {
@@ -165,7 +309,7 @@ export const calorieDetectionAPI = {
       const blob = await response.blob();
       formData.append('image', blob as any, 'photo.jpg');
 
-      const result = await apiClient.post('/scan', formData, {
+      const result = await postIdempotent('/scan', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
         },
@@ -2,6 +2,7 @@ import * as SecureStore from 'expo-secure-store';
 import { Platform } from 'react-native';
 
 const TOKEN_KEY = 'userToken';
+const REFRESH_TOKEN_KEY = 'userRefreshToken';
 
 // Platform-specific storage implementation
 const isWeb = Platform.OS === 'web';
@@ -59,16 +60,65 @@ export const secureStorage = {
     }
   },
 
+  // Long-lived, single-use token exchanged at /auth/refresh for a new access token
+  async setRefreshToken(token: string): Promise<void> {
+    try {
+      if (isWeb) {
+        if (typeof window !== 'undefined') {
+          window.localStorage.setItem(REFRESH_TOKEN_KEY, token);
+        }
+      } else {
+        await SecureStore.setItemAsync(REFRESH_TOKEN_KEY, token);
+      }
+    } catch (error) {
+      console.error('Failed to store refresh token:', error);
+      throw error;
+    }
+  },
+
+  async getRefreshToken(): Promise<string | null> {
+    try {
+      if (isWeb) {
+        if (typeof window !== 'undefined') {
+          return window.localStorage.getItem(REFRESH_TOKEN_KEY);
+        }
+        return null;
+      } else {
+        return await SecureStore.getItemAsync(REFRESH_TOKEN_KEY);
+      }
+    } catch (error) {
+      console.error('Failed to retrieve refresh token:', error);
+      return null;
+    }
+  },
+
+  async removeRefreshToken(): Promise<void> {
+    try {
+      if (isWeb) {
+        if (typeof window !== 'undefined') {
+          window.localStorage.removeItem(REFRESH_TOKEN_KEY);
+        }
+      } else {
+        await SecureStore.deleteItemAsync(REFRESH_TOKEN_KEY);
+      }
+    } catch (error) {
+      console.error('Failed to remove refresh token:', error);
+      throw error;
+    }
+  },
+
   async clearAllData(): Promise<void> {
     try {
       if (isWeb) {
         // Use localStorage for web
         if (typeof window !== 'undefined') {
           window.localStorage.removeItem(TOKEN_KEY);
+          window.localStorage.removeItem(REFRESH_TOKEN_KEY);
         }
       } else {
         // Use SecureStore for native
         await SecureStore.deleteItemAsync(TOKEN_KEY);
+        await SecureStore.deleteItemAsync(REFRESH_TOKEN_KEY);
       }
     } catch (error) {
       console.error('Failed to clear storage:', error);